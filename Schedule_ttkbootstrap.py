@@ -1,12 +1,22 @@
 # Schedule_ttkbootstrap.py
-import math
+import time
+_T0 = time.perf_counter()  # startup phases are measured from here
 import os
 os.environ["TK_SILENCE_DEPRECATION"] = "1"
+import threading
 import tkinter as tk
-from tkinter import simpledialog, colorchooser, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from datetime import date, datetime, timedelta
+from tkinter import simpledialog, colorchooser, messagebox, filedialog
 from ttkbootstrap import Style, ttk
+from planner_core import DEFAULT_DB, Planner, PlannerError, format_time, parse_hour, parse_targets, parse_windows
+from reminders import DEFAULT_LEAD
+from canvas_renderer import CONFLICT_COLOR, DayCanvasRenderer, LABEL_W, TOP_PAD
+from entries import DAYS
+from week_renderer import WeekCanvasRenderer
+import donut_chart  # matplotlib itself is only imported after the first frame
+from profiler import PhaseTimer, Profiler
+from tile_grid import TileGrid
+from virtual_list import VirtualList
 
 # -----------------------
 # Theme / Colors / Config
@@ -17,63 +27,54 @@ FONT_BOLD = ("Segoe UI", 11, "bold")
 BIG_BTN = {"width": 16, "padding": 8}  # used for large buttons
 CANVAS_W = 420
 CANVAS_H = 720
+PLACEMENT_STEP_MIN = 30  # start-time granularity for tile placement (multiple of 5)
+PLACEMENT_BEST_FIT = False  # True: smallest gap that fits; False: earliest slot
+DRAG_SNAP_MIN = 15  # dragged blocks snap to this many minutes
 
-# default category colors
-category_colors = {
-    "Coursework": "#4fa3c7",
-    "Sleep": "#b296c7",
-    "Personal": "#f5a962",
-    "Social": "#8fbc8f",
-    "Recreation": "#ee6c6c"
-}
-
-# default activities (name -> (category, duration_hours))
-default_activities = {
-    "Take a Nap": ("Sleep", 1.0),
-    "Eat Breakfast": ("Personal", 0.5),
-    "Lift Weights": ("Recreation", 1.0),
-    "TV with Friends": ("Social", 0.5),
-    "Self Care": ("Personal", 1.0),
-}
-
-# schedule is a list of dicts: {day:'M'..'F', start:float, end:float, name:str, category:str, fixed:bool}
-schedule = [
-    # sample fixed entry
-    {"day": "W", "start": 10.0, "end": 11.0, "name": "Writing Seminar", "category": "Coursework", "fixed": True},
-    {"day": "W", "start": 12.0, "end": 13.0, "name": "Psychology Lecture", "category": "Coursework", "fixed": True},
-]
-
-reminders = [
-    "Bring notes to Writing Seminar",
-    "Email professor by 4 PM"
-]
-
-# helper: compute category totals from schedule
-def compute_totals():
-    totals = {k: 0.0 for k in category_colors.keys()}
-    for e in schedule:
-        cat = e.get("category", "Personal")
-        dur = max(0.0, e["end"] - e["start"])
-        totals[cat] = totals.get(cat, 0.0) + dur
-    return totals
-
-def format_time(h):
-    h_int = int(h)
-    m = int(round((h - h_int) * 60))
-    suffix = "AM" if h_int < 12 else "PM"
-    h_disp = h_int if 1 <= h_int <= 12 else (h_int - 12 if h_int > 12 else 12)
-    return f"{h_disp}:{m:02d} {suffix}"
+# views repainted by PlannerApp.flush_render, in this order
+ALL_VIEWS = ("activities", "tiles", "canvas", "schedule", "reminders", "donut", "trends")
+SCHEDULE_VIEWS = ("canvas", "schedule", "reminders", "donut", "trends")  # reminders show their items' times
+DONUT_THREADED = False  # render the donut with Agg on a worker thread and blit the image
+DONUT_NATIVE = os.environ.get("PLANNER_DONUT") == "canvas"  # Tk-canvas donut, never imports matplotlib
+STARTUP_REPORT = bool(os.environ.get("PLANNER_TIMING"))  # print startup phase timings to stderr
+PLANNER_DB = DEFAULT_DB
+OPTIMIZER_BUDGET = 3.0  # seconds the week optimizer searches (see optimizer.py)
+TREND_MODES = ("Hours per week", "Hours per month", "Time of day", "Targets")
+TREND_RANGES = {"4 weeks": 4, "12 weeks": 12, "6 months": 26, "1 year": 52, "3 years": 156}
+# longest single wait for the next reminder: after() counts elapsed time, which
+# may not include a suspend or see a clock change, so wake up at least this often
+REMINDER_MAX_WAIT = 60.0  # seconds
+SAVE_CHECK_MS = 2000  # how often to look for writes the storage thread could not save
+
+# handlers timed when profiling is on (PLANNER_PROFILE=trace.json; see profiler.py)
+PROFILED = ("flush_render", "draw_canvas", "draw_donut", "build_tiles",
+            "refresh_activity_list", "refresh_schedule_list", "refresh_reminders",
+            "on_canvas_click", "select_canvas_entry", "on_block_drop", "pick_week_block", "on_schedule_select",
+            "add_activity_to_day", "show_week", "create_chart", "draw_trends", "fire_reminders")
 
 # -----------------------
 # App
 # -----------------------
 class PlannerApp:
-    def __init__(self, root):
+    def __init__(self, root, planner, profiler=None, startup=None):
+        # all planner state and rules live in planner_core.Planner; this class
+        # only turns widget events into Planner calls and repaints
         self.root = root
+        self.planner = planner
+        self.profiler = profiler
+        self.startup = startup if startup is not None else PhaseTimer()
+        if profiler is not None:
+            profiler.instrument(self, PROFILED)  # before any widget captures a handler
         self.root.title("Daily Planner")
         self.style = Style(STYLE)
         self.selected_day = tk.StringVar(value="W")  # default day
+        self.week_view = tk.BooleanVar(value=False)  # canvas shows all seven days
         self.selected_schedule_item = None
+        self._dirty = set()
+        self._flush_id = None
+        # last week-optimizer settings, reused as the dialog's defaults
+        self.optimizer_settings = {"targets": "", "windows": "", "gap": "15"}
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Main layout frames
         main = ttk.Frame(root, padding=(12, 12, 12, 12))
@@ -108,12 +109,8 @@ class PlannerApp:
         ttk.Separator(left_col).pack(fill="x", pady=8)
         ttk.Label(left_col, text="Activity Tiles (click to add to schedule)", font=FONT_BOLD).pack(anchor="w", pady=(6,6))
 
-        self.tile_frame = ttk.Frame(left_col)
-        self.tile_frame.pack()
-        self.build_tiles()
-
-        # fill activity list
-        self.refresh_activity_list()
+        self.tiles = TileGrid(left_col, self.add_activity_to_day, FONT, FONT_BOLD)
+        self.tiles.pack()
 
         # ---------- CENTER: Time Grid Canvas + Day Selector + Controls ----------
         header_frame = ttk.Frame(center_col)
@@ -124,6 +121,16 @@ class PlannerApp:
         for idx, d in enumerate(days):
             b = ttk.Radiobutton(header_frame, text=d, value=d, variable=self.selected_day, command=self.redraw_canvas, bootstyle="secondary", width=5)
             b.grid(row=0, column=idx, padx=4)
+        ttk.Checkbutton(header_frame, text="Week", variable=self.week_view, command=self.toggle_week_view,
+                        bootstyle="info-toolbutton", width=6).grid(row=0, column=len(days), padx=(10,4))
+
+        # Week navigation
+        week_nav = ttk.Frame(header_frame)
+        week_nav.grid(row=1, column=0, columnspan=len(days), pady=(6,0))
+        ttk.Button(week_nav, text="◀", bootstyle="secondary-outline", width=3, command=lambda: self.show_week(self.planner.week - timedelta(days=7))).pack(side="left")
+        self.week_label = ttk.Label(week_nav, text="", font=FONT_BOLD, width=22, anchor="center")
+        self.week_label.pack(side="left", padx=8)
+        ttk.Button(week_nav, text="▶", bootstyle="secondary-outline", width=3, command=lambda: self.show_week(self.planner.week + timedelta(days=7))).pack(side="left")
 
         # Canvas
         canvas_frame = ttk.Frame(center_col)
@@ -131,6 +138,14 @@ class PlannerApp:
         self.canvas = tk.Canvas(canvas_frame, width=CANVAS_W, height=CANVAS_H, bg="white", highlightthickness=0)
         self.canvas.pack(side="left", fill="both", expand=True)
         self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.renderer = DayCanvasRenderer(self.canvas, CANVAS_W, CANVAS_H, FONT, FONT_BOLD, format_time, self.select_canvas_entry,
+                                          on_drop=self.on_block_drop, snap_minutes=DRAG_SNAP_MIN)
+        # week overview: a second canvas swapped in by the "Week" toggle
+        self.week_canvas = tk.Canvas(canvas_frame, width=CANVAS_W, height=CANVAS_H, bg="white", highlightthickness=0)
+        self.week_renderer = WeekCanvasRenderer(self.week_canvas, CANVAS_W, CANVAS_H, FONT_BOLD, format_time, self.pick_week_block)
+        self.week_canvas.bind("<MouseWheel>", self.on_week_wheel)
+        self.week_canvas.bind("<Button-4>", self.on_week_wheel)  # X11 wheel up
+        self.week_canvas.bind("<Button-5>", self.on_week_wheel)  # X11 wheel down
 
         # legend / controls
         ctl_frame = ttk.Frame(center_col)
@@ -139,71 +154,114 @@ class PlannerApp:
         ttk.Button(ctl_frame, text="Edit Selected", bootstyle="warning", command=self.edit_selected_schedule, **BIG_BTN).grid(row=0, column=1, padx=4, pady=4)
         ttk.Button(ctl_frame, text="Remove Selected", bootstyle="danger", command=self.remove_selected_schedule, **BIG_BTN).grid(row=0, column=2, padx=4, pady=4)
         ttk.Button(ctl_frame, text="Clear Day", bootstyle="secondary", command=self.clear_day_schedule, **BIG_BTN).grid(row=0, column=3, padx=4, pady=4)
+        ttk.Button(ctl_frame, text="Import Calendar", bootstyle="info", command=self.import_calendar, **BIG_BTN).grid(row=1, column=0, padx=4, pady=4)
+        ttk.Button(ctl_frame, text="Auto-Schedule Week", bootstyle="primary", command=self.optimize_week, **BIG_BTN).grid(row=1, column=1, padx=4, pady=4)
+        self.undo_btn = ttk.Button(ctl_frame, text="Undo", bootstyle="secondary-outline", command=self.undo, **BIG_BTN)
+        self.undo_btn.grid(row=1, column=2, padx=4, pady=4)
+        self.redo_btn = ttk.Button(ctl_frame, text="Redo", bootstyle="secondary-outline", command=self.redo, **BIG_BTN)
+        self.redo_btn.grid(row=1, column=3, padx=4, pady=4)
+        ttk.Button(ctl_frame, text="Export…", bootstyle="info-outline", command=self.export_schedule, **BIG_BTN).grid(row=2, column=0, padx=4, pady=4)
+        root.bind("<Control-z>", lambda e: self.undo())
+        root.bind("<Control-y>", lambda e: self.redo())
+        root.bind("<Control-Shift-Z>", lambda e: self.redo())
+        self.planner.history.listeners.append(self.update_history_buttons)
+        self.update_history_buttons()
 
         # ---------- RIGHT: Schedule list + Reminders ----------
         ttk.Label(right_col, text="Schedule", font=FONT_BOLD).pack(anchor="w")
-        self.schedule_list = tk.Listbox(right_col, width=36, height=16, font=FONT, activestyle='none', exportselection=False)
+        self.schedule_list = VirtualList(right_col, width=36, height=16, font=FONT, format_row=self.planner.entry_label,
+                                         on_select=self.on_schedule_select, on_activate=lambda e: self.edit_selected_schedule(),
+                                         style_row=self.schedule_row_style)
         self.schedule_list.pack()
-        self.schedule_list.bind("<<ListboxSelect>>", self.on_schedule_select)
-        self.schedule_list.bind("<Double-Button-1>", lambda e: self.edit_selected_schedule())
 
         # Reminders panel
         ttk.Separator(right_col).pack(fill="x", pady=8)
         ttk.Label(right_col, text="Reminders", font=FONT_BOLD).pack(anchor="w")
-        self.rem_list = tk.Listbox(right_col, width=36, height=6, font=FONT, activestyle='none')
+        self.rem_list = VirtualList(right_col, width=36, height=6, font=FONT, format_row=self.planner.reminder_label,
+                                    on_activate=lambda r: self.edit_reminder())
         self.rem_list.pack()
         rem_btn_f = ttk.Frame(right_col)
         rem_btn_f.pack(pady=(6,0))
         ttk.Button(rem_btn_f, text="Add", bootstyle="primary", command=self.add_reminder, width=10).grid(row=0, column=0, padx=4)
         ttk.Button(rem_btn_f, text="Edit", bootstyle="secondary", command=self.edit_reminder, width=10).grid(row=0, column=1, padx=4)
         ttk.Button(rem_btn_f, text="Remove", bootstyle="danger", command=self.remove_reminder, width=10).grid(row=0, column=2, padx=4)
+        # one pending after() serves every timed reminder (see reminders.py)
+        self._reminder_after = None
+        self._alert = None  # (window, label, lines) listing delivered reminders
+        self.planner.reminder_queue.listeners.append(self.arm_reminders)
+        self.arm_reminders()
+        # the writer thread drops writes it cannot commit; tell the user rather than lose them quietly
+        self._failed_shown = 0
+        self._save_check = self.root.after(SAVE_CHECK_MS, self.check_saves) if self.planner.storage is not None else None
 
-        # ---------- BOTTOM: Donut Chart ----------
-        donut_frame = ttk.Frame(right_col)
-        donut_frame.pack(side="bottom", pady=(12,0), fill="both", expand=True)
-        self.fig = plt.Figure(figsize=(4,2.8), dpi=100)
-        self.ax = self.fig.add_subplot(111)
-        self.canvas_fig = FigureCanvasTkAgg(self.fig, master=donut_frame)
-        self.canvas_fig.get_tk_widget().pack(fill="both", expand=True)
-
-        # initial population
-        self.refresh_activity_list()
-        self.refresh_schedule_list()
-        self.refresh_reminders()
-        self.draw_canvas()
-        self.draw_donut()
+        # ---------- BOTTOM: Donut Chart + Trends ----------
+        self.charts = ttk.Notebook(right_col)
+        self.charts.pack(side="bottom", pady=(12,0), fill="both", expand=True)
+        donut_frame = ttk.Frame(self.charts)
+        self.charts.add(donut_frame, text="This Week")
+        # the chart is created after the first frame (see start_chart)
+        self.donut_frame = donut_frame
+        self.donut = None
+        self.donut_placeholder = ttk.Label(donut_frame, text="Loading chart…", font=FONT, anchor="center")
+        self.donut_placeholder.pack(fill="both", expand=True)
+        # trends (analytics.py) are only computed and drawn while their tab is shown
+        trends_frame = ttk.Frame(self.charts)
+        self.charts.add(trends_frame, text="Trends")
+        trend_ctl = ttk.Frame(trends_frame)
+        trend_ctl.pack(fill="x", pady=(4,2))
+        self.trend_mode = tk.StringVar(value=TREND_MODES[0])
+        self.trend_range = tk.StringVar(value="12 weeks")
+        self.trend_targets = tk.StringVar(value=self.optimizer_settings["targets"])
+        for col, (var, values, width) in enumerate(((self.trend_mode, TREND_MODES, 15),
+                                                    (self.trend_range, list(TREND_RANGES), 9))):
+            box = ttk.Combobox(trend_ctl, textvariable=var, values=values, state="readonly", width=width)
+            box.grid(row=0, column=col, padx=(0,6))
+            box.bind("<<ComboboxSelected>>", lambda e: self.invalidate("trends"))
+        targets = ttk.Entry(trend_ctl, textvariable=self.trend_targets, width=30)
+        targets.grid(row=1, column=0, columnspan=2, sticky="w", pady=(4,0))
+        targets.bind("<Return>", lambda e: self.invalidate("trends"))
+        self.trends_frame = trends_frame
+        self.trend_chart = None
+        self.charts.bind("<<NotebookTabChanged>>", lambda e: self.invalidate("trends"))
+
+        # initial population (flushed once the main loop is idle)
+        self.show_week(self.planner.week)
+        self.invalidate(*ALL_VIEWS)
+        if profiler is not None:
+            profiler.start(root)
+            profiler.startup = self.startup
+        self.startup.mark("ui")
+        # after_idle runs once the first frame has been laid out and drawn
+        root.after_idle(lambda: root.after(0, self.start_chart))
 
     # -----------------------
     # Activity management
     # -----------------------
     def refresh_activity_list(self):
         self.act_list.delete(0, tk.END)
-        for name, (cat, dur) in default_activities.items():
-            self.act_list.insert(tk.END, f"{name} — {cat} • {dur}h")
+        categories = self.planner.categories
+        for name, (cat, dur) in self.planner.activities.items():
+            self.act_list.insert(tk.END, f"{name} — {categories.name(cat)} • {dur}h")
 
     def add_activity(self):
         name = simpledialog.askstring("New Activity", "Activity name:")
         if not name:
             return
-        if name in default_activities:
+        if name in self.planner.activities:
             messagebox.showerror("Exists", "Activity with that name already exists.")
             return
         category = simpledialog.askstring("Category", "Category (existing or new):")
         if not category:
             return
         duration = simpledialog.askfloat("Duration (hours)", "Duration in hours (e.g., 1 or 0.5):", initialvalue=1.0)
-        if duration is None or duration <= 0:
-            messagebox.showerror("Invalid", "Duration must be positive.")
-            return
-        default_activities[name] = (category, float(duration))
-        # ensure category exists with color
-        if category not in category_colors:
-            color = colorchooser.askcolor(title=f"Pick color for new category '{category}'")[1]
-            if not color:
-                color = "#999999"
-            category_colors[category] = color
-        self.refresh_activity_list()
-        self.build_tiles()
+        try:
+            # ensure category exists with color (one undo step with the activity)
+            with self.planner.history.group(f"Add {name}"):
+                self.planner.set_activity(name, self.ensure_category(category), duration)
+        except PlannerError as exc:
+            messagebox.showerror("Invalid", str(exc))
+            return
+        self.invalidate("activities", "tiles")
 
     def edit_activity(self):
         sel = self.act_list.curselection()
@@ -211,27 +269,22 @@ class PlannerApp:
             messagebox.showinfo("Select", "Double-click an activity or select and press Edit.")
             return
         idx = sel[0]
-        name = list(default_activities.keys())[idx]
-        cat, dur = default_activities[name]
+        name = list(self.planner.activities.keys())[idx]
+        cat, dur = self.planner.activities[name]
         new_name = simpledialog.askstring("Edit Activity", "Name:", initialvalue=name)
         if not new_name:
             return
-        new_cat = simpledialog.askstring("Category", "Category:", initialvalue=cat)
+        new_cat = simpledialog.askstring("Category", "Category:", initialvalue=self.planner.categories.name(cat))
         if not new_cat:
             return
         new_dur = simpledialog.askfloat("Duration (hours)", "Duration:", initialvalue=dur)
-        if new_dur is None or new_dur <= 0:
-            messagebox.showerror("Invalid", "Duration must be positive.")
-            return
-        # handle rename
-        if new_name != name:
-            del default_activities[name]
-        default_activities[new_name] = (new_cat, float(new_dur))
-        if new_cat not in category_colors:
-            color = colorchooser.askcolor(title=f"Pick color for new category '{new_cat}'")[1] or "#999999"
-            category_colors[new_cat] = color
-        self.refresh_activity_list()
-        self.build_tiles()
+        try:
+            with self.planner.history.group(f"Edit {name}"):
+                self.planner.set_activity(new_name, self.ensure_category(new_cat), new_dur, old_name=name)
+        except PlannerError as exc:
+            messagebox.showerror("Invalid", str(exc))
+            return
+        self.invalidate("activities", "tiles")
 
     def remove_activity(self):
         sel = self.act_list.curselection()
@@ -239,129 +292,106 @@ class PlannerApp:
             messagebox.showinfo("Select", "Select an activity to remove.")
             return
         idx = sel[0]
-        name = list(default_activities.keys())[idx]
+        name = list(self.planner.activities.keys())[idx]
         if messagebox.askyesno("Confirm", f"Remove activity '{name}'?"):
-            del default_activities[name]
-            self.refresh_activity_list()
-            self.build_tiles()
+            self.planner.remove_activity(name)
+            self.invalidate("activities", "tiles")
 
-    # tile builder: show activities as tappable tiles
+    # tile builder: show activities as tappable tiles (pooled and virtualized; see tile_grid.py)
     def build_tiles(self):
-        for w in self.tile_frame.winfo_children():
-            w.destroy()
-        cols = 2
-        idx = 0
-        for name, (cat, dur) in default_activities.items():
-            frm = ttk.Frame(self.tile_frame, width=200, height=60, style="card")  # wider & shorter
-            frm.grid_propagate(False)
-            frm.grid(row=idx//cols, column=idx%cols, padx=6, pady=6)
-            lbl = ttk.Label(frm, text=name, font=FONT_BOLD)
-            lbl.pack(anchor="w", padx=8, pady=(8,0), fill="x")
-            sub = ttk.Label(frm, text=f"{cat} • {dur}h", font=FONT)
-            sub.pack(anchor="w", padx=8, pady=(0,8), fill="x")
-            frm.bind("<Button-1>", lambda e, nm=name: self.add_activity_to_day(nm))
-            lbl.bind("<Button-1>", lambda e, nm=name: self.add_activity_to_day(nm))
-            sub.bind("<Button-1>", lambda e, nm=name: self.add_activity_to_day(nm))
-            idx += 1
+        name_of = self.planner.categories.name
+        self.tiles.set_items((name, name, f"{name_of(cat)} • {dur}h")
+                             for name, (cat, dur) in self.planner.activities.items())
 
     def add_activity_to_day(self, name):
         # adds activity to selected day at first available slot
-        cat, dur = default_activities.get(name, ("Personal", 1.0))
-        day = self.selected_day.get()
-        start = 8.0
-        found = False
-        while start + dur <= 20.0:
-            overlap = False
-            for s in schedule:
-                if s["day"] == day and not (start + dur <= s["start"] or start >= s["end"]):
-                    overlap = True
-                    break
-            if not overlap:
-                schedule.append({"day": day, "start": start, "end": start+dur, "name": name, "category": cat, "fixed": False})
-                found = True
-                break
-            start += 0.5
-        if not found:
-            messagebox.showinfo("No space", "No available time slot to add that activity on this day.")
-            return
-        self.refresh_schedule_list()
-        self.draw_canvas()
-        self.draw_donut()
+        try:
+            self.planner.place_activity(name, self.selected_day.get(), PLACEMENT_BEST_FIT, PLACEMENT_STEP_MIN)
+        except PlannerError as exc:
+            messagebox.showinfo("No space", str(exc))
+            return
+        self.invalidate(*SCHEDULE_VIEWS)
 
     # -----------------------
     # Schedule management
     # -----------------------
     def refresh_schedule_list(self):
-        self.schedule_list.delete(0, tk.END)
-        day = self.selected_day.get()
-        day_entries = [e for e in schedule if e["day"] == day]
-        day_entries = sorted(day_entries, key=lambda x: x["start"])
-        for e in day_entries:
-            fx = " (Fixed)" if e.get("fixed") else ""
-            entry_text = f"{format_time(e['start'])} - {format_time(e['end'])}: {e['name']} — {e['category']}{fx}"
-            self.schedule_list.insert(tk.END, entry_text)
-
-    def on_schedule_select(self, event=None):
-        sel = self.schedule_list.curselection()
-        self.selected_schedule_item = None
-        if not sel:
-            return
-        idx = sel[0]
-        day = self.selected_day.get()
-        day_entries = [e for e in schedule if e["day"] == day]
-        day_entries = sorted(day_entries, key=lambda x: x["start"])
-        if idx < len(day_entries):
-            self.selected_schedule_item = day_entries[idx]
+        # the list views the store's ordered day list directly; only visible rows are formatted
+        self.schedule_list.set_rows(self.planner.schedule.day_entries(self.selected_day.get()), keep_selection=True)
+
+    def schedule_row_style(self, entry):
+        # overlapping entries are highlighted like their canvas outline
+        if self.planner.is_conflicted(entry):
+            return {"background": "#fbe3e2", "foreground": CONFLICT_COLOR}
+        return None
+
+    def confirm_overlap(self, clashes):
+        # "would this conflict?" answer for the add/edit dialogs
+        if not clashes:
+            return True
+        names = ", ".join(sorted({f"{c.name} ({format_time(c.start)})" for c in clashes}))
+        return messagebox.askyesno("Overlap", f"This overlaps {names}.\n\nKeep it anyway?", icon="warning")
+
+    def on_schedule_select(self, entry):
+        self.selected_schedule_item = entry
 
     def edit_selected_schedule(self):
         if not self.selected_schedule_item:
             messagebox.showinfo("Select", "Select a schedule item first (click it or pick from the list).")
             return
         e = self.selected_schedule_item
-        name = simpledialog.askstring("Edit Name", "Name:", initialvalue=e["name"])
+        name = simpledialog.askstring("Edit Name", "Name:", initialvalue=e.name)
         if not name:
             return
-        start = simpledialog.askfloat("Start (24h)", "Start time (e.g., 13.5):", initialvalue=e["start"])
+        start = simpledialog.askfloat("Start (24h)", "Start time (e.g., 13.5):", initialvalue=e.start)
         if start is None:
             return
-        end = simpledialog.askfloat("End (24h)", "End time (must be > start):", initialvalue=e["end"])
-        if end is None or end <= start:
-            messagebox.showerror("Invalid", "End must be greater than start.")
+        end = simpledialog.askfloat("End (24h)", "End time (must be > start):", initialvalue=e.end)
+        if end is None:
             return
-        cat = simpledialog.askstring("Category", "Category:", initialvalue=e.get("category", "Personal"))
+        cat = simpledialog.askstring("Category", "Category:", initialvalue=self.planner.categories.name(e.category))
         if not cat:
             return
         fixed = messagebox.askyesno("Fixed", "Should this be fixed (can't auto-move)?", icon="question")
-        e.update({"name": name, "start": float(start), "end": float(end), "category": cat, "fixed": fixed})
-        if cat not in category_colors:
-            color = colorchooser.askcolor(title=f"Pick color for new category '{cat}'")[1] or "#999999"
-            category_colors[cat] = color
-        self.draw_canvas()
-        self.refresh_schedule_list()
-        self.draw_donut()
+        if start < end and not self.confirm_overlap(self.planner.conflicts(e.day, start, end, ignore=e)):
+            return
+        try:
+            # a repeating occurrence is detached from its series and becomes a new entry
+            with self.planner.history.group(f"Edit {e.name}"):
+                self.selected_schedule_item = self.planner.update_entry(e, name=name, start=float(start), end=float(end), category=self.ensure_category(cat), fixed=fixed)
+        except PlannerError as exc:
+            messagebox.showerror("Invalid", str(exc))
+            return
+        self.invalidate(*SCHEDULE_VIEWS)
 
     def remove_selected_schedule(self):
         if not self.selected_schedule_item:
             messagebox.showinfo("Select", "Select a schedule item first.")
             return
         e = self.selected_schedule_item
-        if messagebox.askyesno("Confirm", f"Remove '{e['name']}' from schedule?"):
-            schedule.remove(e)
-            self.selected_schedule_item = None
-            self.draw_canvas()
-            self.refresh_schedule_list()
-            self.draw_donut()
+        if e.rule is not None:
+            # yes: the whole series, no: just this occurrence
+            answer = messagebox.askyesnocancel("Repeating event", f"'{e.name}' repeats weekly.\n\nRemove every occurrence? (No removes only this one.)")
+            if answer is None:
+                return
+            if answer:
+                self.planner.remove_rule(e.rule)
+            else:
+                self.planner.remove_entry(e)
+        elif messagebox.askyesno("Confirm", f"Remove '{e.name}' from schedule?"):
+            self.planner.remove_entry(e)
+        else:
+            return
+        self.selected_schedule_item = None
+        self.invalidate(*SCHEDULE_VIEWS)
 
     def clear_day_schedule(self):
         day = self.selected_day.get()
         if not messagebox.askyesno("Clear Day", f"Clear all schedule items for {day}?"):
             return
-        global schedule
-        schedule = [s for s in schedule if s["day"] != day]
+        self.planner.clear_day(day)
         self.selected_schedule_item = None
-        self.draw_canvas()
-        self.refresh_schedule_list()
-        self.draw_donut()
+        self.invalidate(*SCHEDULE_VIEWS)
 
     def add_fixed_activity(self):
         name = simpledialog.askstring("Fixed Activity", "Name:")
@@ -371,91 +401,110 @@ class PlannerApp:
         if start is None:
             return
         end = simpledialog.askfloat("End (24h)", "End (must be > start):")
-        if end is None or end <= start:
-            messagebox.showerror("Invalid", "End must be greater than start.")
+        if end is None:
             return
-        day = simpledialog.askstring("Day", "Day code (M,T,W,Th,F):", initialvalue=self.selected_day.get())
+        day = simpledialog.askstring("Day", "Day code (M,T,W,Th,F,S,Su):", initialvalue=self.selected_day.get())
         if not day:
             return
-        category = simpledialog.askstring("Category", "Category (existing or new):", initialvalue=list(category_colors.keys())[0])
+        categories = self.planner.categories
+        category = simpledialog.askstring("Category", "Category (existing or new):", initialvalue=categories.name(categories.ids()[0]))
         if not category:
             return
-        if category not in category_colors:
-            color = colorchooser.askcolor(title=f"Pick color for new category '{category}'")[1] or "#999999"
-            category_colors[category] = color
-        schedule.append({"day": day, "start": float(start), "end": float(end), "name": name, "category": category, "fixed": True})
-        self.draw_canvas()
-        self.refresh_schedule_list()
-        self.draw_donut()
+        repeat = messagebox.askyesno("Repeat", "Repeat this every week?", icon="question")
+        try:
+            with self.planner.history.group(f"Add {name}"):
+                self._add_fixed(name, start, end, day, category, repeat)
+        except PlannerError as exc:
+            messagebox.showerror("Invalid", str(exc))
+            return
+        self.invalidate(*SCHEDULE_VIEWS)
+
+    def _add_fixed(self, name, start, end, day, category, repeat):
+        # rest of add_fixed_activity, run as one undo step; raises PlannerError
+        cid = self.ensure_category(category)
+        if not repeat:
+            if start < end and not self.confirm_overlap(self.planner.conflicts(day, start, end)):
+                return
+            self.planner.add_entry(day, start, end, name, cid, True)
+            return
+        days = simpledialog.askstring("Repeat", "Repeat on days (e.g. M,W,F):", initialvalue=day)
+        if not days:
+            return
+        until = simpledialog.askstring("Repeat", "Repeat until (YYYY-MM-DD, blank for no end):")
+        try:
+            until = date.fromisoformat(until.strip()) if until and until.strip() else None
+        except ValueError:
+            raise PlannerError("Dates must look like 2025-12-31.") from None
+        days = [d.strip() for d in days.split(",") if d.strip()]
+        if start < end and all(d in DAYS for d in days) and \
+                not self.confirm_overlap(self.planner.rule_conflicts(start, end, days)):
+            return
+        self.planner.add_rule(name, cid, start, end, days, until=until)
 
     # -----------------------
     # Canvas: draw time grid & entries
     # -----------------------
     def draw_canvas(self):
-        self.canvas.delete("all")
-        # constants
-        top_pad = 8
-        left_label_w = 78
-        hour_count = 12  # 8 AM - 8 PM
-        hour_h = (CANVAS_H - 2 * top_pad) / hour_count
-        # background
-        self.canvas.create_rectangle(0, 0, CANVAS_W, CANVAS_H, fill="white", outline="")
-
-        # hour rows & labels
-        for i in range(hour_count):
-            y1 = top_pad + i * hour_h
-            y2 = y1 + hour_h
-            self.canvas.create_line(left_label_w, y1, CANVAS_W, y1, fill="#e6e9ee")
-            hour_label = 8 + i
-            self.canvas.create_text(left_label_w/2, (y1 + y2)/2, text=format_time(hour_label), font=FONT)
-
-        # right border line
-        self.canvas.create_line(left_label_w, top_pad, left_label_w, CANVAS_H - top_pad, fill="#e6e9ee", width=1)
-
-        # draw entries for selected day
+        # retained renderer: only entries that changed since last call touch the canvas
         day = self.selected_day.get()
-        day_entries = [e for e in schedule if e["day"] == day]
-        day_entries = sorted(day_entries, key=lambda x: x["start"])
-        for e in day_entries:
-            s = max(8.0, e["start"])
-            t = min(20.0, e["end"])
-            if t <= 8.0 or s >= 20.0:
-                continue
-            y1 = top_pad + (s - 8.0) / hour_count * (CANVAS_H - 2*top_pad)
-            y2 = top_pad + (t - 8.0) / hour_count * (CANVAS_H - 2*top_pad)
-            c = category_colors.get(e.get("category"), "#999999")
-            x1 = left_label_w + 8
-            x2 = CANVAS_W - 12
-            # rectangle (no radius param)
-            rect_id = self.canvas.create_rectangle(x1, y1+3, x2, y2-3, fill=c, outline="#2b2b2b", width=0, tags=("entry",))
-            text_x = x1 + 8
-            self.canvas.create_text(text_x, (y1 + y2)/2, anchor="w", text=e["name"], font=FONT_BOLD, fill="#102030", tags=("entry",))
-            dur_text = f"{max(0, e['end'] - e['start']):.1f}h"
-            self.canvas.create_text(x2-28, (y1+y2)/2, text=dur_text, font=("Segoe UI", 9), fill="#fff", tags=("entry",))
-            # store mapping on the rectangle tag for selection
-            self.canvas.tag_bind(rect_id, "<Button-1>", lambda ev, ent=e: self.select_canvas_entry(ent))
-
-        # footer note
-        self.canvas.create_text(CANVAS_W/2, CANVAS_H-10, text=f"Day: {day} • Click a block to select/edit", font=("Segoe UI", 9), fill="#6c757d")
-
-        # refresh schedule list
-        self.refresh_schedule_list()
+        color = self.planner.categories.color
+        conflicts = self.planner.conflict_index()
+        if self.week_view.get():
+            store = self.planner.schedule
+            week = [e for d in DAYS for e in store.day_entries(d)]
+            self.week_renderer.render(week, lambda e: color(e.category), conflicts.is_conflicted)
+            return
+        self.renderer.render(day, self.planner.schedule.day_entries(day), lambda e: color(e.category),
+                             conflicts.is_conflicted, conflicts.day_count(day))
 
     def select_canvas_entry(self, ent):
         self.selected_schedule_item = ent
-        messagebox.showinfo("Selected", f"Selected: {ent['name']} ({format_time(ent['start'])} - {format_time(ent['end'])})")
+        messagebox.showinfo("Selected", f"Selected: {ent.name} ({format_time(ent.start)} - {format_time(ent.end)})")
+
+    def toggle_week_view(self):
+        if self.week_view.get():
+            self.canvas.pack_forget()
+            self.week_canvas.pack(side="left", fill="both", expand=True)
+        else:
+            self.week_canvas.pack_forget()
+            self.canvas.pack(side="left", fill="both", expand=True)
+        self.invalidate("canvas")
+
+    def pick_week_block(self, day, ent):
+        # a block in the week overview was clicked: open that day (and select the entry)
+        self.selected_day.set(day)
+        self.week_view.set(False)
+        self.toggle_week_view()
+        if ent is not None:
+            self.selected_schedule_item = ent
+        self.invalidate("schedule")
+
+    def on_week_wheel(self, event):
+        # Ctrl+wheel zooms the visible hours, the plain wheel scrolls them
+        up = event.num == 4 or event.delta > 0
+        if event.state & 0x4:
+            self.week_renderer.zoom(1 if up else -1)
+        else:
+            self.week_renderer.scroll(-1 if up else 1)
+        self.invalidate("canvas")
+
+    def on_block_drop(self, ent, start, end):
+        # a block was dragged to a new time (moving a repeating occurrence detaches it)
+        try:
+            self.selected_schedule_item = self.planner.update_entry(ent, start=start, end=end)
+        except PlannerError as exc:
+            messagebox.showerror("Invalid", str(exc))
+        self.invalidate(*SCHEDULE_VIEWS)
 
     def on_canvas_click(self, event):
-        # quick-add at clicked time (snap to 30 min)
-        left_label_w = 78
-        if event.x < left_label_w:
+        # quick-add at clicked time (snap to 30 min); presses on a block belong to the renderer
+        if self.renderer.drag is not None or self.renderer.entry_at(event.x, event.y) is not None:
+            return
+        if event.x < LABEL_W:
             return
-        top_pad = 8
-        hour_count = 12
-        if event.y < top_pad or event.y > CANVAS_H - top_pad:
+        if event.y < TOP_PAD or event.y > CANVAS_H - TOP_PAD:
             return
-        frac = (event.y - top_pad) / (CANVAS_H - 2*top_pad)
-        hour = 8.0 + frac * hour_count
+        hour = self.renderer.hour_at(event.y)
         hour = round(hour * 2) / 2.0
         name = simpledialog.askstring("Quick Add", f"Name for new activity at {format_time(hour)}:")
         if not name:
@@ -465,47 +514,158 @@ class PlannerApp:
             return
         day = self.selected_day.get()
         category = simpledialog.askstring("Category", "Category for this activity:", initialvalue="Personal")
-        if category not in category_colors:
-            color = colorchooser.askcolor(title=f"Pick color for new category '{category}'")[1] or "#999999"
-            category_colors[category] = color
-        schedule.append({"day": day, "start": hour, "end": hour + duration, "name": name, "category": category, "fixed": False})
-        self.draw_canvas()
-        self.draw_donut()
+        if not category:
+            return
+        if not self.confirm_overlap(self.planner.conflicts(day, hour, hour + duration)):
+            return
+        try:
+            with self.planner.history.group(f"Add {name}"):
+                self.planner.add_entry(day, hour, hour + duration, name, self.ensure_category(category))
+        except PlannerError as exc:
+            messagebox.showerror("Invalid", str(exc))
+            return
+        self.invalidate(*SCHEDULE_VIEWS)
 
     # -----------------------
     # Reminders
     # -----------------------
     def refresh_reminders(self):
-        self.rem_list.delete(0, tk.END)
-        for r in reminders:
-            self.rem_list.insert(tk.END, r)
+        self.rem_list.set_rows(self.planner.reminders, keep_selection=True)  # schedule edits refresh this list too
 
     def add_reminder(self):
-        txt = simpledialog.askstring("New Reminder", "Reminder text:")
-        if txt:
-            reminders.append(txt)
-            self.refresh_reminders()
+        self.reminder_dialog("New Reminder", None, self.planner.add_reminder)
 
     def edit_reminder(self):
-        sel = self.rem_list.curselection()
-        if not sel:
+        idx = self.rem_list.selected_index()
+        if idx is None:
             messagebox.showinfo("Select", "Select a reminder to edit.")
             return
-        idx = sel[0]
-        txt = simpledialog.askstring("Edit Reminder", "Reminder text:", initialvalue=reminders[idx])
-        if txt:
-            reminders[idx] = txt
-            self.refresh_reminders()
+        self.reminder_dialog("Edit Reminder", self.planner.reminders[idx], lambda r: self.planner.edit_reminder(idx, r))
 
     def remove_reminder(self):
-        sel = self.rem_list.curselection()
-        if not sel:
+        idx = self.rem_list.selected_index()
+        if idx is None:
             messagebox.showinfo("Select", "Select a reminder to remove.")
             return
-        idx = sel[0]
         if messagebox.askyesno("Confirm", "Remove selected reminder?"):
-            reminders.pop(idx)
-            self.refresh_reminders()
+            self.planner.remove_reminder(idx)
+            self.invalidate("reminders")
+
+    def reminder_dialog(self, title, old, save):
+        # text plus when: no time, a date and time, or minutes before a schedule item
+        win = tk.Toplevel(self.root)
+        win.title(title)
+        win.transient(self.root)
+        form = ttk.Frame(win)
+        form.pack(padx=12, pady=(12,4), fill="x")
+        text = tk.StringVar(value=old.text if old is not None else "")
+        soon = datetime.now() + timedelta(hours=1)
+        at = datetime.fromtimestamp(old.at) if old is not None and old.at is not None else soon
+        day = tk.StringVar(value=at.date().isoformat())
+        clock = tk.StringVar(value=at.strftime("%H:%M") if old is not None and old.at is not None else f"{soon.hour}:00")
+        lead = tk.StringVar(value=f"{old.lead:g}" if old is not None and old.key is not None else str(DEFAULT_LEAD))
+        item = self.selected_schedule_item
+        kept = self.planner.reminder_target(old) if old is not None and old.key is not None else None
+        mode = tk.StringVar(value="keep" if kept else "at" if old is not None and old.at is not None else
+                            "item" if old is None and item is not None else "none")
+        ttk.Label(form, text="Reminder", font=FONT).grid(row=0, column=0, sticky="w", pady=2)
+        entry = ttk.Entry(form, textvariable=text, width=32)
+        entry.grid(row=0, column=1, columnspan=3, padx=(8,0), pady=2, sticky="w")
+        ttk.Radiobutton(form, text="No time", value="none", variable=mode).grid(row=1, column=0, sticky="w", pady=2)
+        ttk.Radiobutton(form, text="On", value="at", variable=mode).grid(row=2, column=0, sticky="w", pady=2)
+        ttk.Entry(form, textvariable=day, width=11).grid(row=2, column=1, padx=(8,0), sticky="w")
+        ttk.Label(form, text="at", font=FONT).grid(row=2, column=2, padx=4)
+        ttk.Entry(form, textvariable=clock, width=6).grid(row=2, column=3, sticky="w")
+        row = 3
+        for value, name in (("keep", kept), ("item", item.name if item is not None else None)):
+            if name is None:
+                continue
+            every = " (every time)" if value == "item" and item.rule is not None else ""
+            ttk.Radiobutton(form, text=f"Before {name}{every}", value=value, variable=mode).grid(
+                row=row, column=0, columnspan=4, sticky="w", pady=2)
+            row += 1
+        if kept or item is not None:
+            f = ttk.Frame(form)
+            f.grid(row=row, column=0, columnspan=4, sticky="w", padx=(24,0))
+            ttk.Spinbox(f, textvariable=lead, from_=0, to=1440, increment=5, width=5).pack(side="left")
+            ttk.Label(f, text="minutes before", font=FONT).pack(side="left", padx=4)
+        else:
+            ttk.Label(form, text="Select a schedule item to be reminded before it.", font=FONT,
+                      foreground="#6c757d").grid(row=row, column=0, columnspan=4, sticky="w", pady=2)
+
+        def ok():
+            try:
+                how = mode.get()
+                if how == "none":
+                    r = self.planner.make_reminder(text.get())
+                elif how == "at":
+                    try:
+                        d = date.fromisoformat(day.get().strip())
+                    except ValueError:
+                        raise PlannerError("Dates must look like 2025-12-31.") from None
+                    h = parse_hour(clock.get())
+                    r = self.planner.make_reminder(text.get(), at=datetime.combine(d, datetime.min.time()) + timedelta(minutes=round(h * 60)))
+                else:
+                    try:
+                        minutes = float(lead.get())
+                    except ValueError:
+                        raise PlannerError("Minutes before must be a number.") from None
+                    if minutes < 0:
+                        raise PlannerError("Minutes before must not be negative.")
+                    if how == "item":
+                        r = self.planner.make_reminder(text.get(), before=item, lead=minutes)
+                    else:
+                        r = old.copy(text=self.planner.make_reminder(text.get()).text, lead=minutes)
+                save(r)
+            except PlannerError as exc:
+                messagebox.showerror("Invalid", str(exc), parent=win)
+                return
+            win.destroy()
+            self.invalidate("reminders")
+
+        btns = ttk.Frame(win)
+        btns.pack(pady=(6,12))
+        ttk.Button(btns, text="Save", bootstyle="primary", command=ok, width=10).grid(row=0, column=0, padx=4)
+        ttk.Button(btns, text="Cancel", bootstyle="secondary", command=win.destroy, width=10).grid(row=0, column=1, padx=4)
+        entry.focus_set()
+        win.bind("<Return>", lambda e: ok())
+
+    def arm_reminders(self):
+        # (re)aim the single after() at the earliest due reminder
+        if self._reminder_after is not None:
+            self.root.after_cancel(self._reminder_after)
+            self._reminder_after = None
+        due = self.planner.next_reminder_due()
+        if due is not None:
+            wait = min(max(0.0, due - time.time()), REMINDER_MAX_WAIT)
+            self._reminder_after = self.root.after(int(wait * 1000) + 1, self.fire_reminders)
+
+    def fire_reminders(self):
+        self._reminder_after = None
+        fired = self.planner.due_reminders()  # also anything that came due while asleep
+        if fired:
+            self.show_reminders(fired)
+            self.invalidate("reminders")
+        self.arm_reminders()
+
+    def show_reminders(self, fired):
+        # one window collects delivered reminders until it is dismissed
+        if self._alert is None or not self._alert[0].winfo_exists():
+            win = tk.Toplevel(self.root)
+            win.title("Reminders")
+            label = ttk.Label(win, text="", font=FONT, justify="left")
+            label.pack(padx=16, pady=(12,6), anchor="w")
+            ttk.Button(win, text="Dismiss", bootstyle="primary", command=win.destroy, width=10).pack(pady=(0,12))
+            self._alert = (win, label, [])
+        win, label, lines = self._alert
+        for r, due, missed in fired:
+            t = datetime.fromtimestamp(due)
+            when = format_time(t.hour + t.minute / 60)
+            lines.append(f"• {r.text}  (missed, was due {t:%a %b %d} {when})" if missed else f"• {r.text}  ({when})")
+        label.configure(text="\n".join(lines[-12:]))
+        win.deiconify()
+        win.lift()
+        self.root.bell()
 
     # -----------------------
     # Categories editor
@@ -521,8 +681,15 @@ class PlannerApp:
 
         listbox = tk.Listbox(win, font=FONT, height=12)
         listbox.pack(fill="both", expand=True, padx=8)
-        for k, v in category_colors.items():
-            listbox.insert(tk.END, f"{k} — {v}")
+        shown = []  # listbox row -> category id
+        categories = self.planner.categories
+
+        def fill():
+            listbox.delete(0, tk.END)
+            shown[:] = categories.ids()
+            for cid in shown:
+                listbox.insert(tk.END, f"{categories.name(cid)} — {categories.color(cid)}")
+        fill()
 
         btnf = ttk.Frame(win)
         btnf.pack(pady=8)
@@ -531,54 +698,50 @@ class PlannerApp:
             if not name:
                 return
             color = colorchooser.askcolor(title="Pick category color")[1] or "#999999"
-            category_colors[name] = color
-            listbox.insert(tk.END, f"{name} — {color}")
-            self.draw_canvas()
-            self.draw_donut()
+            self.planner.add_category(name, color)
+            fill()
+            self.invalidate("canvas", "donut", "trends")
 
         def rename_cat():
             sel = listbox.curselection()
             if not sel:
                 messagebox.showinfo("Select", "Select a category to rename.")
                 return
-            idx = sel[0]
-            old = list(list(category_colors.keys()))[idx]
-            new = simpledialog.askstring("Rename", "New name:", initialvalue=old)
+            cid = shown[sel[0]]
+            new = simpledialog.askstring("Rename", "New name:", initialvalue=categories.name(cid))
             if not new:
                 return
-            color = category_colors.pop(old)
-            category_colors[new] = color
-            listbox.delete(idx)
-            listbox.insert(idx, f"{new} — {color}")
-            self.draw_canvas()
-            self.draw_donut()
+            try:
+                # entries and activities hold the id, so nothing else needs rewriting
+                self.planner.rename_category(cid, new)
+            except PlannerError as exc:
+                messagebox.showerror("Exists", str(exc))
+                return
+            fill()
+            self.invalidate(*ALL_VIEWS)
 
         def recolor_cat():
             sel = listbox.curselection()
             if not sel:
                 messagebox.showinfo("Select", "Select a category to change color.")
                 return
-            idx = sel[0]
-            name = list(list(category_colors.keys()))[idx]
-            color = colorchooser.askcolor(title=f"Pick color for {name}")[1] or category_colors[name]
-            category_colors[name] = color
-            listbox.delete(idx)
-            listbox.insert(idx, f"{name} — {color}")
-            self.draw_canvas()
-            self.draw_donut()
+            cid = shown[sel[0]]
+            color = colorchooser.askcolor(title=f"Pick color for {categories.name(cid)}")[1] or categories.color(cid)
+            self.planner.recolor_category(cid, color)
+            fill()
+            self.invalidate("canvas", "donut", "trends")
 
         def remove_cat():
             sel = listbox.curselection()
             if not sel:
                 messagebox.showinfo("Select", "Select a category to remove.")
                 return
-            idx = sel[0]
-            name = list(list(category_colors.keys()))[idx]
+            cid = shown[sel[0]]
+            name = categories.name(cid)
             if messagebox.askyesno("Confirm", f"Remove category '{name}'? This will NOT remove scheduled items but they may show default colors."):
-                del category_colors[name]
-                listbox.delete(idx)
-                self.draw_canvas()
-                self.draw_donut()
+                self.planner.remove_category(cid)
+                fill()
+                self.invalidate("canvas", "donut", "trends")
 
         ttk.Button(btnf, text="Add", bootstyle="success", command=add_cat).grid(row=0, column=0, padx=6)
         ttk.Button(btnf, text="Rename", bootstyle="secondary", command=rename_cat).grid(row=0, column=1, padx=6)
@@ -589,49 +752,391 @@ class PlannerApp:
     # Donut chart
     # -----------------------
     def draw_donut(self):
-        self.ax.clear()
-        totals = compute_totals()
-        labels = []
-        sizes = []
-        colors = []
-        for k, v in totals.items():
-            if v > 0:
-                labels.append(k)
-                sizes.append(v)
-                colors.append(category_colors.get(k, "#999999"))
-        if not sizes:
-            # placeholder segments to keep look pleasant
-            labels = list(category_colors.keys())[:3]
-            sizes = [1, 1, 1]
-            colors = [category_colors[k] for k in labels]
-    
-        # Add percentages around donut
-        wedges, texts, autotexts = self.ax.pie(
-            sizes, colors=colors, radius=1.0,
-            wedgeprops=dict(width=0.4, edgecolor='white'),
-            labels=labels,
-            autopct=lambda pct: f"{pct:.1f}% ({pct*sum(sizes)/100:.1f}h)",  # shows both % and hours
-            textprops=dict(color="black", fontsize=9)
-        )
-    
-        self.ax.set_aspect("equal")
-        self.ax.text(0, 0, "Hours\nAllocated", ha="center", va="center", fontsize=10, fontweight="bold")
-        self.fig.tight_layout()
-        self.canvas_fig.draw()
+        if self.donut is None:
+            return  # still loading; start_chart repaints it
+        labels, sizes, colors = self.planner.chart_data()
+        # wedges are updated in place; see donut_chart.py
+        self.donut.update(labels, sizes, colors)
 
+    # -----------------------
+    # Trends (long-range analytics)
+    # -----------------------
+    def draw_trends(self):
+        if self.charts.select() != str(self.trends_frame):
+            return  # hidden; the tab switch repaints it
+        if self.trend_chart is None:
+            from trend_chart import TrendChart
+            self.trend_chart = TrendChart(self.trends_frame, figsize=(4,2.4), dpi=100)
+            self.trend_chart.widget.pack(fill="both", expand=True)
+        chart = self.trend_chart
+        cats = self.planner.categories
+        weeks = TREND_RANGES[self.trend_range.get()]
+        mode = self.trend_mode.get()
+        try:
+            if mode == "Hours per week":
+                mondays, hours = self.planner.weekly_hours(weeks)
+                chart.stacked([m.strftime("%b %d") for m in mondays], hours, cats.names, cats.colors)
+            elif mode == "Hours per month":
+                months, hours = self.planner.monthly_hours(max(1, round(weeks * 7 / 30.44)))
+                chart.stacked([m.strftime("%b %y") for m in months], hours, cats.names, cats.colors)
+            elif mode == "Time of day":
+                chart.heatmap(self.planner.time_heatmap(weeks), DAYS)
+            else:
+                self.optimizer_settings["targets"] = text = self.trend_targets.get()
+                targets = parse_targets([part.strip() for part in text.split(",") if part.strip()])
+                if not targets:
+                    chart.message("Enter weekly targets above,\ne.g. Sleep=56, Recreation=4")
+                    return
+                rows = self.planner.target_report(targets, weeks)
+                chart.versus([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows],
+                             [cats.color(cats.id_of(r[0])) for r in rows])
+        except PlannerError as exc:
+            chart.message(str(exc))
+
+    # -----------------------
+    # Staged startup
+    # -----------------------
+    def start_chart(self):
+        self.startup.mark("first frame")
+        if DONUT_NATIVE:
+            self.create_chart(donut_chart.CanvasDonut)
+            return
+        # importing matplotlib takes longer than everything before the first
+        # frame; do it off the main loop and poll for it
+        loader = threading.Thread(target=donut_chart.preload, name="chart-import", daemon=True)
+        loader.start()
+
+        def poll():
+            if loader.is_alive():
+                self.root.after(20, poll)
+                return
+            self.startup.mark("chart import")
+            self.create_chart(donut_chart.DonutChart)
+        poll()
+
+    def create_chart(self, chart_cls):
+        self.donut_placeholder.destroy()
+        self.donut = chart_cls(self.donut_frame, figsize=(4,2.8), dpi=100, threaded=DONUT_THREADED)
+        self.donut.widget.pack(fill="both", expand=True)
+        self.draw_donut()
+        self.root.update_idletasks()
+        self.startup.mark("chart")
+        if STARTUP_REPORT or self.profiler is not None:
+            self.startup.report()
+
+    # -----------------------
+    # Calendar import
+    # -----------------------
+    def import_calendar(self):
+        path = filedialog.askopenfilename(title="Import calendar", filetypes=[("Calendars", "*.ics *.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        job = self.planner.import_job(path).start()
+
+        win = tk.Toplevel(self.root)
+        win.title("Import Calendar")
+        win.transient(self.root)
+        ttk.Label(win, text=os.path.basename(path), font=FONT_BOLD).pack(padx=12, pady=(12,4))
+        bar = ttk.Progressbar(win, length=320, maximum=max(1, job.total_bytes), bootstyle="info")
+        bar.pack(padx=12, pady=4)
+        status = ttk.Label(win, text="Starting…", font=FONT)
+        status.pack(padx=12)
+        ttk.Button(win, text="Cancel", bootstyle="danger", command=job.cancel).pack(pady=(6,12))
+        win.protocol("WM_DELETE_WINDOW", job.cancel)
+
+        def poll():
+            bar.configure(value=job.bytes_read)
+            status.configure(text=f"{job.imported} events imported")
+            if not job.done:
+                win.after(100, poll)
+                return
+            win.destroy()
+            self.planner.finish_import(job)
+            self.show_week(self.planner.week)
+            if job.error is not None:
+                messagebox.showerror("Import failed", f"{job.error}\n\n{job.imported} events were imported before the error.")
+            elif job.cancelled:
+                messagebox.showinfo("Import cancelled", f"Cancelled after {job.imported} events.")
+            else:
+                messagebox.showinfo("Import complete", f"Imported {job.imported} events into {len(job.weeks)} weeks.")
+        poll()
+
+    def export_schedule(self):
+        # PNG/PDF pages are drawn on worker processes (see exporter.py); this
+        # dialog only polls how many files have been written
+        win = tk.Toplevel(self.root)
+        win.title("Export")
+        win.transient(self.root)
+        form = ttk.Frame(win)
+        form.pack(padx=12, pady=(12,4), fill="x")
+        first = tk.StringVar(value=self.planner.week.isoformat())
+        last = tk.StringVar(value=self.planner.week.isoformat())
+        for row, (label, var) in enumerate((("From (any date in the first week)", first), ("To (any date in the last week)", last))):
+            ttk.Label(form, text=label, font=FONT).grid(row=row, column=0, sticky="w", pady=2)
+            ttk.Entry(form, textvariable=var, width=14).grid(row=row, column=1, padx=(8,0), pady=2, sticky="w")
+        options = {}
+        for row, group in enumerate(((("png", "PNG"), ("pdf", "PDF"), ("ics", "ICS calendar")),
+                                     (("week", "Week pages"), ("day", "Day pages")))):
+            f = ttk.Frame(form)
+            f.grid(row=2 + row, column=0, columnspan=2, sticky="w", pady=2)
+            for key, label in group:
+                var = options[key] = tk.BooleanVar(value=key in ("pdf", "week"))
+                ttk.Checkbutton(f, text=label, variable=var, bootstyle="round-toggle").pack(side="left", padx=(0,10))
+        bar = ttk.Progressbar(win, length=320, maximum=1, bootstyle="info")
+        bar.pack(padx=12, pady=4)
+        status = ttk.Label(win, text="", font=FONT)
+        status.pack(padx=12)
+        btns = ttk.Frame(win)
+        btns.pack(pady=(6,12))
+        state = {"job": None}
+
+        def start():
+            try:
+                a, b = date.fromisoformat(first.get().strip()), date.fromisoformat(last.get().strip())
+            except ValueError:
+                messagebox.showerror("Invalid", "Dates must look like 2025-12-31.", parent=win)
+                return
+            formats = [k for k in ("png", "pdf", "ics") if options[k].get()]
+            views = [k for k in ("week", "day") if options[k].get()]
+            if not formats or (not views and formats != ["ics"]):
+                messagebox.showerror("Invalid", "Pick at least one format and one kind of page.", parent=win)
+                return
+            folder = filedialog.askdirectory(parent=win, title="Export to folder")
+            if not folder:
+                return
+            try:
+                job = self.planner.export_job(folder, a, b, formats, views or ("week",))
+            except PlannerError as exc:
+                messagebox.showerror("Invalid", str(exc), parent=win)
+                return
+            state["job"] = job.start()
+            export_btn.configure(state="disabled")
+            bar.configure(maximum=max(1, job.total), value=0)
+            poll()
+
+        def poll():
+            job = state["job"]
+            bar.configure(value=job.written)
+            status.configure(text=f"{job.written} of {job.total} files written")
+            if not job.done:
+                win.after(100, poll)
+                return
+            state["job"] = None
+            export_btn.configure(state="normal")
+            if job.error is not None:
+                messagebox.showerror("Export failed", f"{job.error}\n\n{job.written} files were written before the error.", parent=win)
+            elif job.cancelled:
+                status.configure(text=f"Cancelled after {job.written} files")
+            else:
+                status.configure(text=f"{job.written} files written to {job.folder}")
+
+        def close():
+            if state["job"] is not None:
+                state["job"].cancel()  # pages in flight still finish; nothing new is started
+            win.destroy()
+
+        export_btn = ttk.Button(btns, text="Export", bootstyle="primary", command=start, width=10)
+        export_btn.grid(row=0, column=0, padx=4)
+        ttk.Button(btns, text="Close", bootstyle="secondary", command=close, width=10).grid(row=0, column=1, padx=4)
+        win.protocol("WM_DELETE_WINDOW", close)
+
+    def optimize_week(self):
+        # repack the week's flexible activities; worker processes search while
+        # this dialog polls the best plan so far and can apply it at any time
+        settings = self.optimizer_settings
+        self.planner.warm_optimizer()  # the workers start while the form is filled in
+        win = tk.Toplevel(self.root)
+        win.title("Auto-Schedule Week")
+        win.transient(self.root)
+        win.grab_set()  # the plan replaces this week's flexible entries; no edits meanwhile
+        form = ttk.Frame(win)
+        form.pack(padx=12, pady=(12,4), fill="x")
+        fields = {}
+        for row, (key, label) in enumerate((("targets", "Weekly hours (Category=h, ...)"),
+                                            ("windows", "Preferred times (Category=16-19, ...)"),
+                                            ("gap", "Minimum gap (minutes)"))):
+            ttk.Label(form, text=label, font=FONT).grid(row=row, column=0, sticky="w", pady=2)
+            var = fields[key] = tk.StringVar(value=settings[key])
+            ttk.Entry(form, textvariable=var, width=30).grid(row=row, column=1, padx=(8,0), pady=2)
+        status = ttk.Label(win, text="", font=FONT)
+        status.pack(padx=12, anchor="w")
+        preview = VirtualList(win, width=48, height=10, font=FONT,
+                              format_row=lambda r: f"{r[0]:<3}{format_time(r[1])} - {format_time(r[2])}: {r[3]}")
+        preview.pack(padx=12, pady=4)
+        btns = ttk.Frame(win)
+        btns.pack(pady=(4,12))
+        state = {"job": None, "shown": 0}
+
+        def split(text):
+            return [part.strip() for part in text.split(",") if part.strip()]
+
+        def start():
+            for key, var in fields.items():
+                settings[key] = var.get()
+            try:
+                gap = int(settings["gap"] or 0)
+            except ValueError:
+                messagebox.showerror("Invalid", "The gap must be a whole number of minutes.", parent=win)
+                return
+            try:
+                job = self.planner.optimize_job(parse_targets(split(settings["targets"])),
+                                                parse_windows(split(settings["windows"])), gap, OPTIMIZER_BUDGET)
+            except PlannerError as exc:
+                messagebox.showerror("Invalid", str(exc), parent=win)
+                return
+            if state["job"] is not None:
+                state["job"].cancel()
+            state["job"] = job.start()
+            state["shown"] = 0
+            status.configure(text="Searching…")
+            poll()
+
+        def poll():
+            job = state["job"]
+            if job is None or not win.winfo_exists():
+                return
+            if job.version != state["shown"]:
+                # stream the best plan so far into the preview
+                state["shown"] = job.version
+                rows, unplaced = job.plan()
+                preview.set_rows(rows)
+                left = f", {len(unplaced)} don't fit" if unplaced else ""
+                status.configure(text=f"{len(rows)} activities placed{left} • score {job.best[0]:.1f}")
+            if not job.done:
+                win.after(100, poll)
+            elif job.error is not None:
+                status.configure(text=f"Optimizer failed: {job.error}")
+            elif job.best is not None:
+                status.configure(text=status.cget("text") + f" • {job.candidates} candidates tried")
+
+        def apply():
+            job = state["job"]
+            if job is None or job.best is None:
+                return
+            job.cancel()
+            added, unplaced = self.planner.apply_plan(job)
+            close()
+            self.selected_schedule_item = None
+            self.invalidate(*SCHEDULE_VIEWS)
+            if unplaced:
+                names = ", ".join(sorted({name for name, _, _ in unplaced}))
+                messagebox.showinfo("Auto-Schedule", f"Placed {len(added)} activities. No room for: {names}.")
+
+        def close():
+            if state["job"] is not None:
+                state["job"].cancel()
+            win.destroy()
+
+        ttk.Button(btns, text="Search", bootstyle="primary", command=start, width=10).grid(row=0, column=0, padx=4)
+        ttk.Button(btns, text="Apply", bootstyle="success", command=apply, width=10).grid(row=0, column=1, padx=4)
+        ttk.Button(btns, text="Close", bootstyle="secondary", command=close, width=10).grid(row=0, column=2, padx=4)
+        win.protocol("WM_DELETE_WINDOW", close)
+
+    # -----------------------
+    # Undo / redo
+    # -----------------------
+    def undo(self):
+        self._replay(self.planner.history.undo)
+
+    def redo(self):
+        self._replay(self.planner.history.redo)
+
+    def _replay(self, step):
+        try:
+            step()
+        except PlannerError as exc:
+            messagebox.showerror("Undo", str(exc))
+        # the entry may be gone or detached; anything may have changed
+        self.selected_schedule_item = None
+        self.invalidate(*ALL_VIEWS)
+
+    def update_history_buttons(self):
+        history = self.planner.history
+        undo, redo = history.undo_label(), history.redo_label()
+        self.undo_btn.configure(text=f"Undo {undo}"[:18] if undo else "Undo", state="normal" if undo else "disabled")
+        self.redo_btn.configure(text=f"Redo {redo}"[:18] if redo else "Redo", state="normal" if redo else "disabled")
+
+    # -----------------------
+    # Storage / weeks
+    # -----------------------
+    def show_week(self, week):
+        self.planner.set_week(week)
+        self.selected_schedule_item = None
+        self.week_label.configure(text=f"Week of {self.planner.week:%b %d, %Y}")
+        self.invalidate(*SCHEDULE_VIEWS)
+
+    def check_saves(self):
+        self._save_check = self.root.after(SAVE_CHECK_MS, self.check_saves)
+        self.report_failed_saves()
+
+    def report_failed_saves(self):
+        storage = self.planner.storage
+        if storage is None or storage.failed_writes == self._failed_shown:
+            return
+        lost = storage.failed_writes - self._failed_shown
+        self._failed_shown = storage.failed_writes
+        messagebox.showerror("Not saved", f"{lost} change{'s' if lost != 1 else ''} could not be saved "
+                                          f"to the database:\n{storage.error}")
+
+    def on_close(self):
+        if self._reminder_after is not None:
+            self.root.after_cancel(self._reminder_after)
+        if self._save_check is not None:
+            self.root.after_cancel(self._save_check)
+        if self.profiler is not None:
+            self.profiler.close()
+        if self.donut is not None:
+            self.donut.close()
+        self.planner.close()  # commits everything still queued
+        self.report_failed_saves()
+        self.root.destroy()
 
     # -----------------------
     # Helpers to refresh
     # -----------------------
+    def ensure_category(self, name):
+        # id for an existing category, or intern a new one after asking for its color
+        cid = self.planner.categories.id_of(name)
+        if cid is None:
+            color = colorchooser.askcolor(title=f"Pick color for new category '{name}'")[1] or "#999999"
+            cid = self.planner.add_category(name, color)
+        return cid
+
+    def invalidate(self, *views):
+        # mark views dirty; they are repainted together once Tk is idle
+        self._dirty.update(views)
+        if self._flush_id is None:
+            self._flush_id = self.root.after_idle(self.flush_render)
+
+    def flush_render(self):
+        self._flush_id = None
+        dirty, self._dirty = self._dirty, set()
+        painters = {
+            "activities": self.refresh_activity_list,
+            "tiles": self.build_tiles,
+            "canvas": self.draw_canvas,
+            "schedule": self.refresh_schedule_list,
+            "reminders": self.refresh_reminders,
+            "donut": self.draw_donut,
+            "trends": self.draw_trends,
+        }
+        for view in ALL_VIEWS:
+            if view in dirty:
+                painters[view]()
+
     def redraw_canvas(self):
-        self.draw_canvas()
-        self.refresh_schedule_list()
+        self.invalidate("canvas", "schedule")
 
 # -----------------------
 # Run App
 # -----------------------
 if __name__ == "__main__":
+    startup = PhaseTimer(_T0)
+    startup.mark("imports")
     root = tk.Tk()
-    app = PlannerApp(root)
+    startup.mark("tk")
+    planner = Planner(PLANNER_DB)
+    startup.mark("planner")
+    app = PlannerApp(root, planner, Profiler.from_env(), startup)
     root.geometry("1280x880")
     root.mainloop()
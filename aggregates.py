@@ -0,0 +1,58 @@
+# aggregates.py
+
+# -----------------------
+# Running category totals
+# -----------------------
+# Hours per (day, category id) kept up to date by ScheduleStore on every
+# insert, update and delete, with per-day and per-category sums alongside so
+# week, day and single-category reads never walk the schedule. Category ids
+# come from categories.CategoryTable, so the per-category rows are plain
+# lists indexed by id and a rename never touches them.
+_EPS = 1e-9
+
+
+def _bump(row, cid, hours):
+    if cid >= len(row):
+        row.extend([0.0] * (cid + 1 - len(row)))
+    v = row[cid] + hours
+    row[cid] = 0.0 if abs(v) < _EPS else v
+
+
+class CategoryTotals:
+    def __init__(self):
+        self._cells = {}   # day -> [hours by category id]
+        self._by_day = {}  # day -> hours
+        self._by_cat = []  # category id -> hours
+
+    def add(self, day, cid, hours):
+        # pass negative hours to take an entry back out
+        _bump(self._cells.setdefault(day, []), cid, hours)
+        v = self._by_day.get(day, 0.0) + hours
+        self._by_day[day] = 0.0 if abs(v) < _EPS else v
+        _bump(self._by_cat, cid, hours)
+
+    def remove_day(self, day):
+        for cid, hours in enumerate(self._cells.pop(day, [])):
+            if hours:
+                _bump(self._by_cat, cid, -hours)
+        self._by_day.pop(day, None)
+
+    # --- reads ---
+    def week(self):
+        return list(self._by_cat)
+
+    def category(self, cid):
+        return self._by_cat[cid] if cid < len(self._by_cat) else 0.0
+
+    def day(self, day):
+        return self._by_day.get(day, 0.0)
+
+    def day_breakdown(self, day):
+        return list(self._cells.get(day, []))
+
+    def day_category(self, day, cid):
+        row = self._cells.get(day, [])
+        return row[cid] if cid < len(row) else 0.0
+
+    def total(self):
+        return sum(self._by_day.values())
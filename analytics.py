@@ -0,0 +1,254 @@
+# analytics.py
+import math
+from datetime import date, timedelta
+
+import numpy as np
+
+from entries import DAYS, DAY_INDEX
+
+# -----------------------
+# Long-range analytics
+# -----------------------
+# Hours per (day, category) and per (day, category, hour of day) over a span
+# of weeks, held in NumPy arrays with week and month rollups next to them.
+# A span is read from the database once, in vectorized passes (bincount over
+# flattened indexes); after that every store edit patches its day, week and
+# month cells in place, so a query over years is a slice and a sum.
+# Recurring events live in their own layer, recomputed from the rules when
+# one of them changes (they are never stored as entries).
+#
+# Rows are (day ordinal, category id, start, end); day ordinals are
+# date.toordinal() of the entry's date and the span always starts on a Monday.
+HOURS = np.arange(24)
+CHUNK = 1 << 16  # rows per vectorized pass (bounds the rows x 24 temporaries)
+
+
+def _hour_bins(start, end):
+    # hours of each row falling into each hour of the day: (rows, 24)
+    return np.clip(np.minimum(end[:, None], HOURS + 1) - np.maximum(start[:, None], HOURS), 0.0, None)
+
+
+def month_key(d):
+    return d.year * 12 + d.month - 1
+
+
+def month_date(key):
+    return date(key // 12, key % 12 + 1, 1)
+
+
+class _Layer:
+    # hour sums for one source (saved entries or recurring events)
+    def __init__(self, ndays, ncat, nmonths):
+        self.days = np.zeros((ndays, ncat))
+        self.heat = np.zeros((ndays, ncat, 24))
+        self.weeks = np.zeros((ndays // 7, ncat))
+        self.months = np.zeros((nmonths, ncat))
+
+    def resized(self, shift, ndays, ncat, month_of, nmonths):
+        # same sums in a larger span (shift = days added in front) or with more categories
+        new = _Layer(ndays, ncat, nmonths)
+        n, c = self.days.shape
+        new.days[shift:shift + n, :c] = self.days
+        new.heat[shift:shift + n, :c] = self.heat
+        new.weeks[shift // 7:shift // 7 + n // 7, :c] = self.weeks
+        for k in range(ncat):
+            new.months[:, k] = np.bincount(month_of, new.days[:, k], nmonths)
+        return new
+
+    def add_rows(self, d, c, start, end, month_of, sign=1.0):
+        # d: day indexes into the span, c: category ids (int arrays)
+        ndays, ncat = self.days.shape
+        hours = np.maximum(end - start, 0.0) * sign
+        self.days += np.bincount(d * ncat + c, hours, ndays * ncat).reshape(ndays, ncat)
+        self.weeks += np.bincount(d // 7 * ncat + c, hours, self.weeks.size).reshape(self.weeks.shape)
+        self.months += np.bincount(month_of[d] * ncat + c, hours, self.months.size).reshape(self.months.shape)
+        flat = self.heat.reshape(-1)
+        for i in range(0, len(d), CHUNK):
+            cell = (d[i:i + CHUNK] * ncat + c[i:i + CHUNK])[:, None] * 24 + HOURS
+            bins = _hour_bins(start[i:i + CHUNK], end[i:i + CHUNK]) * sign
+            flat += np.bincount(cell.ravel(), bins.ravel(), flat.size)
+
+    def add_one(self, d, c, m, start, end, sign):
+        hours = max(0.0, end - start) * sign
+        self.days[d, c] += hours
+        self.weeks[d // 7, c] += hours
+        self.months[m, c] += hours
+        h0, h1 = max(0, int(start)), min(24, int(math.ceil(end)))
+        if h1 > h0:
+            hs = HOURS[h0:h1]
+            self.heat[d, c, h0:h1] += np.clip(np.minimum(end, hs + 1) - np.maximum(start, hs), 0.0, None) * sign
+
+
+class Analytics:
+    def __init__(self, stored_rows, rule_rows):
+        # stored_rows(first, last) / rule_rows(first, last): rows of saved entries /
+        # recurring occurrences in weeks first..last (Mondays, inclusive)
+        self._stored_rows = stored_rows
+        self._rule_rows = rule_rows
+        self.first = None  # Monday of the first week covered
+        self.last = None  # Monday of the last week covered
+        self.ncat = 0
+        self.month_of = np.zeros(0, dtype=np.intp)  # day index -> month index
+        self.month0 = 0  # month_key of month index 0
+        self._stored = _Layer(0, 0, 0)
+        self._rules = _Layer(0, 0, 0)
+        self._rules_dirty = True
+        self.stale = False  # set when the database changed behind the stores (imports)
+
+    # --- span ---
+    @property
+    def ndays(self):
+        return 0 if self.first is None else (self.last - self.first).days + 7
+
+    def _resize(self, first, last, ncat):
+        shift = 0 if self.first is None else (self.first - first).days
+        ndays = (last - first).days + 7
+        self.month0 = month_key(first)
+        self.month_of = np.array([month_key(first + timedelta(days=i)) - self.month0 for i in range(ndays)],
+                                 dtype=np.intp)  # a few thousand days at most
+        nmonths = int(self.month_of[-1]) + 1
+        self._stored = self._stored.resized(shift, ndays, ncat, self.month_of, nmonths)
+        self._rules = _Layer(ndays, ncat, nmonths)
+        self._rules_dirty = True
+        self.first, self.last, self.ncat = first, last, ncat
+
+    def _add(self, layer, rows):
+        d = rows[:, 0].astype(np.intp) - self.first.toordinal()
+        c = rows[:, 1].astype(np.intp)
+        layer.add_rows(d, c, rows[:, 2], rows[:, 3], self.month_of)
+
+    def cover(self, first, last):
+        # count weeks first..last too; only weeks not counted yet are read
+        if self.stale:
+            self.first, self.stale = None, False
+            self._stored = _Layer(0, 0, 0)
+        if self.first is not None and self.first <= first and last <= self.last:
+            return
+        old = (self.first, self.last)
+        new_first = first if self.first is None else min(first, self.first)
+        new_last = last if self.last is None else max(last, self.last)
+        rows = []
+        if old[0] is None:
+            rows.append((new_first, new_last))
+        else:
+            if new_first < old[0]:
+                rows.append((new_first, old[0] - timedelta(days=7)))
+            if new_last > old[1]:
+                rows.append((old[1] + timedelta(days=7), new_last))
+        loaded = [np.array(self._stored_rows(a, b), dtype=float).reshape(-1, 4) for a, b in rows]
+        ncat = max([self.ncat] + [int(r[:, 1].max()) + 1 for r in loaded if len(r)])
+        self._resize(new_first, new_last, ncat)
+        for r in loaded:
+            if len(r):
+                self._add(self._stored, r)
+
+    def _ensure_category(self, cid):
+        if cid >= self.ncat:
+            self._resize(self.first, self.last, cid + 1)
+
+    def _ready(self, first, last):
+        self.cover(first, last)
+        if self._rules_dirty:
+            rows = np.array(self._rule_rows(self.first, self.last), dtype=float).reshape(-1, 4)
+            if len(rows) and int(rows[:, 1].max()) >= self.ncat:
+                self._resize(self.first, self.last, int(rows[:, 1].max()) + 1)
+            self._rules = _Layer(*self._stored.days.shape, len(self._stored.months))
+            if len(rows):
+                self._add(self._rules, rows)
+            self._rules_dirty = False
+
+    # --- incremental updates ---
+    def watch(self, store):
+        # patch the saved-entry sums on every edit of one week's store
+        week = store.week.toordinal()
+        spans = {}  # id(entry) -> (day ordinal, category, start, end) as last counted
+
+        def span(e):
+            return (week + DAY_INDEX[e.day], e.category, e.start, e.end)
+
+        for day in DAYS:
+            for e in store.day_entries(day):
+                if e.rule is None:
+                    spans[id(e)] = span(e)
+
+        def on_change(op, payload):
+            if op == "clear_day":
+                for e in payload[1]:
+                    old = spans.pop(id(e), None)
+                    if old is not None:
+                        self._apply(old, -1.0)
+                return
+            if op == "restore_day":
+                for e in payload[1]:
+                    if e.rule is None:
+                        new = spans[id(e)] = span(e)
+                        self._apply(new, 1.0)
+                return
+            if payload.rule is not None:
+                return  # occurrences are counted from the rules
+            old = spans.pop(id(payload), None)
+            if old is not None:
+                self._apply(old, -1.0)
+            if op != "remove":
+                new = spans[id(payload)] = span(payload)
+                self._apply(new, 1.0)
+
+        store.listeners.append(on_change)
+        store.analytics = self
+
+    def _apply(self, row, sign):
+        ordinal, cid, start, end = row
+        if self.first is None or self.stale:
+            return
+        d = ordinal - self.first.toordinal()
+        if not 0 <= d < self.ndays:
+            return  # counted when its week is first covered
+        self._ensure_category(cid)
+        self._stored.add_one(d, cid, int(self.month_of[d]), start, end, sign)
+
+    def rules_changed(self, op, rule):
+        # RecurrenceEngine listener
+        self._rules_dirty = True
+
+    # --- queries (weeks are Mondays, inclusive) ---
+    def _days(self, first, last):
+        self._ready(first, last)
+        return (first - self.first).days, (last - self.first).days + 7
+
+    def weekly(self, first, last):
+        # [weeks, categories] hours
+        d0, d1 = self._days(first, last)
+        return self._stored.weeks[d0 // 7:d1 // 7] + self._rules.weeks[d0 // 7:d1 // 7]
+
+    def daily(self, first, last):
+        # [days, categories] hours
+        d0, d1 = self._days(first, last)
+        return self._stored.days[d0:d1] + self._rules.days[d0:d1]
+
+    def monthly(self, first_month, last_month):
+        # ([month start dates], [months, categories] hours) for whole calendar months
+        last_day = month_date(month_key(last_month) + 1) - timedelta(days=1)
+        first = first_month.replace(day=1)
+        self._ready(first - timedelta(days=first.weekday()), last_day - timedelta(days=last_day.weekday()))
+        m0, m1 = month_key(first) - self.month0, month_key(last_day) - self.month0 + 1
+        months = [month_date(self.month0 + m) for m in range(m0, m1)]
+        return months, self._stored.months[m0:m1] + self._rules.months[m0:m1]
+
+    def heatmap(self, first, last, cid=None):
+        # [weekday, hour of day] hours over the weeks, for one category or all
+        d0, d1 = self._days(first, last)
+        out = np.zeros((7, 24))
+        if cid is not None and cid >= self.ncat:
+            return out
+        for layer in (self._stored, self._rules):
+            heat = layer.heat[d0:d1]
+            heat = heat.sum(axis=1) if cid is None else heat[:, cid]
+            out += heat.reshape(-1, 7, 24).sum(axis=0)
+        return out
+
+    def versus(self, targets, first, last):
+        # {category id: (target hours, actual hours)} over the weeks; targets are per week
+        weeks = self.weekly(first, last)
+        actual = weeks.sum(axis=0)
+        return {cid: (goal * len(weeks), float(actual[cid]) if cid < len(actual) else 0.0)
+                for cid, goal in targets.items()}
@@ -0,0 +1,361 @@
+# benchmarks.py
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from conflicts import overlap_counts
+from entries import DAYS, Entry, columns
+from planner_core import DAY_END, DAY_START, Planner, PlannerError, format_time
+from reminders import Reminder, ReminderQueue
+from schedule_store import ScheduleStore
+from virtual_list import VirtualList
+from week_renderer import HEADER_H, week_geometry
+
+# -----------------------
+# Benchmark suite
+# -----------------------
+# Times the scheduling, aggregation and rendering hot paths against synthetic
+# weeks of 10^2, 10^4 and 10^6 entries and writes the results as JSON, so two
+# runs (e.g. before/after a commit) can be diffed with --compare:
+#
+#   python benchmarks.py --out before.json
+#   python benchmarks.py --out after.json --compare before.json
+#
+# Canvas benchmarks need a display: an existing $DISPLAY is used, otherwise a
+# virtual one is started through xvfbwrapper if it (and Xvfb) are installed;
+# without either they are reported as skipped.
+#
+# Each size also reports memory: bytes per entry of the Entry objects, of a
+# ScheduleStore's day index over them, of the packed columns(), and of a
+# store loaded with from_rows() (packed days, as storage loads weeks).
+SIZES = (100, 10_000, 1_000_000)
+SEED = 1234
+DURATIONS = (0.25, 0.5, 1.0, 1.5, 2.0)
+CANVAS_W = 420
+CANVAS_H = 720
+LIST_ROWS = 16  # visible rows of the schedule list
+
+
+def synthetic_planner(n, seed=SEED):
+    # in-memory planner whose current week holds n random entries
+    rng = random.Random(seed)
+    planner = Planner()
+    store = planner.schedule
+    for day in DAYS:
+        planner.clear_day(day)
+    cids = planner.categories.ids()
+    rows = []
+    for i in range(n):
+        start = rng.randrange(0, 24 * 12) / 12  # 5-minute grid
+        rows.append((rng.randrange(7), start, min(24.0, start + rng.choice(DURATIONS)),
+                     f"Task {i}", rng.choice(cids)))
+    rows.sort()  # appending in start order keeps store inserts cheap
+    for d, start, end, name, cid in rows:
+        planner.add_entry(DAYS[d], start, end, name, cid, week=store.week)
+    planner.history.clear()  # setup is not something to undo
+    return planner
+
+
+def memory_footprint(n, seed=SEED):
+    # bytes per entry, traced with tracemalloc (names repeat, as in real schedules)
+    rng = random.Random(seed)
+    rows = sorted((rng.randrange(7), rng.randrange(0, 24 * 12) / 12, f"Task {i % 500}") for i in range(n))
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        entries = [Entry(DAYS[d], start, min(24.0, start + 1.0), name, 0) for d, start, name in rows]
+        objects = tracemalloc.get_traced_memory()[0]
+        store = ScheduleStore(entries)
+        indexed = tracemalloc.get_traced_memory()[0]
+        cols = columns(entries)
+        packed = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del store, cols, entries
+    # a store loaded from rows, as storage builds every week: days stay packed
+    db_rows = [(i + 1, d, start, min(24.0, start + 1.0), name, 0, 0) for i, (d, start, name) in enumerate(rows)]
+    ScheduleStore.from_rows(db_rows[:1])  # imports NumPy (if installed) outside the trace
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        store = ScheduleStore.from_rows(db_rows)
+        loaded = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del store
+    return {"entry_objects": (objects - base) / n, "store_index": (indexed - objects) / n,
+            "columns": (packed - indexed) / n, "packed_store": (loaded - base) / n}
+
+
+def week_entries(store):
+    return [e for d in DAYS for e in store.day_entries(d)]
+
+
+def measure(fn, repeat, setup=None):
+    # best/median/mean seconds per call; fast calls are looped timeit-style
+    if setup is not None:
+        times = []
+        for _ in range(repeat):
+            setup()
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        number = 1
+    else:
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        times = [t / number for t in timer.repeat(repeat, number)]
+    times.sort()
+    return {"min": times[0], "median": times[len(times) // 2],
+            "mean": sum(times) / len(times), "loops": number, "repeat": repeat}
+
+
+# --- individual benchmarks (each returns {name: fn} for one planner) ---
+def core_benchmarks(planner):
+    day = "W"
+    acts = list(planner.activities)
+
+    def place():
+        # add_activity_to_day followed by undoing it, so the week stays the same
+        # (dense days have no free slot; then this times the failed search)
+        try:
+            e = planner.place_activity(acts[0], day)
+        except PlannerError:
+            return
+        planner.remove_entry(e)
+
+    # as many pending reminders as the week has entries
+    queue = ReminderQueue()
+    pending = [Reminder("r") for _ in range(len(planner.schedule))]
+    for i, r in enumerate(pending):
+        queue.push(r, float(i))
+    probe = Reminder("probe")
+
+    def reschedule():
+        queue.push(probe, len(pending) / 2)
+        queue.cancel(probe)
+
+    benches = {
+        "compute_totals": planner.totals,
+        "find_slot": lambda: planner.find_slot(day, 1.0),
+        "find_slot_best_fit": lambda: planner.find_slot(day, 1.0, best_fit=True),
+        "place_activity": place,
+        "conflict_counts": lambda: [overlap_counts(planner.schedule.day_entries(d)) for d in DAYS],
+        "would_conflict": lambda: planner.conflicts(day, 12.0, 12.5),
+        "week_geometry": lambda: week_geometry(columns(week_entries(planner.schedule)), DAY_START, DAY_END,
+                                               HEADER_H, (CANVAS_H - HEADER_H) / (DAY_END - DAY_START)),
+        "schedule_list_rows": lambda: VirtualList.window(planner.schedule.day_entries(day), 0, LIST_ROWS,
+                                                         planner.entry_label),
+        "reminder_add_cancel": reschedule,
+    }
+    try:
+        import numpy  # noqa: F401  (analytics needs it)
+    except ImportError:
+        return benches
+    benches["weekly_hours_year"] = lambda: planner.weekly_hours(52)
+    benches["time_heatmap_year"] = lambda: planner.time_heatmap(52)
+    return benches
+
+
+def donut_benchmarks(planner):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from donut_chart import _DonutArtist
+
+    fig = Figure(figsize=(4, 2.8), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    artist = _DonutArtist(fig)
+    artist.update(*planner.chart_data())
+    canvas.draw()
+
+    def draw():
+        artist.update(*planner.chart_data())
+        canvas.draw()
+
+    def cold():
+        # a fresh artist: pie() + tight_layout, as on the first paint
+        fresh = _DonutArtist(Figure(figsize=(4, 2.8), dpi=100))
+        fresh.update(*planner.chart_data())
+        FigureCanvasAgg(fresh.fig).draw()
+
+    return {"draw_donut": draw, "draw_donut_cold": cold}
+
+
+class _Display:
+    # context manager yielding None, or the reason canvas benchmarks are skipped
+    def __enter__(self):
+        self.vdisplay = None
+        if os.environ.get("DISPLAY"):
+            return None
+        try:
+            from xvfbwrapper import Xvfb
+        except ImportError:
+            return "no $DISPLAY and xvfbwrapper is not installed"
+        try:
+            self.vdisplay = Xvfb(width=1280, height=900)
+            self.vdisplay.start()
+        except (OSError, RuntimeError) as exc:
+            self.vdisplay = None
+            return f"could not start Xvfb: {exc}"
+        return None
+
+    def __exit__(self, *exc):
+        if self.vdisplay is not None:
+            self.vdisplay.stop()
+
+
+def canvas_benchmarks(planner, root):
+    import tkinter as tk
+    from canvas_renderer import DayCanvasRenderer
+    from week_renderer import WeekCanvasRenderer
+
+    day = "W"
+    store = planner.schedule
+    color = planner.categories.color
+    color_of = lambda e: color(e.category)
+    state = {}
+
+    def fresh():
+        if "canvas" in state:
+            state["canvas"].destroy()
+            state["week_canvas"].destroy()
+        canvas = state["canvas"] = tk.Canvas(root, width=CANVAS_W, height=CANVAS_H)
+        canvas.pack(side="left")
+        state["renderer"] = DayCanvasRenderer(canvas, CANVAS_W, CANVAS_H, ("Segoe UI", 10),
+                                              ("Segoe UI", 11, "bold"), format_time, lambda e: None)
+        week_canvas = state["week_canvas"] = tk.Canvas(root, width=CANVAS_W, height=CANVAS_H)
+        week_canvas.pack(side="left")
+        state["week"] = WeekCanvasRenderer(week_canvas, CANVAS_W, CANVAS_H, ("Segoe UI", 11, "bold"), format_time,
+                                           lambda d, e: None)
+
+    def render():
+        state["renderer"].render(day, store.day_entries(day), color_of)
+        root.update_idletasks()
+
+    def render_week():
+        state["week"].render(week_entries(store), color_of)
+        root.update_idletasks()
+
+    def one_change():
+        # move one visible entry back and forth, as an edit would
+        e = next(e for e in store.day_entries(day) if DAY_START <= e.start < DAY_END - 1)
+        planner.update_entry(e, start=e.start + 0.5, end=e.end + 0.5)
+        render()
+        planner.update_entry(e, start=e.start - 0.5, end=e.end - 0.5)
+        render()
+
+    fresh()
+    render()
+    render_week()
+    return {
+        "draw_canvas_cold": (render, fresh),
+        "draw_canvas_unchanged": render,
+        "draw_canvas_one_change": one_change,
+        "draw_week_cold": (render_week, fresh),
+        "draw_week_unchanged": render_week,
+    }, lambda: (state["canvas"].destroy(), state["week_canvas"].destroy())
+
+
+def run(sizes, repeat, include_canvas=True, log=print):
+    results = []
+    memory = []
+    skipped = {}
+
+    def record(name, n, spec):
+        fn, setup = spec if isinstance(spec, tuple) else (spec, None)
+        stats = measure(fn, repeat, setup)
+        results.append(dict(bench=name, size=n, **stats))
+        log(f"{name:<24}{n:>10}  {stats['median'] * 1e3:10.3f} ms")
+
+    with _Display() as no_display:
+        root = None
+        if include_canvas and no_display is None:
+            import tkinter as tk
+            root = tk.Tk()
+        elif include_canvas:
+            skipped["draw_canvas"] = no_display
+        for n in sizes:
+            t0 = time.perf_counter()
+            planner = synthetic_planner(n)
+            log(f"-- {n} entries (built in {time.perf_counter() - t0:.2f}s)")
+            per_entry = memory_footprint(n)
+            memory.append(dict(size=n, **per_entry))
+            log("memory per entry: " + ", ".join(f"{k} {v:.1f} B" for k, v in per_entry.items()))
+            for name, spec in core_benchmarks(planner).items():
+                record(name, n, spec)
+            for name, spec in donut_benchmarks(planner).items():
+                record(name, n, spec)
+            if root is not None:
+                specs, teardown = canvas_benchmarks(planner, root)
+                for name, spec in specs.items():
+                    record(name, n, spec)
+                teardown()
+        if root is not None:
+            root.destroy()
+    return results, memory, skipped
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(results, baseline_path, log=print):
+    with open(baseline_path, encoding="utf-8") as fh:
+        base = {(r["bench"], r["size"]): r["median"] for r in json.load(fh)["results"]}
+    log(f"\n{'benchmark':<24}{'size':>10}{'before ms':>12}{'after ms':>12}{'ratio':>8}")
+    for r in results:
+        old = base.get((r["bench"], r["size"]))
+        if old:
+            log(f"{r['bench']:<24}{r['size']:>10}{old * 1e3:12.3f}{r['median'] * 1e3:12.3f}{r['median'] / old:8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily Planner benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-canvas", action="store_true", help="skip the Tk canvas benchmarks")
+    parser.add_argument("--out", help="write JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier JSON output to compare medians with")
+    args = parser.parse_args(argv)
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    results, memory, skipped = run(args.sizes, args.repeat, not args.no_canvas, log)
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "skipped": skipped,
+        },
+        "results": results,
+        "memory": memory,  # bytes per entry
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        compare(results, args.compare, log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
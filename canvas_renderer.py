@@ -0,0 +1,247 @@
+# canvas_renderer.py
+
+# -----------------------
+# Retained-mode day canvas
+# -----------------------
+# The hour grid is drawn once. Every schedule entry owns three canvas items
+# (block, name, duration); render() diffs the day's entries against what is
+# already on the canvas and only creates, moves, recolors or deletes items
+# for entries that actually changed. Entries that overlap another one get a
+# red outline.
+#
+# Blocks can be dragged to move them or dragged by their top/bottom edge to
+# resize them. While dragging, only the dragged block's three items are
+# moved (and only when the snapped time changes); the store is updated once,
+# through on_drop, when the button is released. The pointer has to travel
+# DRAG_PX before a drag starts, and the offset from the press is what gets
+# snapped, so click jitter never moves a block and an off-grid block keeps its
+# minutes. A press and release without movement is a click and goes to
+# on_select.
+TOP_PAD = 8
+LABEL_W = 78
+DAY_START = 8.0
+HOUR_COUNT = 12  # 8 AM - 8 PM
+GRID_COLOR = "#e6e9ee"
+CONFLICT_COLOR = "#d9534f"
+EDGE_PX = 6  # grab zone at a block's top/bottom edge for resizing
+DRAG_PX = 4  # pointer travel before a press becomes a drag
+
+
+class DayCanvasRenderer:
+    def __init__(self, canvas, width, height, font, font_bold, format_time, on_select,
+                 on_drop=None, snap_minutes=15):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.font = font
+        self.font_bold = font_bold
+        self.format_time = format_time
+        self.on_select = on_select
+        self.on_drop = on_drop  # on_drop(entry, start, end) after a drag
+        self.snap = snap_minutes / 60.0
+        self.items = {}  # id(entry) -> [entry, rect, name_id, dur_id, last_state]
+        self.owner = {}  # canvas item -> id(entry)
+        self.footer = None
+        self.drag = None  # [slot, mode, press y, start, end, dragging] while a block is pressed
+        self._tip = None
+        self._grid_drawn = False
+        # bound once on the tag; covers blocks created later too
+        canvas.tag_bind("entry", "<ButtonPress-1>", self._press)
+        canvas.tag_bind("entry", "<B1-Motion>", self._motion)
+        canvas.tag_bind("entry", "<ButtonRelease-1>", self._release)
+        canvas.tag_bind("entry", "<Motion>", self._hover)
+        canvas.tag_bind("entry", "<Leave>", lambda ev: canvas.configure(cursor=""))
+
+    # --- geometry ---
+    def span_y(self, start, end):
+        s = max(DAY_START, start)
+        t = min(DAY_START + HOUR_COUNT, end)
+        if t <= DAY_START or s >= DAY_START + HOUR_COUNT:
+            return None
+        h = self.height - 2 * TOP_PAD
+        return (TOP_PAD + (s - DAY_START) / HOUR_COUNT * h,
+                TOP_PAD + (t - DAY_START) / HOUR_COUNT * h)
+
+    def hour_at(self, y):
+        frac = (y - TOP_PAD) / (self.height - 2 * TOP_PAD)
+        return DAY_START + frac * HOUR_COUNT
+
+    def entry_at(self, x, y):
+        # entry whose block is under the point, if any
+        for item in reversed(self.canvas.find_overlapping(x, y, x, y)):
+            key = self.owner.get(item)
+            if key is not None:
+                return self.items[key][0]
+        return None
+
+    def _place(self, slot, y1, y2):
+        c = self.canvas
+        x1 = LABEL_W + 8
+        x2 = self.width - 12
+        _, rect, name_id, dur_id, _ = slot
+        c.coords(rect, x1, y1+3, x2, y2-3)
+        c.coords(name_id, x1 + 8, (y1 + y2)/2)
+        c.coords(dur_id, x2-28, (y1 + y2)/2)
+
+    # --- static layer ---
+    def draw_grid(self):
+        if self._grid_drawn:
+            return
+        c = self.canvas
+        hour_h = (self.height - 2 * TOP_PAD) / HOUR_COUNT
+        c.create_rectangle(0, 0, self.width, self.height, fill="white", outline="", tags=("grid",))
+        for i in range(HOUR_COUNT):
+            y1 = TOP_PAD + i * hour_h
+            y2 = y1 + hour_h
+            c.create_line(LABEL_W, y1, self.width, y1, fill=GRID_COLOR, tags=("grid",))
+            c.create_text(LABEL_W/2, (y1 + y2)/2, text=self.format_time(int(DAY_START) + i), font=self.font, tags=("grid",))
+        c.create_line(LABEL_W, TOP_PAD, LABEL_W, self.height - TOP_PAD, fill=GRID_COLOR, width=1, tags=("grid",))
+        self.footer = c.create_text(self.width/2, self.height-10, text="", font=("Segoe UI", 9), fill="#6c757d", tags=("footer",))
+        self._grid_drawn = True
+
+    # --- entries ---
+    def render(self, day, entries, color_of, conflicted=None, conflict_count=0):
+        self.draw_grid()
+        c = self.canvas
+        x1 = LABEL_W + 8
+        x2 = self.width - 12
+        seen = set()
+        created = False
+        for e in entries:
+            ys = self.span_y(e.start, e.end)
+            if ys is None:
+                continue
+            key = id(e)
+            seen.add(key)
+            y1, y2 = ys
+            color = color_of(e)
+            dur_text = f"{max(0, e.end - e.start):.1f}h"
+            clash = conflicted is not None and conflicted(e)
+            state = (y1, y2, e.name, color, dur_text, clash)
+            slot = self.items.get(key)
+            if slot is None:
+                rect = c.create_rectangle(x1, y1+3, x2, y2-3, fill=color, outline=CONFLICT_COLOR if clash else "#2b2b2b",
+                                          width=2 if clash else 0, tags=("entry",))
+                name_id = c.create_text(x1 + 8, (y1 + y2)/2, anchor="w", text=e.name, font=self.font_bold, fill="#102030", tags=("entry",))
+                dur_id = c.create_text(x2-28, (y1+y2)/2, text=dur_text, font=("Segoe UI", 9), fill="#fff", tags=("entry",))
+                self.items[key] = [e, rect, name_id, dur_id, state]
+                self.owner[rect] = self.owner[name_id] = self.owner[dur_id] = key
+                created = True
+                continue
+            old = slot[4]
+            if old == state:
+                continue
+            _, rect, name_id, dur_id, _ = slot
+            if old[:2] != state[:2]:
+                self._place(slot, y1, y2)
+            if old[2] != state[2]:
+                c.itemconfigure(name_id, text=state[2])
+            if old[3] != state[3]:
+                c.itemconfigure(rect, fill=state[3])
+            if old[4] != state[4]:
+                c.itemconfigure(dur_id, text=state[4])
+            if old[5] != state[5]:
+                c.itemconfigure(rect, outline=CONFLICT_COLOR if clash else "#2b2b2b", width=2 if clash else 0)
+            slot[4] = state
+        for key in [k for k in self.items if k not in seen]:
+            _, rect, name_id, dur_id, _ = self.items.pop(key)
+            c.delete(rect, name_id, dur_id)
+            for item in (rect, name_id, dur_id):
+                del self.owner[item]
+        if created:
+            c.tag_raise("footer")
+        overlaps = f" • {conflict_count} overlap{'s' if conflict_count != 1 else ''}" if conflict_count else ""
+        c.itemconfigure(self.footer, text=f"Day: {day} • Click a block to select, drag to move or resize{overlaps}",
+                        fill=CONFLICT_COLOR if conflict_count else "#6c757d")
+
+    # --- dragging ---
+    def _zone(self, slot, y):
+        y1, y2 = self.canvas.coords(slot[1])[1::2]
+        if y2 - y1 > 3 * EDGE_PX:
+            if y - y1 < EDGE_PX:
+                return "top"
+            if y2 - y < EDGE_PX:
+                return "bottom"
+        return "move"
+
+    def _slot_at_current(self):
+        current = self.canvas.find_withtag("current")
+        key = self.owner.get(current[0]) if current else None
+        return self.items.get(key) if key is not None else None
+
+    def _hover(self, ev):
+        if self.drag is not None:
+            return
+        slot = self._slot_at_current()
+        if slot is not None:
+            zone = self._zone(slot, ev.y)
+            self.canvas.configure(cursor="fleur" if zone == "move" else "sb_v_double_arrow")
+
+    def _press(self, ev):
+        slot = self._slot_at_current()
+        if slot is None:
+            return
+        e = slot[0]
+        self.drag = [slot, self._zone(slot, ev.y), ev.y, e.start, e.end, False]
+        c = self.canvas
+        c.tag_raise(slot[1])
+        c.tag_raise(slot[2])
+        c.tag_raise(slot[3])
+
+    def _snapped(self, h):
+        return round(h / self.snap) * self.snap
+
+    def _motion(self, ev):
+        drag = self.drag
+        if drag is None:
+            return
+        slot, mode, y0 = drag[:3]
+        if not drag[5]:
+            if abs(ev.y - y0) < DRAG_PX:
+                return  # still a click
+            drag[5] = True
+        e = slot[0]
+        dh = self._snapped((ev.y - y0) / (self.height - 2 * TOP_PAD) * HOUR_COUNT)
+        lo, hi = DAY_START, DAY_START + HOUR_COUNT
+        if mode == "move":
+            dur = e.end - e.start
+            start = min(max(lo, e.start + dh), hi - dur)
+            end = start + dur
+        elif mode == "top":
+            start, end = min(max(lo, e.start + dh), e.end - self.snap), e.end
+        else:
+            start, end = e.start, max(min(hi, e.end + dh), e.start + self.snap)
+        if (start, end) == (drag[3], drag[4]):
+            return  # same snapped position: nothing to redraw
+        drag[3], drag[4] = start, end
+        ys = self.span_y(start, end)
+        if ys is None:
+            return
+        c = self.canvas
+        self._place(slot, *ys)
+        c.itemconfigure(slot[3], text=f"{end - start:.1f}h")
+        tip = f"{self.format_time(start)} - {self.format_time(end)}"
+        if self._tip is None:
+            self._tip = c.create_text(self.width - 16, 0, anchor="se", text=tip, font=("Segoe UI", 9, "bold"),
+                                      fill="#102030", tags=("tip",))
+        else:
+            c.itemconfigure(self._tip, text=tip)
+        c.coords(self._tip, self.width - 16, max(ys[0], TOP_PAD + 14))
+        c.tag_raise(self._tip)
+
+    def _release(self, ev):
+        drag, self.drag = self.drag, None
+        if drag is None:
+            return
+        if self._tip is not None:
+            self.canvas.delete(self._tip)
+            self._tip = None
+        slot, start, end = drag[0], drag[3], drag[4]
+        e = slot[0]
+        if (start, end) == (e.start, e.end):
+            self.on_select(e)
+            return
+        # the items were moved by hand; make the next render() re-apply everything
+        slot[4] = (None,) * len(slot[4])
+        if self.on_drop is not None:
+            self.on_drop(e, start, end)
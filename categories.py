@@ -0,0 +1,106 @@
+# categories.py
+import threading
+
+# -----------------------
+# Interned categories
+# -----------------------
+# Each category name is interned once to a small integer id. Schedule entries
+# and activities store the id, so renaming or recoloring is a single slot
+# write in the palette table, and totals / color lookups index plain lists.
+# Removed categories keep their id (entries still point at it) but stop being
+# listed and fall back to DEFAULT_COLOR. A live category may take a removed
+# one's name; the name then resolves to the live id (also after a reload).
+DEFAULT_COLOR = "#999999"
+
+
+class CategoryTable:
+    def __init__(self, colors=None):
+        self.names = []
+        self.colors = []
+        self.active = []
+        self._ids = {}
+        self._lock = threading.Lock()  # importers may intern from a worker thread
+        for name, color in (colors or {}).items():
+            self.intern(name, color)
+
+    def load_rows(self, rows):
+        # replace the table in place from (id, name, color, active) rows ordered by id
+        with self._lock:
+            self.names = [r[1] for r in rows]
+            self.colors = [r[2] for r in rows]
+            self.active = [bool(r[3]) for r in rows]
+            self._ids = {}
+            for cid, name in enumerate(self.names):
+                # a live category wins its name over removed ones
+                held = self._ids.get(name)
+                if held is None or self.active[cid] or not self.active[held]:
+                    self._ids[name] = cid
+
+    def intern(self, name, color=None):
+        with self._lock:
+            cid = self._ids.get(name)
+            if cid is None:
+                cid = self._ids[name] = len(self.names)
+                self.names.append(name)
+                self.colors.append(color or DEFAULT_COLOR)
+                self.active.append(True)
+            elif not self.active[cid]:
+                # re-adding a removed category revives its id (and its entries),
+                # in its old color unless a new one is given
+                self.active[cid] = True
+                if color:
+                    self.colors[cid] = color
+            return cid
+
+    def __contains__(self, name):
+        cid = self._ids.get(name)
+        return cid is not None and self.active[cid]
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_of(self, name):
+        cid = self._ids.get(name)
+        return cid if cid is not None and self.active[cid] else None
+
+    def slot(self, name):
+        # id the name resolves to, removed categories included
+        return self._ids.get(name)
+
+    def name(self, cid):
+        return self.names[cid]
+
+    def color(self, cid):
+        return self.colors[cid] if self.active[cid] else DEFAULT_COLOR
+
+    def ids(self):
+        return [cid for cid, on in enumerate(self.active) if on]
+
+    def palette(self):
+        # (name, color) for every id, removed categories in DEFAULT_COLOR as drawn
+        return [(self.names[cid], self.color(cid)) for cid in range(len(self.names))]
+
+    def items(self):
+        return [(cid, self.names[cid], self.colors[cid]) for cid in self.ids()]
+
+    # --- edits (no entry rewriting) ---
+    def rename(self, cid, new):
+        if new in self and self._ids[new] != cid:
+            raise ValueError(f"category '{new}' already exists")
+        with self._lock:
+            old = self.names[cid]
+            if self._ids.get(old) == cid:
+                del self._ids[old]
+                # hand the old name back to a removed category that had it
+                for other in range(len(self.names) - 1, -1, -1):
+                    if other != cid and self.names[other] == old:
+                        self._ids[old] = other
+                        break
+            self._ids[new] = cid  # takes the name over from a removed category, if any
+            self.names[cid] = new
+
+    def recolor(self, cid, color):
+        self.colors[cid] = color
+
+    def remove(self, cid):
+        self.active[cid] = False
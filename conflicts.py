@@ -0,0 +1,122 @@
+# conflicts.py
+import heapq
+from bisect import bisect_left, bisect_right
+
+# -----------------------
+# Overlap detection
+# -----------------------
+# sweep() lists every overlapping pair in one day in O(n log n + k): entries
+# are visited in start order while a heap holds the ones still running, so
+# each entry is only compared with entries it actually overlaps.
+# ConflictIndex keeps a live overlap count per entry for a whole
+# ScheduleStore (built in O(n log n) without listing pairs, so memory stays
+# O(n) even for dense weeks). It listens to store changes and only touches the
+# entries overlapping the changed span, found with the store's bisect-based
+# overlapping() query.
+
+
+def sweep(entries):
+    # entries ordered by start (as ScheduleStore.day_entries returns them)
+    pairs = []
+    active = []  # heap of (end, seq, entry)
+    for seq, e in enumerate(entries):
+        while active and active[0][0] <= e.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            pairs.append((other, e))
+        heapq.heappush(active, (e.end, seq, e))
+    return pairs
+
+
+def overlap_counts(entries):
+    # {entry: number of others it overlaps} for one day, conflicted entries only;
+    # starts before e.end minus ends at or before e.start counts e's overlaps (and e)
+    starts = sorted(e.start for e in entries)
+    ends = sorted(e.end for e in entries)
+    counts = {}
+    for e in entries:
+        n = bisect_left(starts, e.end) - bisect_right(ends, e.start) - 1
+        if n:
+            counts[e] = n
+    return counts
+
+
+class ConflictIndex:
+    def __init__(self, store):
+        self.store = store
+        self.counts = {}  # entry -> overlaps (only entries with conflicts)
+        self.spans = {}  # entry -> (day, start, end) it was counted at
+        for day in store.days():
+            for e, n in overlap_counts(store.day_entries(day)).items():
+                self.counts[e] = n
+                self.spans[e] = (e.day, e.start, e.end)
+        store.listeners.append(self._on_change)
+
+    def _bump(self, e, delta):
+        n = self.counts.get(e, 0) + delta
+        if n > 0:
+            self.counts[e] = n
+            self.spans[e] = (e.day, e.start, e.end)
+        else:
+            self.counts.pop(e, None)
+            self.spans.pop(e, None)
+
+    def _leave(self, e):
+        # e no longer occupies the span it was counted at (removed or moved)
+        span = self.spans.pop(e, None)
+        if span is None:
+            return  # it overlapped nothing
+        del self.counts[e]
+        for other in self.store.overlapping(*span):
+            if other is not e:
+                self._bump(other, -1)
+
+    def _enter(self, e):
+        n = 0
+        for other in self.store.overlapping(e.day, e.start, e.end):
+            if other is not e:
+                self._bump(other, 1)
+                n += 1
+        self._bump(e, n)
+
+    def _on_change(self, op, payload):
+        if op == "clear_day":
+            for e in payload[1]:
+                self.counts.pop(e, None)  # everything it overlapped went with it
+                self.spans.pop(e, None)
+        elif op == "restore_day":
+            # a whole batch came back at once; recount the day in one sweep
+            day = payload[0]
+            for e, n in overlap_counts(self.store.day_entries(day)).items():
+                self.counts[e] = n
+                self.spans[e] = (e.day, e.start, e.end)
+        elif op == "add":
+            self._enter(payload)
+        elif op == "remove":
+            self._leave(payload)
+        elif op == "update":
+            self._leave(payload)
+            self._enter(payload)
+
+    # --- queries ---
+    def __len__(self):
+        # number of overlapping pairs
+        return sum(self.counts.values()) // 2
+
+    def is_conflicted(self, e):
+        return e in self.counts
+
+    def conflicts_of(self, e):
+        if e not in self.counts:
+            return []
+        return [o for o in self.store.overlapping(e.day, e.start, e.end) if o is not e]
+
+    def day_count(self, day):
+        # overlapping pairs on one day
+        counts = self.counts
+        return sum(counts.get(e, 0) for e in self.store.day_entries(day)) // 2
+
+    def day_pairs(self, day):
+        if not self.day_count(day):
+            return []
+        return sweep(self.store.day_entries(day))
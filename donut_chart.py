@@ -0,0 +1,224 @@
+# donut_chart.py
+import io
+import math
+import sys
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------
+# Donut chart
+# -----------------------
+# The pie artists are built once and then updated in place: each refresh only
+# moves wedge angles, colors and label positions/text. tight_layout runs only
+# when the set of labels changes. With threaded=True the figure lives on a
+# worker thread with the Agg backend and finished frames are blitted into a
+# plain Tk label, so the Tk main loop never waits on matplotlib.
+#
+# matplotlib is imported lazily (it dominates cold start): preload() can run
+# on a background thread after the first frame, and CanvasDonut draws the same
+# chart with plain Tk canvas arcs for when matplotlib is not wanted at all.
+LABEL_DISTANCE = 1.1  # matplotlib pie() defaults
+PCT_DISTANCE = 0.6
+
+
+def preload():
+    # import the matplotlib pieces DonutChart needs; safe to call from a thread
+    from matplotlib.backends import backend_agg, backend_tkagg  # noqa: F401
+    from matplotlib import figure  # noqa: F401
+
+
+def _pct_label(pct, total):
+    return f"{pct:.1f}% ({pct*total/100:.1f}h)"
+
+
+class _DonutArtist:
+    # owns one Figure; only ever touched by a single thread
+    def __init__(self, fig):
+        self.fig = fig
+        self.ax = fig.add_subplot(111)
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+        self.layout_key = None
+
+    def _rebuild(self, labels, sizes, colors):
+        ax = self.ax
+        ax.clear()
+        total = sum(sizes)
+        self.wedges, self.texts, self.autotexts = ax.pie(
+            sizes, colors=colors, radius=1.0,
+            wedgeprops=dict(width=0.4, edgecolor='white'),
+            labels=labels,
+            autopct=lambda pct: _pct_label(pct, total),  # shows both % and hours
+            textprops=dict(color="black", fontsize=9)
+        )
+        ax.set_aspect("equal")
+        ax.text(0, 0, "Hours\nAllocated", ha="center", va="center", fontsize=10, fontweight="bold")
+
+    def _update_in_place(self, labels, sizes, colors):
+        total = float(sum(sizes))
+        theta1 = 0.0
+        for w, txt, auto, label, size, color in zip(self.wedges, self.texts, self.autotexts, labels, sizes, colors):
+            theta2 = theta1 + size / total
+            w.set_theta1(360 * theta1)
+            w.set_theta2(360 * theta2)
+            w.set_facecolor(color)
+            mid = math.pi * (theta1 + theta2)
+            x, y = math.cos(mid), math.sin(mid)
+            txt.set_position((LABEL_DISTANCE * x, LABEL_DISTANCE * y))
+            txt.set_horizontalalignment("left" if x > 0 else "right")
+            txt.set_text(label)
+            auto.set_position((PCT_DISTANCE * x, PCT_DISTANCE * y))
+            auto.set_text(_pct_label(100.0 * size / total, total))
+            theta1 = theta2
+
+    def update(self, labels, sizes, colors):
+        if len(sizes) != len(self.wedges):
+            self._rebuild(labels, sizes, colors)
+        else:
+            self._update_in_place(labels, sizes, colors)
+        key = tuple(labels)
+        if key != self.layout_key:
+            self.fig.tight_layout()
+            self.layout_key = key
+
+
+class DonutChart:
+    def __init__(self, master, figsize=(4, 2.8), dpi=100, threaded=False):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        self.master = master
+        self.threaded = threaded
+        if threaded:
+            fig = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(fig)
+            self._artist = _DonutArtist(fig)
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="donut")
+            self._future = None
+            self._inflight = None  # arguments of the frame being rendered
+            self._pending = None
+            self._image = None
+            self.widget = tk.Label(master, bg="white", bd=0)
+        else:
+            fig = Figure(figsize=figsize, dpi=dpi)
+            self._artist = _DonutArtist(fig)
+            self.canvas_fig = FigureCanvasTkAgg(fig, master=master)
+            self.widget = self.canvas_fig.get_tk_widget()
+        self.error = None  # last render failure, if any
+
+    def update(self, labels, sizes, colors):
+        if not self.threaded:
+            self._artist.update(labels, sizes, colors)
+            self.canvas_fig.draw_idle()
+            return
+        # only the newest request matters while a frame is in flight
+        self._pending = (list(labels), list(sizes), list(colors))
+        if self._future is None:
+            self._submit()
+
+    # --- threaded Agg mode ---
+    def _submit(self):
+        args, self._pending = self._pending, None
+        self._inflight = args
+        self._future = self._pool.submit(self._render, *args)
+        self.widget.after(15, self._poll)
+
+    def _render(self, labels, sizes, colors):
+        self._artist.update(labels, sizes, colors)
+        canvas = self._artist.fig.canvas
+        canvas.draw()
+        w, h = canvas.get_width_height()
+        rgba = canvas.buffer_rgba()
+        # binary PPM is the cheapest format Tk's photo image can read from memory
+        out = io.BytesIO()
+        out.write(f"P6 {w} {h} 255 ".encode())
+        mv = memoryview(rgba).cast("B")
+        rgb = bytearray(w * h * 3)
+        rgb[0::3] = mv[0::4]
+        rgb[1::3] = mv[1::4]
+        rgb[2::3] = mv[2::4]
+        out.write(rgb)
+        return out.getvalue()
+
+    def _poll(self):
+        if not self._future.done():
+            self.widget.after(15, self._poll)
+            return
+        try:
+            data = self._future.result()
+        except Exception as exc:
+            # the worker is idle now, so the same frame can be drawn here instead
+            self.error = exc
+            print(f"donut chart: threaded render failed ({exc!r}); drawing on the Tk thread", file=sys.stderr)
+            try:
+                data = self._render(*self._inflight)
+            except Exception as exc:
+                self.error = exc
+                print(f"donut chart: render failed ({exc!r}); keeping the last frame", file=sys.stderr)
+                data = None
+        finally:
+            self._future = None  # never leave a finished future behind, or updates stop
+            self._inflight = None
+        if data is not None:
+            self._image = tk.PhotoImage(data=data, format="PPM")
+            self.widget.configure(image=self._image)
+        if self._pending is not None:
+            self._submit()
+
+    def close(self):
+        if self.threaded:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# -----------------------
+# Native canvas donut
+# -----------------------
+class CanvasDonut:
+    # same interface as DonutChart, drawn with Tk arcs; no matplotlib needed
+    def __init__(self, master, figsize=(4, 2.8), dpi=100, threaded=False):
+        self.master = master
+        self.width = int(figsize[0] * dpi)
+        self.height = int(figsize[1] * dpi)
+        self.widget = tk.Canvas(master, width=self.width, height=self.height, bg="white", highlightthickness=0)
+        self.radius = 0.36 * min(self.width, self.height)
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+        c = self.widget
+        cx, cy, r = self.width / 2, self.height / 2, self.radius
+        self.hole = c.create_oval(cx - 0.6 * r, cy - 0.6 * r, cx + 0.6 * r, cy + 0.6 * r, fill="white", outline="")
+        c.create_text(cx, cy, text="Hours\nAllocated", justify="center", font=("Segoe UI", 10, "bold"))
+
+    def _rebuild(self, n):
+        c = self.widget
+        c.delete(*self.wedges, *self.texts, *self.autotexts)
+        cx, cy, r = self.width / 2, self.height / 2, self.radius
+        self.wedges = [c.create_arc(cx - r, cy - r, cx + r, cy + r, style=tk.PIESLICE, outline="white", width=2)
+                       for _ in range(n)]
+        self.texts = [c.create_text(0, 0, font=("Segoe UI", 9)) for _ in range(n)]
+        self.autotexts = [c.create_text(0, 0, font=("Segoe UI", 8)) for _ in range(n)]
+        for w in self.wedges:
+            c.tag_lower(w)  # under the hole, the centre text and the labels
+
+    def update(self, labels, sizes, colors):
+        if len(sizes) != len(self.wedges):
+            self._rebuild(len(sizes))
+        c = self.widget
+        cx, cy, r = self.width / 2, self.height / 2, self.radius
+        total = float(sum(sizes))
+        theta1 = 0.0
+        for w, txt, auto, label, size, color in zip(self.wedges, self.texts, self.autotexts, labels, sizes, colors):
+            theta2 = theta1 + size / total
+            # Tk angles are counter-clockwise from 3 o'clock, like matplotlib's pie
+            c.itemconfigure(w, start=360 * theta1, extent=min(359.99, 360 * (theta2 - theta1)), fill=color)
+            mid = math.pi * (theta1 + theta2)
+            x, y = math.cos(mid), -math.sin(mid)
+            c.coords(txt, cx + LABEL_DISTANCE * r * x, cy + LABEL_DISTANCE * r * y)
+            c.itemconfigure(txt, text=label, anchor="w" if x > 0 else "e")
+            c.coords(auto, cx + 0.8 * r * x, cy + 0.8 * r * y)
+            c.itemconfigure(auto, text=_pct_label(100.0 * size / total, total))
+            theta1 = theta2
+
+    def close(self):
+        pass
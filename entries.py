@@ -0,0 +1,128 @@
+# entries.py
+import sys
+from array import array
+from datetime import timedelta
+
+# -----------------------
+# Compact schedule entries
+# -----------------------
+# Entries are __slots__ objects instead of six-key dicts. Names are interned
+# with sys.intern and start/end floats are shared through a small cache (most
+# schedules reuse the same handful of times), so an entry is one small object
+# plus pointers. columns() packs any run of entries into typed arrays for
+# bulk aggregation; with NumPy installed those sums vectorize.
+#
+# Measured footprint (benchmarks.py reports it per run): an Entry is about
+# 104 bytes with its list slot, plus about 18 bytes in a store's day index,
+# so a million live entries take roughly 120 MB. A store loaded in bulk
+# (ScheduleStore.from_rows, used for every week read from storage) therefore
+# keeps each day as pack_rows() arrays, about 39 bytes per entry including
+# its bitmap and totals (39 MB per million), and only builds a day's Entry
+# objects (unpack) once something asks for them. The aggregation columns take
+# about 22 bytes per entry; bulk work over many entries should go through
+# columns(), not the objects.
+DAYS = ("M", "T", "W", "Th", "F", "S", "Su")
+DAY_INDEX = {d: i for i, d in enumerate(DAYS)}
+
+
+def week_start(d):
+    # Monday of the week containing date d
+    return d - timedelta(days=d.weekday())
+
+def day_date(week, day):
+    return week + timedelta(days=DAY_INDEX[day])
+
+
+_times = {}
+
+
+def intern_time(h):
+    h = float(h)
+    return _times.setdefault(h, h) if len(_times) < 65536 else h
+
+
+class Entry:
+    __slots__ = ("day", "start", "end", "name", "category", "fixed", "id", "rule")
+
+    def __init__(self, day, start, end, name, category, fixed=False, id=None, rule=None):
+        self.id = id  # storage row id, assigned when first persisted
+        self.rule = rule  # recurrence rule id for expanded occurrences (never persisted)
+        self.day = DAYS[DAY_INDEX[day]]  # share the module-level day code strings
+        self.start = intern_time(start)
+        self.end = intern_time(end)
+        self.name = sys.intern(name)
+        self.category = category
+        self.fixed = bool(fixed)
+
+    @property
+    def hours(self):
+        return max(0.0, self.end - self.start)
+
+    def set(self, **changes):
+        for k, v in changes.items():
+            if k in ("start", "end"):
+                v = intern_time(v)
+            elif k == "name":
+                v = sys.intern(v)
+            setattr(self, k, v)
+
+    def __repr__(self):
+        return (f"Entry({self.day!r}, {self.start!r}, {self.end!r}, {self.name!r}, "
+                f"{self.category!r}, fixed={self.fixed!r})")
+
+
+# -----------------------
+# Columnar view
+# -----------------------
+def columns(entries):
+    day = array("b")
+    start = array("d")
+    end = array("d")
+    category = array("i")
+    fixed = array("b")
+    for e in entries:
+        day.append(DAY_INDEX[e.day])
+        start.append(e.start)
+        end.append(e.end)
+        category.append(e.category)
+        fixed.append(e.fixed)
+    return {"day": day, "start": start, "end": end, "category": category, "fixed": fixed}
+
+
+def pack_rows(rows):
+    # (id, day index, start, end, name, category, fixed) rows of one day, in
+    # start order, as typed arrays; id 0 stands for an entry never persisted
+    cols = {"start": array("d"), "end": array("d"), "category": array("i"), "fixed": array("b"),
+            "id": array("q"), "name": []}
+    start, end, category, fixed, ids, names = (cols["start"], cols["end"], cols["category"], cols["fixed"],
+                                               cols["id"], cols["name"])
+    for i, _, s, t, n, c, f in rows:
+        ids.append(i or 0)
+        start.append(s)
+        end.append(t)
+        names.append(sys.intern(n))
+        category.append(c)
+        fixed.append(bool(f))
+    return cols
+
+
+def unpack(cols, day):
+    # the Entry objects of one pack_rows() day
+    return [Entry(day, s, t, n, c, f, i or None)
+            for i, s, t, n, c, f in zip(cols["id"], cols["start"], cols["end"], cols["name"],
+                                        cols["category"], cols["fixed"])]
+
+
+def hours_by(cols, key, size):
+    # total hours grouped by an integer column ("day" or "category")
+    try:
+        import numpy as np
+    except ImportError:
+        out = [0.0] * size
+        for k, s, t in zip(cols[key], cols["start"], cols["end"]):
+            if t > s:
+                out[k] += t - s
+        return out
+    keys = np.frombuffer(cols[key], dtype=np.int8 if key == "day" else np.int32)
+    dur = np.maximum(0.0, np.frombuffer(cols["end"]) - np.frombuffer(cols["start"]))
+    return np.bincount(keys, weights=dur, minlength=size).tolist()
@@ -0,0 +1,261 @@
+# exporter.py
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+from entries import DAYS, DAY_INDEX
+
+# -----------------------
+# Batch export
+# -----------------------
+# Writes a range of weeks as printable pages (PNG or PDF, one file per week
+# page or day page, drawn with matplotlib's Agg/PDF backends) and/or one ICS
+# calendar. Pages are plain dicts rendered by render_page() on a
+# ProcessPoolExecutor, each worker writing its file straight to disk, so the
+# export thread only hands out pages and counts finished files; the Tk side
+# polls ExportJob.written with after(), like the import and optimizer jobs.
+# At most IN_FLIGHT pages per worker are queued, so memory stays flat for
+# long ranges.
+#
+# Rows are (day, start, end, name, category id, uid) and categories a list
+# of (name, color) indexed by id.
+IN_FLIGHT = 2  # pages queued per worker
+PAGE_SIZE = (11.69, 8.27)  # A4 landscape, inches
+DAY_PAGE_SIZE = (8.27, 11.69)
+PAGE_DPI = 150
+MIN_LABEL_HOURS = 0.4  # blocks shorter than this get no text
+FORMATS = ("png", "pdf", "ics")
+VIEWS = ("week", "day")
+
+
+# --- page specs (built on the export thread) ---
+def _span(rows, lo=8.0, hi=20.0):
+    # hours shown on a page: the usual day, widened to fit every entry
+    for _, start, end, *_ in rows:
+        lo, hi = min(lo, int(start)), max(hi, -(-end // 1))
+    return lo, hi
+
+
+def _chart(rows, categories):
+    hours = {}
+    for _, start, end, _, cid, _ in rows:
+        hours[cid] = hours.get(cid, 0.0) + max(0.0, end - start)
+    cids = sorted(c for c, h in hours.items() if h > 0)
+    return ([categories[c][0] for c in cids], [hours[c] for c in cids], [categories[c][1] for c in cids])
+
+
+def page_count(weeks, views):
+    count = 0
+    for _, rows in weeks:
+        count += ("week" in views) + ("day" in views) * len({r[0] for r in rows})
+    return count
+
+
+def week_pages(week, rows, categories, views=("week",)):
+    # page dicts for one week (day pages only for days that have entries)
+    if "week" in views:
+        yield {
+            "kind": "week", "name": f"{week.isoformat()}-week",
+            "title": f"Week of {week.strftime('%b %d, %Y')}",
+            "columns": [f"{d} {(week + timedelta(days=i)).strftime('%m/%d')}" for i, d in enumerate(DAYS)],
+            "blocks": [(DAY_INDEX[d], s, t, name, categories[c][1]) for d, s, t, name, c, _ in rows],
+            "span": _span(rows), "chart": _chart(rows, categories),
+        }
+    if "day" in views:
+        for i, day in enumerate(DAYS):
+            day_rows = [r for r in rows if r[0] == day]
+            if not day_rows:
+                continue
+            d = week + timedelta(days=i)
+            yield {
+                "kind": "day", "name": f"{d.isoformat()}-{day}",
+                "title": d.strftime("%A, %b %d, %Y"), "columns": [""],
+                "blocks": [(0, s, t, name, categories[c][1]) for _, s, t, name, c, _ in day_rows],
+                "span": _span(day_rows), "chart": _chart(day_rows, categories),
+            }
+
+
+# --- rendering (runs in worker processes) ---
+def _clock(h):
+    m = round(h * 60)
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def render_page(page, path):
+    # draw one page and write it to path (format from the extension); returns path
+    from matplotlib.figure import Figure
+    week = page["kind"] == "week"
+    fig = Figure(figsize=PAGE_SIZE if week else DAY_PAGE_SIZE, dpi=PAGE_DPI)
+    fig.suptitle(page["title"], fontsize=14, fontweight="bold")
+    grid = fig.add_gridspec(1, 2, width_ratios=(3, 1) if week else (2, 1), left=0.07, right=0.97,
+                            top=0.9, bottom=0.06, wspace=0.15)
+    ax = fig.add_subplot(grid[0])
+    lo, hi = page["span"]
+    blocks = page["blocks"]
+    ncols = len(page["columns"])
+    # every block in one bar() call; only the labels are per-block artists
+    ax.bar([b[0] for b in blocks], [b[2] - b[1] for b in blocks], bottom=[b[1] for b in blocks],
+           width=0.94, color=[b[4] for b in blocks], edgecolor="white", linewidth=0.8, align="center")
+    size = 6 if week else 9
+    # characters that fit across a block (average glyph ~0.6 em), so names stay inside it
+    fit = int(ax.get_position().width * fig.get_figwidth() * 72 / ncols * 0.9 / (0.6 * size))
+    for col, start, end, name, _ in blocks:
+        if end - start >= MIN_LABEL_HOURS:
+            label = name if week else f"{_clock(start)}-{_clock(end)}  {name}"
+            if len(label) > fit:
+                label = label[:max(1, fit - 1)] + "…"
+            ax.text(col - 0.44, max(start, lo) + 0.05, label, fontsize=size, va="top", ha="left", color="#102030")
+    ax.set_xlim(-0.5, ncols - 0.5)
+    ax.set_ylim(hi, lo)
+    ax.set_xticks(range(ncols), page["columns"], fontsize=9)
+    ax.xaxis.tick_top()
+    ax.tick_params(axis="x", length=0)
+    hours = range(int(lo), int(hi) + 1)
+    ax.set_yticks(list(hours), [_clock(h) for h in hours], fontsize=7)
+    ax.grid(axis="y", color="#e6e9ee", linewidth=0.6)
+    ax.set_axisbelow(True)
+    for side in ("right", "bottom"):
+        ax.spines[side].set_visible(False)
+    labels, sizes, colors = page["chart"]
+    pie = fig.add_subplot(grid[1])
+    if sizes:
+        pie.pie(sizes, colors=colors, radius=1.0, wedgeprops=dict(width=0.4, edgecolor="white"))
+        pie.legend([f"{n} ({h:.1f}h)" for n, h in zip(labels, sizes)], loc="upper center",
+                   bbox_to_anchor=(0.5, 0.0), fontsize=7, frameon=False)
+        pie.text(0, 0, f"{sum(sizes):.1f}h", ha="center", va="center", fontsize=10, fontweight="bold")
+    pie.set_aspect("equal")
+    pie.set_axis_off()
+    tmp = f"{path}.part"
+    fig.savefig(tmp, format=os.path.splitext(path)[1][1:])
+    os.replace(tmp, path)  # a file on disk is always a finished page
+    return path
+
+
+# --- ICS ---
+def _ics_escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_fold(line):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        while cut and (data[cut] & 0xC0) == 0x80:  # never split a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_time(d, h):
+    # floating local time, which is how importer.py reads DTSTART/DTEND back
+    return (datetime.combine(d, datetime.min.time()) + timedelta(minutes=round(h * 60))).strftime("%Y%m%dT%H%M%S")
+
+
+def write_ics(fh, weeks, categories):
+    # weeks: iterable of (Monday, rows); returns the number of events written
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    fh.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Daily Planner//Schedule Export//EN\r\n")
+    count = 0
+    for week, rows in weeks:
+        for day, start, end, name, cid, uid in rows:
+            d = week + timedelta(days=DAY_INDEX[day])
+            fh.write("BEGIN:VEVENT\r\n")
+            fh.write(f"UID:{uid}\r\nDTSTAMP:{stamp}\r\n")
+            fh.write(f"DTSTART:{_ics_time(d, start)}\r\nDTEND:{_ics_time(d, end)}\r\n")
+            fh.write(_ics_fold(f"SUMMARY:{_ics_escape(name)}"))
+            fh.write(_ics_fold(f"CATEGORIES:{_ics_escape(categories[cid][0])}"))
+            fh.write("END:VEVENT\r\n")
+            count += 1
+    fh.write("END:VCALENDAR\r\n")
+    return count
+
+
+# -----------------------
+# Background job
+# -----------------------
+class ExportJob:
+    def __init__(self, weeks, categories, folder, formats=("png",), views=("week",), workers=None):
+        # weeks: [(Monday, rows)] in order; folder receives every file
+        self.weeks = weeks
+        self.categories = categories
+        self.folder = folder
+        self.formats = [f for f in FORMATS if f in formats]
+        self.views = views
+        self.workers = workers or os.cpu_count() or 1
+        self.page_formats = [f for f in self.formats if f != "ics"]
+        self.total = page_count(weeks, views) * len(self.page_formats) + ("ics" in self.formats)  # files to write
+        self.written = 0
+        self.events = 0  # events written to the ICS file
+        self.paths = []
+        self.error = None
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="planner-export", daemon=True)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self):
+        self._thread.join()
+        return self
+
+    def _jobs(self):
+        for week, rows in self.weeks:
+            for page in week_pages(week, rows, self.categories, self.views):
+                for fmt in self.page_formats:
+                    yield page, os.path.join(self.folder, f"{page['name']}.{fmt}")
+
+    def _write_ics(self):
+        first, last = self.weeks[0][0], self.weeks[-1][0]
+        path = os.path.join(self.folder, f"schedule-{first.isoformat()}-{last.isoformat()}.ics")
+        with open(f"{path}.part", "w", encoding="utf-8", newline="") as fh:
+            self.events = write_ics(fh, self.weeks, self.categories)
+        os.replace(f"{path}.part", path)
+        self.paths.append(path)
+        self.written += 1
+
+    def _run(self):
+        pool = None
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            jobs = self._jobs()
+            pending = set()
+            if self.page_formats and self.weeks:
+                # spawn: never fork a process that has Tk and the storage threads running
+                pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                for page, path in itertools.islice(jobs, self.workers * IN_FLIGHT):
+                    pending.add(pool.submit(render_page, page, path))
+            if "ics" in self.formats and self.weeks:
+                self._write_ics()  # while the workers draw the first pages
+            while pending:
+                finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self.paths.append(future.result())
+                    self.written += 1
+                if self._cancel.is_set():
+                    continue  # let the pages in flight finish; queue no more
+                for page, path in itertools.islice(jobs, len(finished)):
+                    pending.add(pool.submit(render_page, page, path))
+        except Exception as exc:  # reported to the UI by the poller
+            self.error = exc
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            self.done = True
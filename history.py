@@ -0,0 +1,150 @@
+# history.py
+from collections import deque
+from contextlib import contextmanager
+
+# -----------------------
+# Undo / redo
+# -----------------------
+# An operation log: every user-level change records a pair of closures
+# (undo, redo) that apply the inverse and the original operation. Closures
+# keep references to the entries involved, never copies of the schedule, so a
+# step costs memory in proportion to what it changed. Steps are grouped (one
+# "Auto-schedule" is one step however many entries it moves) and the oldest
+# steps are dropped once the estimated size of the log passes the budget.
+#
+# Steps apply all or nothing: if one operation of an undo/redo raises, the
+# ones already replayed are reversed and the step stays where it was, and a
+# group whose body raises reverses what it recorded instead of leaving half a
+# step on the stack.
+HISTORY_BUDGET = 4 * 1024 * 1024  # bytes (estimated)
+STEP_BYTES = 400  # per step: the step, its label and closures
+ITEM_BYTES = 200  # per entry (or other object) a step keeps alive
+
+
+class _Step:
+    __slots__ = ("label", "ops", "items")
+
+    def __init__(self, label):
+        self.label = label
+        self.ops = []  # (undo, redo) in the order they were done
+        self.items = 0
+
+    @property
+    def size(self):
+        return STEP_BYTES + ITEM_BYTES * self.items
+
+
+class History:
+    def __init__(self, budget=HISTORY_BUDGET):
+        self.budget = budget
+        self.listeners = []  # called with no arguments after any change
+        self._undo = deque()
+        self._redo = []
+        self._size = 0  # estimated bytes held by both stacks
+        self._group = None
+        self._depth = 0
+        self._replaying = False
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+    # --- recording ---
+    def record(self, label, undo, redo, items=1):
+        if self._replaying:
+            return
+        if self._group is not None:
+            self._group.ops.append((undo, redo))
+            self._group.items += items
+            return
+        step = _Step(label)
+        step.ops.append((undo, redo))
+        step.items = items
+        self._push(step)
+
+    @contextmanager
+    def group(self, label):
+        # everything recorded inside becomes one step (nested groups join the outer one)
+        if self._group is None:
+            self._group = _Step(label)
+        step = self._group
+        mark, items = len(step.ops), step.items
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            # take back what this group did so far; the exception still propagates
+            done = step.ops[mark:]
+            del step.ops[mark:]
+            step.items = items
+            self._replay([(undo, redo) for undo, redo in reversed(done)])
+            raise
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._group = None
+                if step.ops:
+                    self._push(step)
+
+    def _push(self, step):
+        for old in self._redo:
+            self._size -= old.size
+        self._redo.clear()
+        self._undo.append(step)
+        self._size += step.size
+        while self._size > self.budget and len(self._undo) > 1:
+            self._size -= self._undo.popleft().size
+        self._notify()
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+        self._notify()
+
+    # --- replay ---
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo_label(self):
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1].label if self._redo else None
+
+    def undo(self):
+        if not self._undo:
+            return None
+        step = self._undo[-1]
+        self._replay([(undo, redo) for undo, redo in reversed(step.ops)])
+        self._redo.append(self._undo.pop())  # moved only once every op went through
+        self._notify()
+        return step.label
+
+    def redo(self):
+        if not self._redo:
+            return None
+        step = self._redo[-1]
+        self._replay([(redo, undo) for undo, redo in step.ops])
+        self._undo.append(self._redo.pop())
+        self._notify()
+        return step.label
+
+    def _replay(self, pairs):
+        # run each (fn, inverse) pair's fn; if one raises, run the inverses of
+        # those already done, newest first, and re-raise
+        was, self._replaying = self._replaying, True
+        done = []
+        try:
+            for fn, inverse in pairs:
+                fn()
+                done.append(inverse)
+        except BaseException:
+            for inverse in reversed(done):
+                inverse()
+            raise
+        finally:
+            self._replaying = was
@@ -0,0 +1,297 @@
+# importer.py
+import csv
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+from entries import week_start
+
+# -----------------------
+# Streaming calendar import
+# -----------------------
+# ICS and CSV files are read line by line through a chain of generators
+# (raw lines -> events -> storage rows -> batches), so memory stays flat no
+# matter how large the file is. ImportJob runs that pipeline on a worker
+# thread, commits each batch on that thread's own connection (not through the
+# storage writer queue, so loading a week meanwhile does not wait for the
+# import) and exposes progress and a cancel flag that the Tk side polls with
+# after().
+IMPORT_BATCH = 2000
+
+
+class CalendarFormatError(ValueError):
+    pass
+
+
+# --- raw input ---
+def iter_lines(fb, progress=None):
+    # decode a binary file line by line, reporting bytes consumed
+    first = True
+    for raw in fb:
+        if progress is not None:
+            progress(len(raw))
+        line = raw.decode("utf-8-sig" if first else "utf-8", errors="replace")
+        first = False
+        yield line.rstrip("\r\n")
+
+
+def chunked(items, n):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- ICS ---
+def _unfold(lines):
+    # RFC 5545 continuation lines start with a space or tab
+    held = None
+    for line in lines:
+        if line[:1] in (" ", "\t") and held is not None:
+            held += line[1:]
+            continue
+        if held is not None:
+            yield held
+        held = line
+    if held is not None:
+        yield held
+
+
+def _ics_text(value):
+    return (value.replace("\\n", " ").replace("\\N", " ").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _ics_datetime(value, params):
+    value = value.strip()
+    if "VALUE=DATE" in params or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date()
+    utc = value.endswith("Z")
+    dt = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if utc:
+        dt = dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return dt  # TZID values are taken as local wall-clock time
+
+
+def _ics_duration(value):
+    # e.g. PT1H30M, P1D, -PT15M
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("+-").lstrip("P")
+    days = secs = 0
+    num = ""
+    in_time = False
+    for ch in value:
+        if ch == "T":
+            in_time = True
+        elif ch.isdigit():
+            num += ch
+        else:
+            n = int(num or 0)
+            num = ""
+            if ch == "W":
+                days += 7 * n
+            elif ch == "D":
+                days += n
+            elif ch == "H" and in_time:
+                secs += 3600 * n
+            elif ch == "M" and in_time:
+                secs += 60 * n
+            elif ch == "S" and in_time:
+                secs += n
+    return sign * timedelta(days=days, seconds=secs)
+
+
+def iter_ics_events(lines):
+    event = None
+    for line in _unfold(lines):
+        if line == "BEGIN:VEVENT":
+            event = {}
+            continue
+        if event is None:
+            continue
+        if line == "END:VEVENT":
+            start = event.get("start")
+            end = event.get("end")
+            if end is None and start is not None and "duration" in event:
+                end = start + event["duration"]
+            if start is not None:
+                yield {"name": event.get("name", "(untitled)"), "start": start,
+                       "end": end, "category": event.get("category")}
+            event = None
+            continue
+        head, sep, value = line.partition(":")
+        if not sep:
+            continue
+        prop, *params = head.split(";")
+        prop = prop.upper()
+        try:
+            if prop == "SUMMARY":
+                event["name"] = _ics_text(value)
+            elif prop == "DTSTART":
+                event["start"] = _ics_datetime(value, params)
+            elif prop == "DTEND":
+                event["end"] = _ics_datetime(value, params)
+            elif prop == "DURATION":
+                event["duration"] = _ics_duration(value)
+            elif prop == "CATEGORIES":
+                event["category"] = _ics_text(value).split(",")[0].strip() or None
+        except ValueError:
+            event["start"] = None  # unparseable times: drop the event
+
+
+# --- CSV ---
+_CSV_COLUMNS = {
+    "name": ("name", "subject", "summary", "title"),
+    "date": ("date", "start date"),
+    "end_date": ("end date",),
+    "start": ("start", "start time"),
+    "end": ("end", "end time"),
+    "category": ("category", "categories"),
+}
+
+
+def _csv_date(value):
+    value = value.strip()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in ("%m/%d/%Y", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"unrecognised date '{value}'")
+
+
+def _csv_time(value):
+    # "13:30", "1:30 PM", "13.5" -> hours as float
+    value = value.strip().upper()
+    h, sep, m = value.partition(":")
+    if sep and h.isdigit() and m.isdigit():
+        return int(h) + int(m) / 60
+    for fmt in ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p", "%I %p"):
+        try:
+            t = datetime.strptime(value, fmt)
+            return t.hour + t.minute / 60 + t.second / 3600
+        except ValueError:
+            pass
+    return float(value)
+
+
+def _csv_point(day_value, time_value):
+    # either a full ISO timestamp in the time column, or a date + time pair
+    time_value = (time_value or "").strip()
+    if not day_value and time_value:
+        return datetime.fromisoformat(time_value)
+    d = _csv_date(day_value)
+    return datetime.combine(d, datetime.min.time()) + timedelta(hours=_csv_time(time_value or "0"))
+
+
+def iter_csv_events(lines):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    lower = [h.strip().lower() for h in header]
+    cols = {}
+    for key, names in _CSV_COLUMNS.items():
+        for n in names:
+            if n in lower:
+                cols[key] = lower.index(n)
+                break
+    if "name" not in cols or "start" not in cols:
+        raise CalendarFormatError("CSV needs at least a name/subject and a start column")
+
+    def get(row, key):
+        i = cols.get(key)
+        return row[i] if i is not None and i < len(row) else ""
+
+    for row in reader:
+        if not row:
+            continue
+        try:
+            start = _csv_point(get(row, "date"), get(row, "start"))
+            end_raw = get(row, "end")
+            end = _csv_point(get(row, "end_date") or get(row, "date"), end_raw) if end_raw else None
+        except ValueError:
+            continue
+        yield {"name": get(row, "name").strip() or "(untitled)", "start": start,
+               "end": end, "category": get(row, "category").strip() or None}
+
+
+# --- mapping onto the planner model ---
+def to_rows(events, resolve_category, next_id):
+    # (id, week, day, start, end, name, category, fixed) rows; all-day and
+    # zero-length events are skipped, anything past midnight is clipped
+    for ev in events:
+        start, end = ev["start"], ev["end"]
+        if not isinstance(start, datetime):
+            continue
+        if end is None:
+            end = start + timedelta(hours=1)
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, datetime.min.time())
+        d = start.date()
+        s = start.hour + start.minute / 60 + start.second / 3600
+        t = 24.0 if end.date() > d else end.hour + end.minute / 60 + end.second / 3600
+        if t <= s:
+            continue
+        yield (next_id(), week_start(d).toordinal(), d.weekday(), s, t,
+               ev["name"], resolve_category(ev["category"]), 1)
+
+
+# -----------------------
+# Background job
+# -----------------------
+class ImportJob:
+    def __init__(self, path, storage, resolve_category):
+        self.path = path
+        self.storage = storage
+        self.resolve_category = resolve_category
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.imported = 0
+        self.weeks = set()  # weeks that received rows (as Monday dates)
+        self.error = None
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="planner-import", daemon=True)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _progress(self, n):
+        self.bytes_read += n
+
+    def _run(self):
+        try:
+            with open(self.path, "rb") as fb:
+                lines = iter_lines(fb, self._progress)
+                if self.path.lower().endswith((".ics", ".ical", ".ifb")):
+                    events = iter_ics_events(lines)
+                else:
+                    events = iter_csv_events(lines)
+                rows = to_rows(events, self.resolve_category, self.storage.next_id)
+                for batch in chunked(rows, IMPORT_BATCH):
+                    if self._cancel.is_set():
+                        break
+                    self.storage.insert_rows(batch)  # committed here, off the writer queue
+                    self.imported += len(batch)
+                    self.weeks.update(date.fromordinal(r[1]) for r in batch)
+        except Exception as exc:  # reported to the UI by the poller
+            self.error = exc
+        finally:
+            self.done = True
@@ -0,0 +1,121 @@
+# occupancy.py
+import math
+from functools import lru_cache
+
+# -----------------------
+# Free-slot bitmap
+# -----------------------
+# A day is 24h split into SLOT_MINUTES slots; bit i of an occupancy mask is set
+# when slot i is covered by at least one entry. Placement queries then become a
+# handful of shifts and ANDs on a Python int instead of a slot-by-slot scan.
+SLOT_MINUTES = 5
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+DAY_SLOTS = 24 * SLOTS_PER_HOUR
+_EPS = 1e-9
+
+
+def slot_floor(h):
+    return min(DAY_SLOTS, max(0, int(math.floor(h * SLOTS_PER_HOUR + _EPS))))
+
+def slot_ceil(h):
+    return min(DAY_SLOTS, max(0, int(math.ceil(h * SLOTS_PER_HOUR - _EPS))))
+
+def span_bits(start, end):
+    # conservative: any slot the interval touches counts as taken
+    lo, hi = slot_floor(start), slot_ceil(end)
+    if hi <= lo:
+        return 0
+    return ((1 << (hi - lo)) - 1) << lo
+
+@lru_cache(maxsize=64)
+def _window(lo, hi):
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+@lru_cache(maxsize=64)
+def _aligned(lo, hi, step):
+    # bits at lo, lo+step, lo+2*step, ... below hi
+    mask = 0
+    for p in range(lo, hi, step):
+        mask |= 1 << p
+    return mask
+
+def _run_starts(free, n):
+    # bit p of the result is set iff slots p..p+n-1 are all free
+    r = free
+    k = 1
+    while k < n:
+        s = min(k, n - k)
+        r &= r >> s
+        k += s
+    return r
+
+def _lowest(bits):
+    return (bits & -bits).bit_length() - 1
+
+
+class DayOccupancy:
+    __slots__ = ("bits",)
+
+    def __init__(self):
+        self.bits = 0
+
+    def mark(self, start, end):
+        self.bits |= span_bits(start, end)
+
+    def clear(self, start, end):
+        self.bits &= ~span_bits(start, end)
+
+    def is_free(self, start, end):
+        return not (self.bits & span_bits(start, end))
+
+    def _candidates(self, dur, lo, hi, step_minutes):
+        lo_s, hi_s = slot_ceil(lo), slot_floor(hi)
+        n = max(1, slot_ceil(dur))
+        free = ~self.bits & _window(lo_s, hi_s)
+        starts = _run_starts(free, n)
+        step = max(1, int(round(step_minutes / SLOT_MINUTES)))
+        if step > 1:
+            starts &= _aligned(lo_s, hi_s, step)
+        return starts, n
+
+    def first_fit(self, dur, lo=8.0, hi=20.0, step_minutes=SLOT_MINUTES):
+        starts, _ = self._candidates(dur, lo, hi, step_minutes)
+        if not starts:
+            return None
+        return _lowest(starts) / SLOTS_PER_HOUR
+
+    def fits(self, dur, lo=8.0, hi=20.0, step_minutes=SLOT_MINUTES):
+        # every start time at which the activity fits, earliest first
+        starts, _ = self._candidates(dur, lo, hi, step_minutes)
+        out = []
+        while starts:
+            out.append(_lowest(starts) / SLOTS_PER_HOUR)
+            starts &= starts - 1
+        return out
+
+    def best_fit(self, dur, lo=8.0, hi=20.0, step_minutes=SLOT_MINUTES):
+        # earliest start inside the smallest gap that can hold the activity
+        starts, n = self._candidates(dur, lo, hi, step_minutes)
+        best = None
+        for g_lo, g_hi in self._gap_slots(slot_ceil(lo), slot_floor(hi)):
+            if g_hi - g_lo < n:
+                continue
+            in_gap = starts & _window(g_lo, g_hi)
+            if not in_gap:
+                continue
+            if best is None or g_hi - g_lo < best[0]:
+                best = (g_hi - g_lo, _lowest(in_gap))
+        return None if best is None else best[1] / SLOTS_PER_HOUR
+
+    def _gap_slots(self, lo_s, hi_s):
+        free = ~self.bits & _window(lo_s, hi_s)
+        while free:
+            p = _lowest(free)
+            x = free >> p
+            run = (~x & (x + 1)).bit_length() - 1
+            yield p, p + run
+            free &= ~_window(p, p + run)
+
+    def gaps(self, lo=8.0, hi=20.0):
+        return [(a / SLOTS_PER_HOUR, b / SLOTS_PER_HOUR)
+                for a, b in self._gap_slots(slot_ceil(lo), slot_floor(hi))]
@@ -0,0 +1,327 @@
+# optimizer.py
+import itertools
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from entries import DAYS
+from occupancy import DayOccupancy
+
+# -----------------------
+# Week auto-scheduler
+# -----------------------
+# Repacks a week's flexible (not fixed) entries around the fixed ones, topped
+# up with activities until each category reaches its hour target. The week
+# is turned into a plain, picklable problem (build_problem); search() then
+# builds plans by randomized greedy insertion over each day's free-slot bitmap
+# and improves them with remove-and-reinsert moves for a short slice of time.
+# OptimizeJob runs many such slices on a ProcessPoolExecutor until the time
+# budget is spent, seeding some from the best plan so far, and exposes that
+# plan (job.best) for the Tk side to poll with after().
+#
+# The worker pool is shared by every job in the process and kept alive until
+# shutdown_pool(): starting spawn workers (a fresh interpreter importing this
+# module each) takes longer than a few slices, so paying that per job would
+# eat most of the budget. warm_up() starts the workers ahead of time, and a
+# job's budget only starts once they are up.
+DEFAULT_BUDGET = 3.0  # seconds
+SLICE = 0.3  # seconds one worker task searches before reporting back
+
+# plan cost weights (lower cost is better)
+UNPLACED = 100.0  # per hour that found no slot
+TARGET = 10.0  # per hour a category falls short of its target
+WINDOW = 2.0  # per hour outside the category's preferred window
+BALANCE = 0.5  # per unit of sum of squared day loads (spreads the week)
+REPEAT = 1.0  # per extra copy of the same activity on one day
+NOISE = 0.5  # random jitter used while constructing plans
+
+
+def build_problem(store, activities, targets=None, windows=None, min_gap=0.0,
+                  lo=8.0, hi=20.0, step_minutes=30):
+    # targets: {category id: hours per week}; windows: {category id: (start, end)}
+    # activities: {name: (category id, duration)} used to top up targets
+    busy = [[] for _ in DAYS]
+    fixed_load = [0.0] * len(DAYS)
+    fixed_hours = {}
+    items = []
+    for i, day in enumerate(DAYS):
+        for e in store.day_entries(day):
+            if e.fixed or e.rule is not None:
+                busy[i].append((e.start, e.end))
+                fixed_load[i] += e.hours
+                fixed_hours[e.category] = fixed_hours.get(e.category, 0.0) + e.hours
+            else:
+                items.append((e.name, e.category, e.hours))
+    targets = dict(targets or {})
+    for cid, goal in targets.items():
+        have = fixed_hours.get(cid, 0.0) + sum(dur for _, c, dur in items if c == cid)
+        pool = [(name, dur) for name, (c, dur) in activities.items() if c == cid and dur > 0]
+        for name, dur in itertools.cycle(pool) if pool else ():
+            if have >= goal - 1e-9:
+                break
+            items.append((name, cid, dur))
+            have += dur
+    return {
+        "lo": lo, "hi": hi, "step": step_minutes, "gap": min_gap,
+        "busy": busy, "fixed_load": fixed_load, "fixed_hours": fixed_hours,
+        "items": items, "targets": targets, "windows": dict(windows or {}),
+    }
+
+
+# --- search (runs in worker processes) ---
+def _day_occupancy(problem, place, day):
+    gap = problem["gap"]
+    occ = DayOccupancy()
+    for s, e in problem["busy"][day]:
+        occ.mark(s - gap, e + gap)
+    for (_, _, dur), spot in zip(problem["items"], place):
+        if spot is not None and spot[0] == day:
+            occ.mark(spot[1] - gap, spot[1] + dur + gap)
+    return occ
+
+
+def _outside(window, start, end):
+    if window is None:
+        return 0.0
+    inside = max(0.0, min(end, window[1]) - max(start, window[0]))
+    return (end - start) - inside
+
+
+def plan_cost(problem, place):
+    load = list(problem["fixed_load"])
+    hours = dict(problem["fixed_hours"])
+    windows = problem["windows"]
+    seen = set()
+    cost = 0.0
+    for (name, cid, dur), spot in zip(problem["items"], place):
+        if spot is None:
+            cost += UNPLACED * dur
+            continue
+        day, start = spot
+        load[day] += dur
+        hours[cid] = hours.get(cid, 0.0) + dur
+        cost += WINDOW * _outside(windows.get(cid), start, start + dur)
+        if (day, name) in seen:
+            cost += REPEAT
+        seen.add((day, name))
+    for cid, goal in problem["targets"].items():
+        cost += TARGET * max(0.0, goal - hours.get(cid, 0.0))
+    return cost + BALANCE * sum(x * x for x in load)
+
+
+def _insert(problem, place, occs, order, rng, noise):
+    # greedy: each item goes to its cheapest free slot in the week
+    items = problem["items"]
+    windows = problem["windows"]
+    load = list(problem["fixed_load"])
+    names = set()
+    for (name, _, dur), spot in zip(items, place):
+        if spot is not None:
+            load[spot[0]] += dur
+            names.add((spot[0], name))
+    for i in order:
+        name, cid, dur = items[i]
+        best = None
+        for day in range(len(DAYS)):
+            starts = occs[day].fits(dur, problem["lo"], problem["hi"], problem["step"])
+            if not starts:
+                continue
+            base = BALANCE * ((load[day] + dur) ** 2 - load[day] ** 2)
+            if (day, name) in names:
+                base += REPEAT
+            for start in starts:
+                c = base + WINDOW * _outside(windows.get(cid), start, start + dur)
+                if noise:
+                    c += rng.random() * noise
+                if best is None or c < best[0]:
+                    best = (c, day, start)
+        if best is None:
+            continue
+        _, day, start = best
+        place[i] = (day, start)
+        load[day] += dur
+        names.add((day, name))
+        gap = problem["gap"]
+        occs[day].mark(start - gap, start + dur + gap)
+
+
+def search(problem, seed, seconds, until, start=None):
+    # (cost, place, tried): the best plan found within min(seconds, wall-clock
+    # until) and the number of candidate plans evaluated on the way;
+    # place[i] is (day index, start hour) or None for items[i]
+    rng = random.Random(seed)
+    stop = min(time.time() + seconds, until)
+    n = len(problem["items"])
+    days = range(len(DAYS))
+    if start is None:
+        # constrained and long items first, with some shuffling between seeds
+        order = sorted(range(n), key=lambda i: (problem["items"][i][1] not in problem["windows"],
+                                                -problem["items"][i][2] + rng.random()))
+        place = [None] * n
+        occs = [_day_occupancy(problem, place, d) for d in days]
+        _insert(problem, place, occs, order, rng, NOISE)
+    else:
+        place = list(start)
+    cost = plan_cost(problem, place)
+    best = (cost, list(place))
+    tried = 1
+    while n and time.time() < stop:
+        # remove a few items (unplaced ones are always retried) and reinsert them
+        moved = set(rng.sample(range(n), min(n, rng.randint(1, 3))))
+        moved.update(i for i in range(n) if place[i] is None)
+        trial = list(place)
+        for i in moved:
+            trial[i] = None
+        occs = [_day_occupancy(problem, trial, d) for d in days]
+        order = list(moved)
+        rng.shuffle(order)
+        _insert(problem, trial, occs, order, rng, NOISE * rng.random())
+        c = plan_cost(problem, trial)
+        tried += 1
+        if c <= cost:
+            place, cost = trial, c
+            if c < best[0]:
+                best = (c, list(trial))
+    return best[0], best[1], tried
+
+
+def plan_rows(problem, place):
+    # (day, start, end, name, category id) per placed item, and the unplaced items
+    rows, unplaced = [], []
+    for (name, cid, dur), spot in zip(problem["items"], place):
+        if spot is None:
+            unplaced.append((name, cid, dur))
+        else:
+            rows.append((DAYS[spot[0]], spot[1], spot[1] + dur, name, cid))
+    rows.sort(key=lambda r: (DAYS.index(r[0]), r[1]))
+    return rows, unplaced
+
+
+# --- shared worker pool ---
+_pool = None  # (workers, ProcessPoolExecutor)
+_pool_lock = threading.Lock()
+
+
+def _ready():
+    return os.getpid()
+
+
+def shared_pool(workers):
+    # the session's pool, (re)created when missing or sized differently
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool[0] != workers:
+            if _pool is not None:
+                _pool[1].shutdown(wait=False, cancel_futures=True)
+            # spawn: never fork a process that has Tk and the storage threads running
+            _pool = (workers, ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")))
+        return _pool[1]
+
+
+def warm_up(workers=None):
+    # start every worker process and wait until each has imported this module;
+    # blocks, so callers with a UI run it on a thread
+    workers = workers or os.cpu_count() or 1
+    pool = shared_pool(workers)
+    try:
+        for future in [pool.submit(_ready) for _ in range(workers)]:
+            future.result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    return pool
+
+
+def _discard_pool(pool):
+    # drop a broken pool so the next job starts a fresh one
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[1] is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool[1].shutdown(wait=False, cancel_futures=True)
+
+
+# --- driver (runs on a thread in the calling process) ---
+class OptimizeJob:
+    def __init__(self, problem, budget=DEFAULT_BUDGET, workers=None, week=None, replaces=()):
+        self.problem = problem
+        self.week = week  # week the plan is for
+        self.replaces = list(replaces)  # flexible entries the plan takes the place of
+        self.budget = budget
+        self.workers = workers or os.cpu_count() or 1
+        self.best = None  # (cost, place) of the best plan so far
+        self.version = 0  # bumped whenever best improves
+        self.rounds = 0  # search slices finished
+        self.candidates = 0  # candidate plans evaluated across all slices
+        self.error = None
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="planner-optimize", daemon=True)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self):
+        self._thread.join()
+        return self
+
+    def plan(self):
+        return plan_rows(self.problem, self.best[1]) if self.best is not None else ([], [])
+
+    def _run(self):
+        seeds = itertools.count(random.randrange(1 << 30))
+        pool = None
+        pending = set()
+        try:
+            pool = warm_up(self.workers)  # no-op once the workers are up
+            until = time.time() + self.budget
+            while True:
+                while not self._cancel.is_set() and len(pending) < self.workers and until - time.time() > 0.05:
+                    seed = next(seeds)
+                    # half the slices restart from scratch, half refine the best plan
+                    start = self.best[1] if self.best is not None and seed % 2 else None
+                    pending.add(pool.submit(search, self.problem, seed, SLICE, until, start))
+                if not pending:
+                    break
+                finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    cost, place, tried = future.result()
+                    self.rounds += 1
+                    self.candidates += tried
+                    if self.best is None or cost < self.best[0]:
+                        self.best = (cost, place)
+                        self.version += 1
+                if self._cancel.is_set() and self.best is not None:
+                    break
+        except BrokenProcessPool as exc:
+            self.error = exc
+            if pool is not None:
+                _discard_pool(pool)
+        except Exception as exc:  # reported to the UI by the poller
+            self.error = exc
+        finally:
+            # the pool stays up for the next job; queued slices are dropped and
+            # running ones end on their own within SLICE
+            for future in pending:
+                future.cancel()
+            self.done = True
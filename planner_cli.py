@@ -0,0 +1,454 @@
+# planner_cli.py
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import date, datetime
+
+from entries import DAYS, DAY_INDEX, day_date, week_start
+from planner_core import DEFAULT_DB, Planner, PlannerError, format_time, parse_targets, parse_windows
+
+# -----------------------
+# Batch command line
+# -----------------------
+# Scriptable front end over planner_core.Planner, sharing the app's database:
+#
+#   python planner_cli.py add --day M --start 9 --end 10.5 "Standup" --category Coursework
+#   python planner_cli.py place "Lift Weights" --day T --week 2024-05-06
+#   python planner_cli.py repeat "Writing Seminar" --days M W --start 10 --end 11 --until 2025-12-19
+#   python planner_cli.py rules --delete 3
+#   python planner_cli.py remind "Bring notes" --before "Writing Seminar" --lead 10
+#   python planner_cli.py remind --due    # prints (and marks delivered) what is due now
+#   python planner_cli.py import calendar.ics
+#   python planner_cli.py query --week 2024-05-06 --day W --json
+#   python planner_cli.py totals --week 2024-05-06
+#   python planner_cli.py stats --by month --last 12 --target Sleep=56
+#   python planner_cli.py optimize --target Recreation=4 --window Recreation=16-19 --gap 15
+#   python planner_cli.py export out.csv --from 2024-01-01 --to 2024-12-31
+#   python planner_cli.py export pages/ --format pdf --views week day --from 2024-01-01 --to 2024-12-31
+#
+# Weeks are given as any date inside them (ISO format); default is this week.
+
+
+def _week(value):
+    try:
+        return week_start(date.fromisoformat(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date, got '{value}'") from None
+
+
+def _day(value):
+    if value not in DAY_INDEX:
+        raise argparse.ArgumentTypeError(f"day must be one of {', '.join(DAYS)}")
+    return value
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date, got '{value}'") from None
+
+
+def _hour(value):
+    # 13.5 or 13:30
+    h, sep, m = value.partition(":")
+    try:
+        return int(h) + int(m) / 60 if sep else float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a time like 13.5 or 13:30, got '{value}'") from None
+
+
+def _moment(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date and time like 2025-10-08T09:50, got '{value}'") from None
+
+
+def _clock(h):
+    m = round(h * 60)
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def entry_dict(planner, week, e):
+    return {
+        "id": e.id,
+        "date": day_date(week, e.day).isoformat(),
+        "day": e.day,
+        "start": e.start,
+        "end": e.end,
+        "name": e.name,
+        "category": planner.categories.name(e.category),
+        "fixed": e.fixed,
+    }
+
+
+# --- commands ---
+def cmd_add(planner, args):
+    e = planner.add_entry(args.day, args.start, args.end, args.name, _category(planner, args.category), args.fixed, week=args.week)
+    print(f"added {e.name} on {e.day} {format_time(e.start)} - {format_time(e.end)}")
+
+
+def cmd_place(planner, args):
+    if args.name not in planner.activities:
+        raise PlannerError(f"Unknown activity '{args.name}'.")
+    e = planner.place_activity(args.name, args.day, args.best_fit, args.step, week=args.week)
+    print(f"placed {e.name} on {e.day} {format_time(e.start)} - {format_time(e.end)}")
+
+
+def _category(planner, name):
+    cid = planner.categories.id_of(name)
+    return cid if cid is not None else planner.add_category(name)
+
+
+def cmd_repeat(planner, args):
+    rule = planner.add_rule(args.name, _category(planner, args.category), args.start, args.end, args.days,
+                            first=args.first, interval=args.every, until=args.until, count=args.count)
+    for d in args.skip or ():
+        planner.recurrence.exclude(rule.id, d)
+    print(f"rule {rule.id}: {rule.name} on {','.join(rule.day_codes())} {format_time(rule.start)} - {format_time(rule.end)}")
+
+
+def cmd_rules(planner, args):
+    if args.delete is not None:
+        if args.delete not in planner.recurrence.rules:
+            raise PlannerError(f"No rule {args.delete}.")
+        planner.remove_rule(args.delete)
+        print(f"deleted rule {args.delete}")
+        return
+    for rule in planner.recurrence.rules.values():
+        every = f"every {rule.interval} weeks" if rule.interval > 1 else "weekly"
+        end = f" until {rule.until}" if rule.until else (f" x{rule.count}" if rule.count else "")
+        print(f"{rule.id:>4}  {rule.name} — {planner.categories.name(rule.category)}: {','.join(rule.day_codes())} "
+              f"{format_time(rule.start)} - {format_time(rule.end)}, {every} from {rule.first}{end}"
+              f"{f', {len(rule.exceptions)} skipped' if rule.exceptions else ''}")
+
+
+def cmd_remind(planner, args):
+    if args.delete is not None:
+        if not 1 <= args.delete <= len(planner.reminders):
+            raise PlannerError(f"No reminder {args.delete}.")
+        planner.remove_reminder(args.delete - 1)
+        print(f"deleted reminder {args.delete}")
+        return
+    if args.due:
+        for r, due, missed in planner.due_reminders():
+            print(f"{'missed' if missed else 'due':>6}  {datetime.fromtimestamp(due):%Y-%m-%d %H:%M}  {r.text}")
+        return
+    if args.text is None:
+        for i, r in enumerate(planner.reminders, 1):
+            print(f"{i:>4}  {planner.reminder_label(r)}")
+        return
+    before = None
+    if args.before is not None:
+        days = [args.day] if args.day else DAYS
+        store = planner.week_store(args.week)
+        before = next((e for d in days for e in store.day_entries(d) if e.name == args.before), None)
+        if before is None:
+            raise PlannerError(f"No '{args.before}' in the week of {args.week}.")
+    r = planner.add_reminder(planner.make_reminder(args.text, at=args.at, before=before, lead=args.lead, week=args.week))
+    print(f"reminder {len(planner.reminders)}: {planner.reminder_label(r)}")
+
+
+def cmd_optimize(planner, args):
+    job = planner.optimize_job(parse_targets(args.target or ()), parse_windows(args.window or ()),
+                               args.gap, args.budget, args.workers, week=args.week).start()
+    seen = 0
+    while not job.done:
+        time.sleep(0.1)
+        if job.version != seen:
+            seen = job.version
+            print(f"\rscore {job.best[0]:.1f} after {job.candidates} candidates", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    if job.error is not None:
+        raise PlannerError(f"Optimizer failed: {job.error}")
+    if args.dry_run:
+        rows, unplaced = job.plan()
+    else:
+        added, unplaced = planner.apply_plan(job)
+        rows = [(e.day, e.start, e.end, e.name, e.category) for e in added]
+    for day, start, end, name, cid in rows:
+        print(f"{day:<3}{format_time(start)} - {format_time(end)}: {name} — {planner.categories.name(cid)}")
+    for name, cid, dur in unplaced:
+        print(f"no room for {name} ({dur}h)", file=sys.stderr)
+
+
+def cmd_import(planner, args):
+    job = planner.import_job(args.path, args.category).start()
+    while not job.done:
+        time.sleep(0.2)
+        if not args.quiet:
+            pct = 100 * job.bytes_read / max(1, job.total_bytes)
+            print(f"\r{pct:5.1f}%  {job.imported} events", end="", file=sys.stderr)
+    planner.finish_import(job)
+    if not args.quiet:
+        print(file=sys.stderr)
+    if job.error is not None:
+        raise PlannerError(f"{job.error} ({job.imported} events imported before the error)")
+    print(f"imported {job.imported} events into {len(job.weeks)} weeks")
+
+
+def cmd_query(planner, args):
+    store = planner.week_store(args.week)
+    days = [args.day] if args.day else DAYS
+    found = []
+    for day in days:
+        if args.between:
+            found.extend(store.overlapping(day, args.between[0], args.between[1]))
+        else:
+            found.extend(store.day_entries(day))
+    if args.json:
+        json.dump([entry_dict(planner, store.week, e) for e in found], sys.stdout, indent=2)
+        print()
+        return
+    for e in found:
+        fx = " (Fixed)" if e.fixed else ""
+        print(f"{e.day:<3}{format_time(e.start)} - {format_time(e.end)}: {e.name} — {planner.categories.name(e.category)}{fx}")
+
+
+def cmd_conflicts(planner, args):
+    week = planner.week_store(args.week).week
+    pairs = planner.conflict_pairs(week)
+    if args.json:
+        json.dump([[entry_dict(planner, week, a), entry_dict(planner, week, b)]
+                   for day in DAYS for a, b in pairs.get(day, ())], sys.stdout, indent=2)
+        print()
+    else:
+        for day in DAYS:
+            for a, b in pairs.get(day, ()):
+                print(f"{day:<3}{a.name} ({_clock(a.start)}-{_clock(a.end)}) overlaps "
+                      f"{b.name} ({_clock(b.start)}-{_clock(b.end)})")
+    return 1 if pairs else 0
+
+
+def cmd_totals(planner, args):
+    totals = planner.totals(args.week)
+    rows = [(planner.categories.name(cid), hours) for cid, hours in enumerate(totals) if hours > 0]
+    if args.json:
+        json.dump(dict(rows), sys.stdout, indent=2)
+        print()
+        return
+    for name, hours in rows:
+        print(f"{name:<20}{hours:7.2f}h")
+    print(f"{'Total':<20}{sum(totals):7.2f}h")
+
+
+def cmd_stats(planner, args):
+    cats = planner.categories
+    if args.target:
+        rows = planner.target_report(parse_targets(args.target), args.last, args.week)
+        if args.json:
+            json.dump({name: {"target": t, "actual": a} for name, t, a in rows}, sys.stdout, indent=2)
+            print()
+            return
+        for name, target, actual in rows:
+            print(f"{name:<20}{actual:8.2f}h of {target:.2f}h ({100 * actual / target if target else 0:.0f}%)")
+        return
+    if args.by == "hour":
+        grid = planner.time_heatmap(args.last, args.week)
+        if args.json:
+            json.dump({d: row.tolist() for d, row in zip(DAYS, grid)}, sys.stdout, indent=2)
+            print()
+            return
+        print("    " + "".join(f"{h:>5}" for h in range(24)))
+        for d, row in zip(DAYS, grid):
+            print(f"{d:<4}" + "".join(f"{v:5.1f}" for v in row))
+        return
+    if args.by == "month":
+        periods, hours = planner.monthly_hours(args.last, args.week)
+        labels = [p.strftime("%Y-%m") for p in periods]
+    else:
+        periods, hours = planner.weekly_hours(args.last, args.week)
+        labels = [p.isoformat() for p in periods]
+    used = [cid for cid in range(hours.shape[1]) if hours[:, cid].any()]
+    if args.json:
+        json.dump({label: {cats.name(cid): float(row[cid]) for cid in used} for label, row in zip(labels, hours)},
+                  sys.stdout, indent=2)
+        print()
+        return
+    print(f"{'':<12}" + "".join(f"{cats.name(cid)[:11]:>12}" for cid in used) + f"{'Total':>10}")
+    for label, row in zip(labels, hours):
+        print(f"{label:<12}" + "".join(f"{row[cid]:12.2f}" for cid in used) + f"{row.sum():10.2f}")
+
+
+def cmd_export(planner, args):
+    first = args.first or planner.week
+    last = args.last or first
+    ext = args.path.lower().rpartition(".")[2]
+    if args.format is None and ext in ("png", "pdf"):
+        raise PlannerError(f"{ext.upper()} pages are written into a folder; pass a folder path and --format {ext}.")
+    fmt = args.format or (ext if ext in ("json", "ics") else "csv")
+    if fmt in ("png", "pdf"):
+        return _export_pages(planner, args, first, last, fmt)
+    if fmt == "ics":
+        from exporter import write_ics
+        categories = planner.categories.palette()
+        with open(args.path, "w", encoding="utf-8", newline="") as fh:
+            count = write_ics(fh, planner.export_weeks(first, last), categories)
+        print(f"exported {count} events to {args.path}")
+        return
+    rows = (entry_dict(planner, week, e) for week, e in planner.iter_entries(first, last))
+    count = 0
+    with open(args.path, "w", newline="", encoding="utf-8") as fh:
+        if fmt == "json":
+            rows = list(rows)
+            json.dump(rows, fh, indent=2)
+            count = len(rows)
+        else:
+            writer = csv.writer(fh)
+            writer.writerow(["Subject", "Start Date", "Start Time", "End Time", "Category", "Fixed"])
+            for r in rows:
+                writer.writerow([r["name"], r["date"], _clock(r["start"]), _clock(r["end"]), r["category"], int(r["fixed"])])
+                count += 1
+    print(f"exported {count} entries to {args.path}")
+
+
+def _export_pages(planner, args, first, last, fmt):
+    # one file per page in the folder args.path, drawn on worker processes
+    job = planner.export_job(args.path, first, last, [fmt], args.views, args.workers).start()
+    try:
+        while not job.done:
+            time.sleep(0.2)
+            if not args.quiet:
+                print(f"\r{job.written}/{job.total} pages", end="", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        job.cancel()
+        job.wait()
+    if not args.quiet:
+        print(file=sys.stderr)
+    if job.error is not None:
+        raise PlannerError(f"export failed after {job.written} pages: {job.error}")
+    print(f"exported {job.written} pages to {args.path}")
+    return 1 if job.cancelled else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="planner_cli", description="Daily Planner batch commands")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"planner database (default {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    this_week = week_start(date.today())
+
+    p = sub.add_parser("add", help="add an entry at a fixed time")
+    p.add_argument("name")
+    p.add_argument("--day", type=_day, required=True)
+    p.add_argument("--start", type=_hour, required=True)
+    p.add_argument("--end", type=_hour, required=True)
+    p.add_argument("--category", default="Personal")
+    p.add_argument("--fixed", action="store_true")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("place", help="place an activity in the first free slot of a day")
+    p.add_argument("name")
+    p.add_argument("--day", type=_day, required=True)
+    p.add_argument("--best-fit", action="store_true", help="use the smallest gap that fits")
+    p.add_argument("--step", type=int, default=30, help="start-time granularity in minutes")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.set_defaults(func=cmd_place)
+
+    p = sub.add_parser("repeat", help="add a weekly recurring event")
+    p.add_argument("name")
+    p.add_argument("--days", type=_day, nargs="+", required=True)
+    p.add_argument("--start", type=_hour, required=True)
+    p.add_argument("--end", type=_hour, required=True)
+    p.add_argument("--category", default="Personal")
+    p.add_argument("--from", dest="first", type=_date, help="first date (default: Monday of this week)")
+    p.add_argument("--every", type=int, default=1, help="repeat every N weeks")
+    p.add_argument("--until", type=_date)
+    p.add_argument("--count", type=int, help="stop after this many occurrences")
+    p.add_argument("--skip", type=_date, nargs="+", help="dates to leave out")
+    p.set_defaults(func=cmd_repeat)
+
+    p = sub.add_parser("rules", help="list recurring events")
+    p.add_argument("--delete", type=int, metavar="ID", help="delete a rule and all its occurrences")
+    p.set_defaults(func=cmd_rules)
+
+    p = sub.add_parser("remind", help="add, list or deliver reminders")
+    p.add_argument("text", nargs="?", help="reminder text (omit to list reminders)")
+    when = p.add_mutually_exclusive_group()
+    when.add_argument("--at", type=_moment, help="date and time, e.g. 2025-10-08T09:50")
+    when.add_argument("--before", metavar="NAME", help="remind before this entry (every occurrence if it repeats)")
+    p.add_argument("--lead", type=float, default=10, help="minutes before --before (default 10)")
+    p.add_argument("--day", type=_day, help="day of the --before entry (default: first match in the week)")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.add_argument("--due", action="store_true", help="print reminders that are due and mark them delivered")
+    p.add_argument("--delete", type=int, metavar="N", help="delete reminder N (as listed)")
+    p.set_defaults(func=cmd_remind)
+
+    p = sub.add_parser("optimize", help="repack the week's flexible activities around fixed ones")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.add_argument("--target", nargs="+", metavar="CATEGORY=HOURS", help="weekly hours to reach per category")
+    p.add_argument("--window", nargs="+", metavar="CATEGORY=START-END", help="preferred time of day per category")
+    p.add_argument("--gap", type=int, default=0, metavar="MINUTES", help="minimum gap between entries")
+    p.add_argument("--budget", type=float, help="seconds to search (default 3)")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    p.add_argument("--dry-run", action="store_true", help="print the plan without saving it")
+    p.set_defaults(func=cmd_optimize)
+
+    p = sub.add_parser("import", help="import an ICS or CSV calendar")
+    p.add_argument("path")
+    p.add_argument("--category", default="Personal", help="category for events without one")
+    p.add_argument("--quiet", action="store_true")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("query", help="list entries of a week")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.add_argument("--day", type=_day)
+    p.add_argument("--between", type=_hour, nargs=2, metavar=("START", "END"),
+                   help="only entries overlapping this time range")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("conflicts", help="list overlapping entries of a week (exit status 1 if any)")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_conflicts)
+
+    p = sub.add_parser("totals", help="hours per category for a week")
+    p.add_argument("--week", type=_week, default=this_week)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_totals)
+
+    p = sub.add_parser("stats", help="hours per category over many weeks or months, by time of day, or against targets")
+    p.add_argument("--by", choices=("week", "month", "hour"), default="week")
+    p.add_argument("--last", type=int, default=12, metavar="N", help="weeks (months with --by month) up to --week")
+    p.add_argument("--week", type=_week, default=this_week, help="last week included (default this week)")
+    p.add_argument("--target", nargs="+", metavar="CATEGORY=HOURS", help="compare against weekly hour targets")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("export", help="export entries to CSV, JSON or ICS, or as PNG/PDF pages")
+    p.add_argument("path", help="output file, or folder for png/pdf pages")
+    p.add_argument("--from", dest="first", type=_week, help="first week (default this week)")
+    p.add_argument("--to", dest="last", type=_week, help="last week (default --from)")
+    p.add_argument("--format", choices=("csv", "json", "ics", "png", "pdf"),
+                   help="default: from the file extension, else csv")
+    p.add_argument("--views", nargs="+", choices=("week", "day"), default=["week"],
+                   help="pages to draw for png/pdf (one per week and/or one per day)")
+    p.add_argument("--workers", type=int, help="worker processes for png/pdf (default: one per core)")
+    p.add_argument("--quiet", action="store_true")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    planner = Planner(args.db)
+    try:
+        status = args.func(planner, args)
+    except (PlannerError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        planner.close()
+    storage = planner.storage
+    if storage is not None and storage.error is not None:
+        print(f"error: {storage.failed_writes} writes could not be saved ({storage.error})", file=sys.stderr)
+        return 1
+    return status or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
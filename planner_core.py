@@ -0,0 +1,904 @@
+# planner_core.py
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from categories import CategoryTable
+from conflicts import ConflictIndex
+from entries import DAY_INDEX, DAYS, Entry, day_date, week_start
+from history import History
+from recurrence import RecurrenceEngine, Rule
+from reminders import DEFAULT_LEAD, MISSED_AFTER, Reminder, ReminderQueue, stamp
+from schedule_store import ScheduleStore
+
+# -----------------------
+# Headless planner core
+# -----------------------
+# Planner owns everything the app knows (categories, activities, reminders and
+# one ScheduleStore per week) plus the scheduling rules: validation,
+# placement, totals and conflict queries. Every change made through it is
+# recorded in self.history for undo/redo. It never imports tkinter, so the
+# CLI, benchmarks and tests can drive it without a display; PlannerApp in
+# Schedule_ttkbootstrap.py is a view over it.
+DEFAULT_DB = os.environ.get("PLANNER_DB", os.path.join(os.path.expanduser("~"), ".daily_planner.sqlite3"))
+DAY_START = 8.0
+DAY_END = 20.0
+
+# default category colors
+DEFAULT_CATEGORIES = {
+    "Coursework": "#4fa3c7",
+    "Sleep": "#b296c7",
+    "Personal": "#f5a962",
+    "Social": "#8fbc8f",
+    "Recreation": "#ee6c6c"
+}
+
+# default activities (name -> (category, duration_hours))
+DEFAULT_ACTIVITIES = {
+    "Take a Nap": ("Sleep", 1.0),
+    "Eat Breakfast": ("Personal", 0.5),
+    "Lift Weights": ("Recreation", 1.0),
+    "TV with Friends": ("Social", 0.5),
+    "Self Care": ("Personal", 1.0),
+}
+
+# sample weekly classes (day, start, end, name, category) seeded into a new planner
+SAMPLE_ENTRIES = [
+    ("W", 10.0, 11.0, "Writing Seminar", "Coursework"),
+    ("W", 12.0, 13.0, "Psychology Lecture", "Coursework"),
+]
+
+DEFAULT_REMINDERS = [
+    "Bring notes to Writing Seminar",
+    "Email professor by 4 PM"
+]
+REMINDER_HORIZON = 400  # days searched for the next occurrence of a repeating event
+
+
+class PlannerError(ValueError):
+    pass
+
+
+def format_time(h):
+    h_int = int(h)
+    m = int(round((h - h_int) * 60))
+    suffix = "AM" if h_int < 12 else "PM"
+    h_disp = h_int if 1 <= h_int <= 12 else (h_int - 12 if h_int > 12 else 12)
+    return f"{h_disp}:{m:02d} {suffix}"
+
+
+def parse_hour(value):
+    # 13.5 or 13:30
+    h, sep, m = value.strip().partition(":")
+    try:
+        return int(h) + int(m) / 60 if sep else float(value)
+    except ValueError:
+        raise PlannerError(f"Expected a time like 13.5 or 13:30, got '{value}'.") from None
+
+
+def parse_targets(specs):
+    # ["Recreation=3", ...] -> {"Recreation": 3.0}
+    targets = {}
+    for spec in specs:
+        name, sep, hours = spec.partition("=")
+        try:
+            targets[name.strip()] = float(hours)
+        except ValueError:
+            raise PlannerError(f"Expected Category=hours, got '{spec}'.") from None
+        if not sep or not name.strip():
+            raise PlannerError(f"Expected Category=hours, got '{spec}'.")
+    return targets
+
+
+def parse_windows(specs):
+    # ["Recreation=16-19", "Sleep=13:00-15:30", ...] -> {"Recreation": (16.0, 19.0), ...}
+    windows = {}
+    for spec in specs:
+        name, sep, span = spec.partition("=")
+        lo, dash, hi = span.partition("-")
+        if not sep or not dash or not name.strip():
+            raise PlannerError(f"Expected Category=start-end, got '{spec}'.")
+        windows[name.strip()] = (parse_hour(lo), parse_hour(hi))
+    return windows
+
+class Planner:
+    def __init__(self, db_path=None):
+        # db_path=None keeps everything in memory (nothing is saved)
+        self.categories = CategoryTable(DEFAULT_CATEGORIES)
+        self.activities = {name: (self.categories.id_of(cat), dur) for name, (cat, dur) in DEFAULT_ACTIVITIES.items()}
+        self.reminders = [Reminder(text, id=i) for i, text in enumerate(DEFAULT_REMINDERS)]
+        self.reminder_queue = ReminderQueue()  # due times of the timed reminders
+        self._attached = {}  # Reminder.key -> reminders tied to that entry or rule
+        self.week = week_start(date.today())
+        self._weeks = {}  # week -> ScheduleStore when running without storage
+        self._analytics = None  # analytics.Analytics, built on first use
+        self.storage = None
+        self.history = History()
+        if db_path is not None:
+            from storage import PlannerStorage
+            self.storage = PlannerStorage(db_path)
+        self.recurrence = RecurrenceEngine(self.storage.load_rules() if self.storage is not None else ())
+        if self.storage is not None:
+            self.recurrence.listeners.append(self.storage.rule_listener)
+        self.recurrence.listeners.append(self._rule_reminders)
+        self._load()
+        self._reminder_ids = itertools.count(max((r.id for r in self.reminders), default=-1) + 1)
+        for r in self.reminders:
+            self._index_reminder(r, True)
+            self._arm(r)  # from the saved start times; no week is loaded for this
+        self.history.clear()  # seeding a fresh planner is not an undoable step
+
+    def _load(self):
+        meta = self.storage.load_meta() if self.storage is not None else None
+        if meta is None:
+            # fresh planner: defaults plus the sample classes, repeating weekly from this week
+            for day, start, end, name, cat in SAMPLE_ENTRIES:
+                self.add_rule(name, self.categories.id_of(cat), start, end, [day])
+            self.save_meta()
+            for r in self.reminders:
+                self._save_reminder(r)
+            return
+        cats, acts, rems = meta
+        self.categories.load_rows(cats)
+        self.activities = {name: (cid, dur) for name, cid, dur in acts}
+        self.reminders = list(rems)  # Reminder objects (storage builds them from rows)
+
+    def save_meta(self):
+        if self.storage is not None:
+            self.storage.save_meta(self.categories, self.activities)
+
+    def _save_reminder(self, r):
+        if self.storage is not None:
+            self.storage.save_reminder(r)
+
+    def close(self):
+        optimizer = sys.modules.get("optimizer")  # only loaded once a job was made
+        if optimizer is not None:
+            optimizer.shutdown_pool()
+        if self.storage is not None:
+            self.storage.close()
+
+    # -----------------------
+    # Weeks
+    # -----------------------
+    def week_store(self, week=None):
+        week = self.week if week is None else week_start(week)
+        if self.storage is not None:
+            store = self.storage.week_store(week)
+        else:
+            store = self._weeks.get(week)
+            if store is None:
+                store = self._weeks[week] = ScheduleStore(week=week)
+        # recurring events are expanded into the store only for weeks in use
+        store = self.recurrence.materialize(store)
+        if self._analytics is not None and store.analytics is None:
+            self._analytics.watch(store)
+        if store.reminders is None:
+            store.listeners.append(self._entry_reminders(store.week))
+            store.reminders = self.reminder_queue
+        return store
+
+    @property
+    def schedule(self):
+        return self.week_store(self.week)
+
+    def set_week(self, week):
+        self.week = week_start(week)
+        if self.storage is not None:
+            self.storage.pinned = self.week
+            self.storage.prefetch([self.week - timedelta(days=7), self.week + timedelta(days=7)])
+        return self.schedule
+
+    def iter_entries(self, first, last):
+        # (week, entry) for every entry in weeks first..last (inclusive),
+        # stored entries and recurring occurrences merged in (week, day, start) order
+        first, last = week_start(first), week_start(last)
+        if self.storage is not None:
+            stored = self.storage.iter_entries(first, last)
+        else:
+            stored = ((week, e) for week in sorted(w for w in self._weeks if first <= w <= last)
+                      for day in DAYS for e in self._weeks[week].day_entries(day) if e.rule is None)
+        key = lambda item: (item[0], DAY_INDEX[item[1].day], item[1].start)
+        yield from heapq.merge(stored, self.recurrence.expand(first, last), key=key)
+
+    # -----------------------
+    # Categories
+    # -----------------------
+    def category_id(self, name):
+        cid = self.categories.id_of(name)
+        if cid is None:
+            raise PlannerError(f"Unknown category '{name}'.")
+        return cid
+
+    def add_category(self, name, color=None):
+        held = self.categories.slot(name)
+        before = self._category_row(held) if held is not None else None
+        cid = self.categories.intern(name, color)
+        if color:
+            self.categories.recolor(cid, color)
+        self._record_category(f"Add category {name}", cid, before or (name, self.categories.colors[cid], False))
+        self.save_meta()
+        return cid
+
+    def rename_category(self, cid, new):
+        before = self._category_row(cid)
+        try:
+            self.categories.rename(cid, new)
+        except ValueError as exc:
+            raise PlannerError(str(exc)) from None
+        self._record_category(f"Rename {before[0]}", cid, before)
+        self.save_meta()
+
+    def recolor_category(self, cid, color):
+        before = self._category_row(cid)
+        self.categories.recolor(cid, color)
+        self._record_category(f"Recolor {before[0]}", cid, before)
+        self.save_meta()
+
+    def remove_category(self, cid):
+        before = self._category_row(cid)
+        self.categories.remove(cid)
+        self._record_category(f"Remove category {before[0]}", cid, before)
+        self.save_meta()
+
+    def _category_row(self, cid):
+        c = self.categories
+        return c.names[cid], c.colors[cid], c.active[cid]
+
+    def _set_category_row(self, cid, row):
+        name, color, active = row
+        c = self.categories
+        if c.names[cid] != name:
+            c.rename(cid, name)
+        c.recolor(cid, color)
+        c.active[cid] = active
+        self.save_meta()
+
+    def _record_category(self, label, cid, before):
+        after = self._category_row(cid)
+        self.history.record(label, lambda: self._set_category_row(cid, before),
+                            lambda: self._set_category_row(cid, after))
+
+    def totals(self, week=None):
+        # hours per category id for one week (maintained incrementally by the store)
+        totals = self.week_store(week).totals.week()
+        totals.extend([0.0] * (len(self.categories) - len(totals)))
+        return totals
+
+    def chart_data(self, week=None):
+        # (labels, sizes, colors) for the donut chart
+        categories = self.categories
+        labels = []
+        sizes = []
+        colors = []
+        for cid, v in enumerate(self.totals(week)):
+            if v > 0:
+                labels.append(categories.names[cid])
+                sizes.append(v)
+                colors.append(categories.color(cid))
+        if not sizes:
+            # placeholder segments to keep look pleasant
+            ids = categories.ids()[:3]
+            labels = [categories.names[cid] for cid in ids]
+            sizes = [1] * len(ids)
+            colors = [categories.colors[cid] for cid in ids]
+        return labels, sizes, colors
+
+    # -----------------------
+    # Activities
+    # -----------------------
+    def set_activity(self, name, cid, duration, old_name=None):
+        if duration is None or duration <= 0:
+            raise PlannerError("Duration must be positive.")
+        if name != old_name and name in self.activities:
+            raise PlannerError("Activity with that name already exists.")
+        before = dict(self.activities)
+        if old_name is not None and old_name != name:
+            del self.activities[old_name]
+        self.activities[name] = (cid, float(duration))
+        self._record_activities(f"Edit {old_name}" if old_name is not None else f"Add {name}", before)
+        self.save_meta()
+
+    def remove_activity(self, name):
+        before = dict(self.activities)
+        del self.activities[name]
+        self._record_activities(f"Remove {name}", before)
+        self.save_meta()
+
+    def _set_activities(self, table):
+        # in place: the order of the dict is the order of the tiles
+        self.activities.clear()
+        self.activities.update(table)
+        self.save_meta()
+
+    def _record_activities(self, label, before):
+        # the activity table is a handful of rows; a step keeps both versions
+        after = dict(self.activities)
+        self.history.record(label, lambda: self._set_activities(before), lambda: self._set_activities(after),
+                            items=len(before) + len(after))
+
+    # -----------------------
+    # Schedule
+    # -----------------------
+    def _check_span(self, day, start, end):
+        if day not in DAY_INDEX:
+            raise PlannerError(f"Unknown day code '{day}'.")
+        if end <= start:
+            raise PlannerError("End must be greater than start.")
+        if start < 0 or end > 24:
+            raise PlannerError("Times must fall within the day (0-24).")
+
+    def add_entry(self, day, start, end, name, cid, fixed=False, week=None):
+        self._check_span(day, start, end)
+        store = self.week_store(week)
+        e = store.add(Entry(day, float(start), float(end), name, cid, fixed))
+        self._record_add(f"Add {name}", store.week, e)
+        return e
+
+    def update_entry(self, entry, week=None, **changes):
+        self._check_span(changes.get("day", entry.day), changes.get("start", entry.start), changes.get("end", entry.end))
+        store = self.week_store(week)
+        week = store.week
+        if entry.rule is None:
+            before = {k: getattr(entry, k) for k in changes}
+            try:
+                store.update(entry, **changes)
+            except ValueError:  # e.g. its add was undone meanwhile
+                raise PlannerError("That entry no longer exists.") from None
+            self.history.record(f"Edit {entry.name}", lambda: self._change(week, entry, before),
+                                lambda: self._change(week, entry, changes))
+            return entry
+        # editing one occurrence of a recurring event detaches it from the series
+        fields = {"day": entry.day, "start": entry.start, "end": entry.end, "name": entry.name,
+                  "category": entry.category, "fixed": entry.fixed}
+        fields.update(changes)
+        with self.history.group(f"Edit {entry.name}"):
+            self._exclude(entry.rule, day_date(week, entry.day), None)
+            e = store.add(Entry(fields["day"], fields["start"], fields["end"], fields["name"],
+                                fields["category"], fields["fixed"]))
+            self._record_add(None, week, e)
+        return e
+
+    def remove_entry(self, entry, week=None):
+        store = self.week_store(week)
+        week = store.week
+        if entry.rule is not None:
+            self._exclude(entry.rule, day_date(week, entry.day), f"Remove {entry.name}")
+        else:
+            try:
+                store.remove(entry)
+            except ValueError:
+                raise PlannerError("That entry no longer exists.") from None
+            self.history.record(f"Remove {entry.name}", lambda: self.week_store(week).add(entry),
+                                lambda: self._take(week, entry))
+
+    def clear_day(self, day, week=None):
+        store = self.week_store(week)
+        week = store.week
+        removed = self._clear_day(store, day)
+        # undo hands the removed (already ordered) list straight back to the store
+        kept = [e for e in removed if e.rule is None]
+        rules = [e.rule for e in removed if e.rule is not None]
+        self.history.record(f"Clear {day}", lambda: self._unclear_day(week, day, kept, rules),
+                            lambda: self._clear_day(self.week_store(week), day), items=len(removed))
+        return removed
+
+    def _clear_day(self, store, day):
+        removed = store.clear_day(day)
+        occurrences = [e for e in removed if e.rule is not None]
+        if occurrences:
+            # the series stay; this day just becomes an exception for each of them
+            self.recurrence.forget(store, occurrences)
+            for e in occurrences:
+                self.recurrence.exclude(e.rule, day_date(store.week, day))
+        return removed
+
+    def _unclear_day(self, week, day, kept, rules):
+        self.week_store(week).restore_day(day, kept)
+        for rule_id in rules:
+            self.recurrence.include(rule_id, day_date(week, day))
+
+    # --- history helpers ---
+    def _live(self, week, entry):
+        # (store, the store's object for entry): a week evicted from the cache and
+        # loaded again holds new objects, so fall back to matching the row id
+        store = self.week_store(week)
+        days = [entry.day] + [d for d in DAYS if d != entry.day]
+        for day in days:
+            for e in store.day_entries(day):
+                if e is entry or (entry.id is not None and e.id == entry.id):
+                    return store, e
+        raise PlannerError(f"'{entry.name}' is no longer in the schedule.")
+
+    def _take(self, week, entry):
+        store, e = self._live(week, entry)
+        store.remove(e)
+
+    def _change(self, week, entry, fields):
+        store, e = self._live(week, entry)
+        store.update(e, **fields)
+
+    def _record_add(self, label, week, e):
+        self.history.record(label, lambda: self._take(week, e), lambda: self.week_store(week).add(e))
+
+    def _exclude(self, rule_id, d, label):
+        self.recurrence.exclude(rule_id, d)
+        self.history.record(label, lambda: self.recurrence.include(rule_id, d),
+                            lambda: self.recurrence.exclude(rule_id, d))
+
+    # -----------------------
+    # Recurring events
+    # -----------------------
+    def add_rule(self, name, cid, start, end, days, first=None, interval=1, until=None, count=None):
+        # days: day codes, e.g. ["M", "W"]; first defaults to the current week's Monday
+        for day in days:
+            self._check_span(day, start, end)
+        if not days:
+            raise PlannerError("Pick at least one day to repeat on.")
+        if interval < 1 or (count is not None and count < 1):
+            raise PlannerError("Interval and count must be positive.")
+        first = self.week if first is None else first
+        if until is not None and until < first:
+            raise PlannerError("The repeat end date is before its start.")
+        rule = self.recurrence.add(Rule(name, cid, start, end, Rule.mask(days), first, interval, until, count))
+        self.history.record(f"Repeat {name}", lambda: self.recurrence.remove(rule.id),
+                            lambda: self.recurrence.restore(rule))
+        return rule
+
+    def update_rule(self, rule_id, **changes):
+        if "days" in changes:
+            changes["days"] = Rule.mask(changes["days"])
+        rule = self.recurrence.rules[rule_id]
+        before = {k: set(getattr(rule, k)) if k == "exceptions" else getattr(rule, k) for k in changes}
+        self.recurrence.update(rule_id, **changes)
+        self.history.record(f"Edit {rule.name}", lambda: self.recurrence.update(rule_id, **before),
+                            lambda: self.recurrence.update(rule_id, **changes))
+        return rule
+
+    def remove_rule(self, rule_id):
+        rule = self.recurrence.rules[rule_id]
+        self.recurrence.remove(rule_id)
+        self.history.record(f"Remove {rule.name}", lambda: self.recurrence.restore(rule),
+                            lambda: self.recurrence.remove(rule_id))
+
+    def find_slot(self, day, duration, best_fit=False, step_minutes=30, week=None):
+        store = self.week_store(week)
+        fit = store.best_fit if best_fit else store.first_fit
+        return fit(day, duration, DAY_START, DAY_END, step_minutes)
+
+    def place_activity(self, name, day, best_fit=False, step_minutes=30, week=None):
+        # adds an activity to a day at the first (or best) available slot
+        cid, dur = self.activities.get(name, (self.categories.id_of("Personal"), 1.0))
+        start = self.find_slot(day, dur, best_fit, step_minutes, week)
+        if start is None:
+            raise PlannerError("No available time slot to add that activity on this day.")
+        store = self.week_store(week)
+        e = store.add(Entry(day, start, start + dur, name, cid, False))
+        self._record_add(f"Add {name}", store.week, e)
+        return e
+
+    def entry_label(self, e):
+        # one schedule list line
+        fx = " (Fixed)" if e.fixed else ""
+        return f"{format_time(e.start)} - {format_time(e.end)}: {e.name} — {self.categories.name(e.category)}{fx}"
+
+    # -----------------------
+    # Conflicts
+    # -----------------------
+    def conflicts(self, day, start, end, week=None, ignore=None):
+        # "would this conflict?": entries a span would overlap, O(log n + k)
+        return [e for e in self.week_store(week).overlapping(day, start, end) if e is not ignore]
+
+    def rule_conflicts(self, start, end, days, week=None):
+        # entries the week's occurrences of a new repeating event would overlap
+        return [e for day in days for e in self.conflicts(day, start, end, week)]
+
+    def conflict_index(self, week=None):
+        # live set of overlapping entries for a week, kept up to date by store listeners
+        store = self.week_store(week)
+        if store.conflicts is None:
+            store.conflicts = ConflictIndex(store)
+        return store.conflicts
+
+    def is_conflicted(self, entry, week=None):
+        return self.conflict_index(week).is_conflicted(entry)
+
+    def conflict_pairs(self, week=None):
+        # {day: [(a, b), ...]} for every day of the week with overlaps
+        index = self.conflict_index(week)
+        pairs = {day: index.day_pairs(day) for day in DAYS}
+        return {day: p for day, p in pairs.items() if p}
+
+    # -----------------------
+    # Analytics
+    # -----------------------
+    def analytics(self):
+        # hours per day/week/month and time of day across weeks (see analytics.py);
+        # built on first use, then kept current by every store edit
+        if self._analytics is None:
+            try:
+                from analytics import Analytics
+            except ImportError:
+                raise PlannerError("Analytics needs NumPy (pip install numpy).") from None
+            self._analytics = Analytics(self._stored_rows, self._rule_rows)
+            self.recurrence.listeners.append(self._analytics.rules_changed)
+        return self._analytics
+
+    def _stored_rows(self, first, last):
+        if self.storage is not None:
+            return self.storage.entry_rows(first, last)
+        return [(week.toordinal() + DAY_INDEX[e.day], e.category, e.start, e.end)
+                for week, store in self._weeks.items() if first <= week <= last
+                for day in DAYS for e in store.day_entries(day) if e.rule is None]
+
+    def _rule_rows(self, first, last):
+        return [(week.toordinal() + DAY_INDEX[e.day], e.category, e.start, e.end)
+                for week, e in self.recurrence.expand(first, last)]
+
+    def weekly_hours(self, weeks, week=None):
+        # ([Mondays], [weeks, categories] hours) for the `weeks` weeks ending with `week`
+        last = week_start(week or self.week)
+        first = last - timedelta(days=7 * (weeks - 1))
+        hours = self.analytics().weekly(first, last)
+        return [first + timedelta(days=7 * i) for i in range(weeks)], self._pad(hours)
+
+    def monthly_hours(self, months, week=None):
+        # ([month starts], [months, categories] hours) for the `months` months ending with `week`'s
+        last = week_start(week or self.week)
+        key = last.year * 12 + last.month - 1 - (months - 1)
+        first = date(key // 12, key % 12 + 1, 1)
+        labels, hours = self.analytics().monthly(first, last)
+        return labels, self._pad(hours)
+
+    def time_heatmap(self, weeks, week=None, cid=None):
+        # [weekday, hour] hours over the `weeks` weeks ending with `week`
+        last = week_start(week or self.week)
+        return self.analytics().heatmap(last - timedelta(days=7 * (weeks - 1)), last, cid)
+
+    def target_report(self, targets, weeks, week=None):
+        # [(category name, target hours, actual hours)] over the `weeks` weeks ending
+        # with `week`; targets: {category name: hours per week}
+        last = week_start(week or self.week)
+        ids = {name: self.category_id(name) for name in targets}
+        report = self.analytics().versus({ids[n]: h for n, h in targets.items()},
+                                         last - timedelta(days=7 * (weeks - 1)), last)
+        return [(name, *report[ids[name]]) for name in targets]
+
+    def _pad(self, hours):
+        # one column per category, including ones that have no hours yet
+        missing = len(self.categories) - hours.shape[1]
+        if missing > 0:
+            import numpy as np
+            hours = np.pad(hours, ((0, 0), (0, missing)))
+        return hours
+
+    # -----------------------
+    # Week optimizer
+    # -----------------------
+    def optimize_job(self, targets=None, windows=None, min_gap_minutes=0, budget=None, workers=None,
+                     step_minutes=30, week=None):
+        # targets: {category name: hours per week}; windows: {category name: (start, end)}.
+        # The job searches on worker processes; call .start(), poll .best, then apply_plan()
+        from optimizer import DEFAULT_BUDGET, OptimizeJob, build_problem
+        cats = {}
+        for name in list(targets or ()) + list(windows or ()):
+            cid = self.categories.id_of(name)
+            if cid is None:
+                raise PlannerError(f"Unknown category '{name}'.")
+            cats[name] = cid
+        for name, (lo, hi) in (windows or {}).items():
+            if not DAY_START <= lo < hi <= DAY_END:
+                raise PlannerError(f"The window for {name} must fall between {format_time(DAY_START)} and {format_time(DAY_END)}.")
+        if any(h < 0 for h in (targets or {}).values()) or min_gap_minutes < 0:
+            raise PlannerError("Targets and gaps can't be negative.")
+        store = self.week_store(week)
+        problem = build_problem(store, self.activities,
+                                {cats[n]: h for n, h in (targets or {}).items()},
+                                {cats[n]: w for n, w in (windows or {}).items()},
+                                min_gap_minutes / 60.0, DAY_START, DAY_END, step_minutes)
+        replaces = [e for day in DAYS for e in store.day_entries(day) if not e.fixed and e.rule is None]
+        return OptimizeJob(problem, budget or DEFAULT_BUDGET, workers, week=store.week, replaces=replaces)
+
+    def warm_optimizer(self, workers=None):
+        # start the optimizer's worker processes in the background (e.g. while
+        # its dialog is filled in); a failure here is reported by the job instead
+        def run():
+            from optimizer import warm_up
+            try:
+                warm_up(workers)
+            except Exception:
+                pass
+        threading.Thread(target=run, name="planner-optimize-warm-up", daemon=True).start()
+
+    def apply_plan(self, job):
+        # swap the week's flexible entries for the job's best plan; returns (added, unplaced)
+        if job.best is None:
+            raise PlannerError("The optimizer has not found a plan yet.")
+        store = self.week_store(job.week)
+        removed = []
+        for e in job.replaces:
+            try:
+                store.remove(e)
+            except ValueError:
+                continue  # already removed while the optimizer ran
+            removed.append(e)
+        rows, unplaced = job.plan()
+        added = [store.add(Entry(day, s, t, name, cid, False)) for day, s, t, name, cid in rows]
+        week = store.week
+        self.history.record("Auto-schedule", lambda: self._swap(week, added, removed),
+                            lambda: self._swap(week, removed, added), items=len(added) + len(removed))
+        return added, unplaced
+
+    def _swap(self, week, out, back):
+        for e in out:
+            self._take(week, e)
+        store = self.week_store(week)
+        for e in back:
+            store.add(e)
+
+    # -----------------------
+    # Reminders
+    # -----------------------
+    def make_reminder(self, text, at=None, before=None, lead=DEFAULT_LEAD, week=None):
+        # a checked Reminder (not added yet): at is a datetime; before is an entry of
+        # `week`, and an occurrence of a repeating event means every occurrence
+        text = text.strip()
+        if not text:
+            raise PlannerError("A reminder needs some text.")
+        if at is not None:
+            if at.timestamp() <= time.time():
+                raise PlannerError("That time has already passed.")
+            return Reminder(text, at=at.timestamp())
+        if before is None:
+            return Reminder(text)
+        if lead < 0:
+            raise PlannerError("Minutes before must not be negative.")
+        if before.rule is not None:
+            # start from now, so occurrences already past are not reported as missed
+            return Reminder(text, rule=before.rule, lead=float(lead), fired=time.time())
+        week = self.week if week is None else week_start(week)
+        r = Reminder(text, week=week, entry=before.id if before.id is not None else before, lead=float(lead))
+        if self._reminder_due(r, before) <= time.time():
+            raise PlannerError(f"'{before.name}' starts too soon for a reminder {lead:g} minutes before.")
+        return r
+
+    def add_reminder(self, reminder):
+        if isinstance(reminder, str):
+            reminder = self.make_reminder(reminder)
+        idx = len(self.reminders)
+        self._put_reminder(idx, reminder)
+        self.history.record("Add reminder", lambda: self._drop_reminder(idx),
+                            lambda: self._put_reminder(idx, reminder))
+        return reminder
+
+    def edit_reminder(self, idx, reminder):
+        if isinstance(reminder, str):
+            reminder = self.reminders[idx].copy(text=reminder)
+        old = self.reminders[idx]
+        self._set_reminder(idx, reminder)
+        self.history.record("Edit reminder", lambda: self._set_reminder(idx, old),
+                            lambda: self._set_reminder(idx, reminder))
+        return reminder
+
+    def remove_reminder(self, idx):
+        r = self.reminders[idx]
+        self._drop_reminder(idx)
+        self.history.record("Remove reminder", lambda: self._put_reminder(idx, r),
+                            lambda: self._drop_reminder(idx))
+
+    def _put_reminder(self, idx, r):
+        # new reminders go last and get the next id; undo puts one back at its old
+        # place with its old id, so the list stays in id order
+        if r.id is None:
+            r.id = next(self._reminder_ids)
+        self.reminders.insert(idx, r)
+        self._index_reminder(r, True)
+        self._arm(r)
+        self._save_reminder(r)
+
+    def _drop_reminder(self, idx):
+        r = self.reminders.pop(idx)
+        self._index_reminder(r, False)
+        self.reminder_queue.cancel(r)
+        if self.storage is not None:
+            self.storage.delete_reminder(r.id)
+
+    def _set_reminder(self, idx, r):
+        old = self.reminders[idx]
+        self._index_reminder(old, False)
+        self.reminder_queue.cancel(old)
+        r.id = old.id
+        self.reminders[idx] = r
+        self._index_reminder(r, True)
+        self._arm(r)
+        self._save_reminder(r)
+
+    def _index_reminder(self, r, add):
+        key = r.key
+        if key is None:
+            return
+        if add:
+            self._attached.setdefault(key, []).append(r)
+            return
+        tied = self._attached.get(key, [])
+        if r in tied:
+            tied.remove(r)
+        if not tied:
+            self._attached.pop(key, None)
+
+    def _reminder_due(self, r, entry=None):
+        # next wall-clock due time, or None (untimed, delivered, or its item is gone)
+        if r.rule is not None:
+            rule = self.recurrence.rules.get(r.rule)
+            if rule is None:
+                return None
+            after = time.time() if r.fired is None else r.fired
+            lo = date.fromtimestamp(after)
+            for d in rule.dates(lo, lo + timedelta(days=REMINDER_HORIZON)):
+                due = stamp(d, rule.start) - r.lead * 60
+                if due > after:
+                    return due
+            return None
+        if r.fired is not None:
+            return None
+        if r.at is not None:
+            return r.at
+        if r.entry is None:
+            return None
+        if entry is not None:
+            r.start = stamp(day_date(r.week, entry.day), entry.start)
+        if r.start is None:
+            return None  # the entry is removed
+        return r.start - r.lead * 60
+
+    def _reminded_entry(self, r):
+        store = self.week_store(r.week)
+        for day in DAYS:
+            for e in store.day_entries(day):
+                if e is r.entry or (e.id is not None and e.id == r.entry):
+                    return e
+        return None
+
+    def _arm(self, r, entry=None):
+        due = self._reminder_due(r, entry)
+        if due is None:
+            self.reminder_queue.cancel(r)
+        else:
+            self.reminder_queue.push(r, due)
+
+    def _entry_reminders(self, week):
+        # store listener: reminders follow their entry when it moves, and wait
+        # (unscheduled) while it is removed, so undo brings them back
+        def moved(e, present):
+            for r in self._attached.get(e.id if e.id is not None else e, ()):
+                if r.week == week:
+                    start = r.start
+                    if present:
+                        self._arm(r, e)
+                    else:
+                        r.start = None
+                        self.reminder_queue.cancel(r)
+                    if r.start != start:
+                        self._save_reminder(r)  # keeps startup arming off the week stores
+
+        def on_change(op, payload):
+            if not self._attached:
+                return
+            if op in ("clear_day", "restore_day"):
+                for e in payload[1]:
+                    if e.rule is None:
+                        moved(e, op == "restore_day")
+            elif payload.rule is None:
+                moved(payload, op != "remove")
+        return on_change
+
+    def _rule_reminders(self, op, rule):
+        # RecurrenceEngine listener
+        for r in self._attached.get(("rule", rule.id), ()):
+            self._arm(r)
+
+    def next_reminder_due(self):
+        # wall-clock seconds of the earliest timed reminder, or None
+        return self.reminder_queue.next_due()
+
+    def due_reminders(self, now=None):
+        # [(reminder, due, missed)] for everything due by now; one-shot reminders are
+        # marked delivered, and series move on to their next occurrence after now
+        # (so a week away is reported once per series, not once per occurrence)
+        now = time.time() if now is None else now
+        fired = []
+        for due, r in self.reminder_queue.pop_due(now):
+            fired.append((r, due, now - due > MISSED_AFTER))
+            r.fired = max(due, now)
+            if r.rule is not None:
+                self._arm(r)
+            self._save_reminder(r)
+        return fired
+
+    def reminder_target(self, r):
+        # name of the entry or repeating event a reminder is tied to, or None
+        if r.rule is not None:
+            rule = self.recurrence.rules.get(r.rule)
+            return None if rule is None else rule.name
+        if r.entry is not None:
+            e = self._reminded_entry(r)
+            return None if e is None else e.name
+        return None
+
+    def reminder_label(self, r):
+        # one reminders list line
+        if not r.timed:
+            return r.text
+        due = self.reminder_queue.due(r)
+        when = ""
+        if due is not None:
+            t = datetime.fromtimestamp(due)
+            when = f"{t.strftime('%a %b %d')}, {format_time(t.hour + t.minute / 60)}"
+        if r.at is not None:
+            return f"{r.text} — {when}" if due is not None else f"{r.text} (done)"
+        target = self.reminder_target(r)
+        if target is None:
+            return f"{r.text} (item removed)"
+        tied = f"{r.lead:g} min before {target}"
+        if due is None:
+            return f"{r.text} — {tied} (done)" if r.done else f"{r.text} — {tied}"
+        return f"{r.text} — {tied}, {when}"
+
+    # -----------------------
+    # Export
+    # -----------------------
+    def export_weeks(self, first, last):
+        # [(Monday, rows)] for every week first..last, empty weeks included; rows are
+        # (day, start, end, name, category id, uid) as exporter.py expects
+        first, last = week_start(first), week_start(last)
+        if last < first:
+            raise PlannerError("The export range ends before it starts.")
+        weeks = {}
+        for week, e in self.iter_entries(first, last):
+            rows = weeks.setdefault(week, [])
+            d = day_date(week, e.day).isoformat()
+            uid = (f"entry-{e.id}" if e.id is not None else
+                   f"rule-{e.rule}-{d}" if e.rule is not None else f"{d}-{len(rows)}")
+            rows.append((e.day, e.start, e.end, e.name, e.category, f"{uid}@daily-planner"))
+        n = (last - first).days // 7 + 1
+        return [(w, weeks.get(w, [])) for w in (first + timedelta(days=7 * i) for i in range(n))]
+
+    def export_job(self, folder, first=None, last=None, formats=("png",), views=("week",), workers=None):
+        # entries are read here, on the caller's thread; the job draws pages on
+        # worker processes and writes every file into folder (see exporter.py)
+        from exporter import FORMATS, VIEWS, ExportJob
+        if not formats or any(f not in FORMATS for f in formats):
+            raise PlannerError(f"Export formats must be among {', '.join(FORMATS)}.")
+        if any(v not in VIEWS for v in views):
+            raise PlannerError(f"Page views must be among {', '.join(VIEWS)}.")
+        first = self.week if first is None else first
+        weeks = self.export_weeks(first, first if last is None else last)
+        categories = self.categories.palette()
+        return ExportJob(weeks, categories, folder, formats, views, workers)
+
+    # -----------------------
+    # Import
+    # -----------------------
+    def import_job(self, path, default_category="Personal"):
+        if self.storage is None:
+            raise PlannerError("Importing needs a database.")
+        from importer import ImportJob
+        fallback = self.categories.id_of(default_category)
+        if fallback is None:
+            fallback = self.categories.ids()[0]
+        # runs on the import thread; CategoryTable.intern is locked for that
+        resolve = lambda name: self.categories.intern(name) if name else fallback
+        return ImportJob(path, self.storage, resolve)
+
+    def finish_import(self, job):
+        # imported rows went straight to the database (the import itself can't be
+        # undone); drop stale cached weeks
+        self.storage.invalidate_weeks(job.weeks)
+        self.recurrence.invalidate(job.weeks)
+        if self._analytics is not None:
+            self._analytics.stale = True
+        self.save_meta()
@@ -0,0 +1,200 @@
+# profiler.py
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+from collections import deque
+
+# -----------------------
+# Opt-in UI profiling
+# -----------------------
+# Set PLANNER_PROFILE to a file name (or 1 for planner_trace.json) and the app
+# wraps its handlers before any widget binds them, recording wall time and
+# call counts per handler. A repeating after() timer measures event-loop lag
+# (how late Tk runs it). A small overlay shows frame time and lag live, and on
+# exit everything is written as Chrome trace-event JSON (load it in
+# chrome://tracing or ui.perfetto.dev) plus a latency histogram on stderr.
+DEFAULT_TRACE = "planner_trace.json"
+MAX_EVENTS = 200_000  # oldest trace events are dropped past this
+LAG_INTERVAL_MS = 50
+OVERLAY_MS = 500
+FRAME = "flush_render"  # one coalesced repaint = one frame
+BUCKETS_MS = (1, 2, 4, 8, 16, 33, 66, 133, 266)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Profiler:
+    def __init__(self, path=DEFAULT_TRACE):
+        self.path = path
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.durations = {}  # handler name -> [seconds]
+        self.lags = []  # seconds late, one per lag tick
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+        self.root = None
+        self._overlay = None
+        self._lag_id = None
+        self._overlay_id = None
+        self._closed = False
+        self.startup = None  # PhaseTimer, included in the trace when set
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get("PLANNER_PROFILE")
+        if not path or path == "0":
+            return None
+        return cls(DEFAULT_TRACE if path == "1" else path)
+
+    # --- handlers ---
+    def wrap(self, name, fn):
+        events = self.events
+        durations = self.durations.setdefault(name, [])
+        pid = self.pid
+        t0 = self.t0
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                durations.append(end - start)
+                events.append({"name": name, "cat": "handler", "ph": "X", "pid": pid,
+                               "tid": threading.get_ident(),
+                               "ts": (start - t0) * 1e6, "dur": (end - start) * 1e6})
+        return timed
+
+    def instrument(self, obj, names):
+        # shadow bound methods on the instance; must run before widgets are
+        # created, since command=self.x captures whatever self.x is right then
+        for name in names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    # --- event loop ---
+    def start(self, root):
+        self.root = root
+        self._overlay = tk.Label(root, text="", font=("Consolas", 9), bg="#102030", fg="#e6e9ee",
+                                 justify="left", padx=6, pady=3)
+        self._overlay.place(relx=1.0, x=-8, y=8, anchor="ne")
+        self._expected = time.perf_counter() + LAG_INTERVAL_MS / 1000
+        self._lag_id = root.after(LAG_INTERVAL_MS, self._lag_tick)
+        self._overlay_id = root.after(OVERLAY_MS, self._refresh_overlay)
+
+    def _lag_tick(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self._expected)
+        self.lags.append(lag)
+        self.events.append({"name": "event loop lag", "ph": "C", "pid": self.pid,
+                            "ts": (now - self.t0) * 1e6, "args": {"ms": lag * 1e3}})
+        self._expected = now + LAG_INTERVAL_MS / 1000
+        self._lag_id = self.root.after(LAG_INTERVAL_MS, self._lag_tick)
+
+    def _refresh_overlay(self):
+        frames = self.durations.get(FRAME, [])
+        recent = sorted(frames[-60:])
+        lags = sorted(self.lags[-40:])
+        slowest = max(((d[-1], n) for n, d in self.durations.items() if d and n != FRAME), default=None)
+        lines = [
+            f"frame  last {frames[-1] * 1e3:6.1f} ms  p95 {_percentile(recent, 0.95) * 1e3:6.1f} ms" if frames else "frame  -",
+            f"lag    last {self.lags[-1] * 1e3:6.1f} ms  max {lags[-1] * 1e3:6.1f} ms" if lags else "lag    -",
+        ]
+        if slowest is not None:
+            lines.append(f"last slowest: {slowest[1]} {slowest[0] * 1e3:.1f} ms")
+        self._overlay.configure(text="\n".join(lines))
+        self._overlay.lift()
+        self._overlay_id = self.root.after(OVERLAY_MS, self._refresh_overlay)
+
+    # --- output ---
+    def _stats(self, name, values):
+        s = sorted(values)
+        return {"name": name, "calls": len(s), "total_ms": sum(s) * 1e3,
+                "mean_ms": sum(s) / len(s) * 1e3, "p50_ms": _percentile(s, 0.5) * 1e3,
+                "p95_ms": _percentile(s, 0.95) * 1e3, "max_ms": s[-1] * 1e3,
+                "histogram": self.histogram(s)}
+
+    def summary(self):
+        rows = [self._stats(name, d) for name, d in sorted(self.durations.items(), key=lambda kv: -sum(kv[1])) if d]
+        if self.lags:
+            rows.append(self._stats("event loop lag", self.lags))
+        return rows
+
+    @staticmethod
+    def histogram(seconds):
+        # counts per bucket: <1 ms, <2 ms, ... <266 ms, >=266 ms
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for v in seconds:
+            ms = v * 1e3
+            i = 0
+            while i < len(BUCKETS_MS) and ms >= BUCKETS_MS[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+    def report(self, out=sys.stderr):
+        rows = self.summary()
+        print(f"\n{'handler':<26}{'calls':>7}{'total ms':>11}{'p50':>8}{'p95':>8}{'max':>8}", file=out)
+        for r in rows:
+            print(f"{r['name']:<26}{r['calls']:>7}{r['total_ms']:>11.1f}{r['p50_ms']:>8.1f}"
+                  f"{r['p95_ms']:>8.1f}{r['max_ms']:>8.1f}", file=out)
+        labels = [f"<{b}" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]}"]
+        for r in rows:
+            print(f"\n{r['name']} (ms)", file=out)
+            top = max(r["histogram"]) or 1
+            for label, n in zip(labels, r["histogram"]):
+                if n:
+                    print(f"  {label:>6} {n:>7} {'#' * max(1, round(40 * n / top))}", file=out)
+
+    def dump(self):
+        trace = {
+            "traceEvents": [{"name": "process_name", "ph": "M", "pid": self.pid,
+                             "args": {"name": "Daily Planner"}}] + list(self.events),
+            "displayTimeUnit": "ms",
+            "otherData": {"summary": self.summary(),
+                          "startup_ms": {n: s * 1e3 for n, s in (self.startup.phases if self.startup else [])}},
+        }
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(trace, fh)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.root is not None:
+            for after_id in (self._lag_id, self._overlay_id):
+                if after_id is not None:
+                    self.root.after_cancel(after_id)
+        self.dump()
+        self.report()
+        print(f"trace written to {os.path.abspath(self.path)}", file=sys.stderr)
+
+
+# -----------------------
+# Startup phases
+# -----------------------
+class PhaseTimer:
+    # wall time of each startup phase; t0 is taken as early as possible
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.last = self.t0
+        self.phases = []  # (name, seconds since the previous mark)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def report(self, out=sys.stderr):
+        print(f"\n{'startup phase':<26}{'ms':>9}{'total ms':>11}", file=out)
+        total = 0.0
+        for name, secs in self.phases:
+            total += secs
+            print(f"{name:<26}{secs * 1e3:>9.1f}{total * 1e3:>11.1f}", file=out)
@@ -0,0 +1,223 @@
+# recurrence.py
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from entries import DAYS, Entry, week_start
+
+# -----------------------
+# Recurring events
+# -----------------------
+# A Rule is one compact row (weekday bitmask, interval, first date, optional
+# until/count, exception dates) instead of one stored entry per occurrence.
+# Occurrences are expanded lazily, only for weeks that are actually looked
+# at: RecurrenceEngine.materialize(store) adds the week's occurrences to its
+# ScheduleStore as Entry objects with .rule set (storage never persists
+# those). Materialized weeks sit in a bounded LRU; when a rule changes only
+# that rule's occurrences in the cached weeks are replaced, and weeks outside
+# the cache are expanded fresh the next time they are viewed.
+WEEK_CACHE = 16  # materialized weeks kept (>= storage.CACHE_WEEKS)
+ONE_DAY = timedelta(days=1)
+
+
+class Rule:
+    __slots__ = ("id", "name", "category", "start", "end", "days", "interval",
+                 "first", "until", "count", "exceptions")
+
+    def __init__(self, name, category, start, end, days, first, interval=1,
+                 until=None, count=None, exceptions=(), id=None):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.start = float(start)
+        self.end = float(end)
+        self.days = days  # weekday bitmask, bit 0 = Monday
+        self.first = first  # date of the first possible occurrence
+        self.interval = interval  # every n-th week, counted from first's week
+        self.until = until  # last possible date (inclusive) or None
+        self.count = count  # total occurrences (exceptions still count) or None
+        self.exceptions = set(exceptions)  # dates skipped
+
+    @staticmethod
+    def mask(day_codes):
+        m = 0
+        for code in day_codes:
+            m |= 1 << DAYS.index(code)
+        return m
+
+    def day_codes(self):
+        return [DAYS[i] for i in range(7) if self.days >> i & 1]
+
+    def _weekdays_before(self, weekday):
+        return bin(self.days & ((1 << weekday) - 1)).count("1")
+
+    def index(self, d):
+        # occurrences (exceptions included) strictly before date d
+        if d <= self.first:
+            return 0
+        weeks = (week_start(d) - week_start(self.first)).days // 7
+        active = -(-weeks // self.interval)  # active weeks before d's week
+        n = active * bin(self.days).count("1") - self._weekdays_before(self.first.weekday())
+        if weeks % self.interval == 0:
+            n += self._weekdays_before(d.weekday())
+        return n
+
+    def dates(self, lo, hi):
+        # occurrence dates within [lo, hi], in order
+        lo = max(lo, self.first)
+        if self.until is not None:
+            hi = min(hi, self.until)
+        n = self.index(lo) if self.count is not None else 0
+        base = week_start(self.first)
+        d = lo
+        while d <= hi:
+            if self.days >> d.weekday() & 1 and (d - base).days // 7 % self.interval == 0:
+                if self.count is not None:
+                    if n >= self.count:
+                        return
+                    n += 1
+                if d not in self.exceptions:
+                    yield d
+            d += ONE_DAY
+
+    def occurrences(self, week):
+        # Entry objects for one week (a generator; nothing is stored here)
+        for d in self.dates(week, week + 6 * ONE_DAY):
+            yield Entry(DAYS[d.weekday()], self.start, self.end, self.name, self.category, True, rule=self.id)
+
+
+def rule_row(rule):
+    return (rule.id, rule.name, rule.category, rule.start, rule.end, rule.days, rule.interval,
+            rule.first.toordinal(), rule.until.toordinal() if rule.until else None, rule.count,
+            ",".join(str(d.toordinal()) for d in sorted(rule.exceptions)))
+
+
+def rule_from_row(row):
+    i, name, cat, start, end, days, interval, first, until, count, exceptions = row
+    return Rule(name, cat, start, end, days, date.fromordinal(first), interval,
+                date.fromordinal(until) if until else None, count,
+                [date.fromordinal(int(x)) for x in exceptions.split(",") if x], id=i)
+
+
+class RecurrenceEngine:
+    def __init__(self, rules=()):
+        self.rules = {}
+        self.listeners = []  # listener(op, rule) with op "save" or "delete"
+        self._weeks = OrderedDict()  # week -> (store, {rule_id: [entries in store]})
+        self._next_id = 1
+        for rule in rules:
+            self.rules[rule.id] = rule
+            self._next_id = max(self._next_id, rule.id + 1)
+
+    def _notify(self, op, rule):
+        for listener in self.listeners:
+            listener(op, rule)
+
+    # --- rules ---
+    def add(self, rule):
+        rule.id = self._next_id
+        self._next_id += 1
+        self.rules[rule.id] = rule
+        self._notify("save", rule)
+        self._refresh(rule.id)
+        return rule
+
+    def update(self, rule_id, **changes):
+        rule = self.rules[rule_id]
+        for k, v in changes.items():
+            setattr(rule, k, set(v) if k == "exceptions" else v)
+        self._notify("save", rule)
+        self._refresh(rule_id)
+        return rule
+
+    def restore(self, rule):
+        # put back a removed rule under its old id (undo)
+        self.rules[rule.id] = rule
+        self._next_id = max(self._next_id, rule.id + 1)
+        self._notify("save", rule)
+        self._refresh(rule.id)
+        return rule
+
+    def remove(self, rule_id):
+        rule = self.rules.pop(rule_id)
+        self._notify("delete", rule)
+        self._refresh(rule_id)
+
+    def exclude(self, rule_id, d):
+        # skip a single occurrence
+        rule = self.rules[rule_id]
+        rule.exceptions.add(d)
+        self._notify("save", rule)
+        self._refresh(rule_id, week_start(d))
+
+    def include(self, rule_id, d):
+        # undo exclude()
+        rule = self.rules[rule_id]
+        rule.exceptions.discard(d)
+        self._notify("save", rule)
+        self._refresh(rule_id, week_start(d))
+
+    # --- materialized weeks ---
+    def materialize(self, store):
+        # make sure the store shows its week's occurrences; O(1) once cached
+        week = store.week
+        cached = self._weeks.get(week)
+        if cached is not None and cached[0] is store:
+            self._weeks.move_to_end(week)
+            return store
+        placed = {}
+        for rule in self.rules.values():
+            entries = [store.add(e) for e in rule.occurrences(week)]
+            if entries:
+                placed[rule.id] = entries
+        self._weeks[week] = (store, placed)
+        while len(self._weeks) > WEEK_CACHE:
+            _, (old_store, old_placed) = self._weeks.popitem(last=False)
+            self._strip(old_store, old_placed)
+        return store
+
+    def forget(self, store, entries):
+        # occurrences already removed from the store by someone else (e.g. clear_day)
+        cached = self._weeks.get(store.week)
+        if cached is None or cached[0] is not store:
+            return
+        placed = cached[1]
+        for e in entries:
+            if e.rule is not None and e.rule in placed:
+                placed[e.rule] = [x for x in placed[e.rule] if x is not e]
+
+    def invalidate(self, weeks=None):
+        # drop materialized weeks (their stores are being thrown away)
+        for week in list(self._weeks) if weeks is None else weeks:
+            self._weeks.pop(week, None)
+
+    def _strip(self, store, placed):
+        for entries in placed.values():
+            for e in entries:
+                store.remove(e)
+
+    def _refresh(self, rule_id, only_week=None):
+        # replace one rule's occurrences in the cached weeks (or just one of them)
+        rule = self.rules.get(rule_id)
+        weeks = [only_week] if only_week is not None else list(self._weeks)
+        for week in weeks:
+            cached = self._weeks.get(week)
+            if cached is None:
+                continue
+            store, placed = cached
+            for e in placed.pop(rule_id, ()):
+                store.remove(e)
+            if rule is not None:
+                entries = [store.add(e) for e in rule.occurrences(week)]
+                if entries:
+                    placed[rule_id] = entries
+
+    def expand(self, first_week, last_week):
+        # (week, entry) for every occurrence in a week range, without caching
+        # (exports); weeks are walked one at a time so memory stays flat
+        week = first_week
+        while week <= last_week:
+            entries = [e for rule in self.rules.values() for e in rule.occurrences(week)]
+            entries.sort(key=lambda e: (DAYS.index(e.day), e.start))
+            for e in entries:
+                yield week, e
+            week += 7 * ONE_DAY
@@ -0,0 +1,154 @@
+# reminders.py
+import heapq
+import itertools
+from datetime import date, datetime, timedelta
+
+# -----------------------
+# Timed reminders
+# -----------------------
+# A Reminder is a line of text, optionally with a time: either a fixed moment
+# (at) or `lead` minutes before a schedule entry or before every occurrence of
+# a repeating event. Planner works out each reminder's next due time and keeps
+# it in one ReminderQueue, a heap of (due, seq, reminder) with lazy deletion:
+# adding or moving a reminder is one push and cancelling one marks its heap
+# item dead, both O(log n) (dead items are dropped when they reach the top, and
+# the heap is rebuilt once they are the majority). The app only ever waits for
+# next_due(), with a single after() callback.
+#
+# Due times are wall-clock seconds (time.time()), so a reminder that came due
+# while the machine slept or the app was closed is simply overdue the next
+# time the queue is checked. An entry reminder also keeps (and saves) its
+# entry's start time, so reminders can be armed at startup without loading
+# the entries' weeks.
+MISSED_AFTER = 120  # seconds overdue before a reminder is reported as missed
+DEFAULT_LEAD = 10  # minutes before an item
+
+
+def stamp(d, h):
+    # wall-clock seconds of hour h (local time) on date d
+    return (datetime.combine(d, datetime.min.time()) + timedelta(minutes=round(h * 60))).timestamp()
+
+
+class Reminder:
+    __slots__ = ("id", "text", "at", "week", "entry", "rule", "lead", "fired", "start")
+
+    def __init__(self, text, at=None, week=None, entry=None, rule=None, lead=0.0, fired=None, start=None, id=None):
+        self.id = id  # stable row id, also the reminder's place in the list
+        self.text = text
+        self.at = at  # wall-clock seconds of a fixed reminder, or None
+        self.week = week  # Monday of the entry's week (entry reminders)
+        self.entry = entry  # storage id of the entry (the Entry itself when there is no storage)
+        self.rule = rule  # recurring rule id: due before each occurrence
+        self.lead = lead  # minutes before the entry or occurrence
+        self.fired = fired  # due time last delivered (or when a series reminder was set up)
+        self.start = start  # wall-clock seconds the entry starts, None while it is removed
+
+    @property
+    def timed(self):
+        return self.at is not None or self.entry is not None or self.rule is not None
+
+    @property
+    def done(self):
+        # one-shot reminders are finished once delivered
+        return self.rule is None and self.fired is not None
+
+    @property
+    def key(self):
+        # what the reminder is attached to, or None
+        if self.rule is not None:
+            return ("rule", self.rule)
+        return self.entry
+
+    def copy(self, **changes):
+        r = Reminder(self.text, self.at, self.week, self.entry, self.rule, self.lead, self.fired, self.start, self.id)
+        for k, v in changes.items():
+            setattr(r, k, v)
+        return r
+
+    def __repr__(self):
+        return f"Reminder({self.text!r}, at={self.at!r}, entry={self.entry!r}, rule={self.rule!r}, lead={self.lead!r})"
+
+
+def reminder_row(r):
+    return (r.id, r.text, r.at, r.week.toordinal() if r.week else None,
+            r.entry if isinstance(r.entry, int) else None, r.rule, r.lead, r.fired, r.start)
+
+
+def reminder_from_row(row):
+    id, text, at, week, entry, rule, lead, fired, start = row
+    return Reminder(text, at, date.fromordinal(week) if week else None, entry, rule, lead or 0.0, fired, start, id)
+
+
+class ReminderQueue:
+    def __init__(self):
+        self.listeners = []  # called with no arguments when the earliest due time may have changed
+        self._heap = []  # [due, seq, reminder or None when cancelled]
+        self._items = {}  # reminder -> its live heap item
+        self._seq = itertools.count()
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+    def due(self, reminder):
+        item = self._items.get(reminder)
+        return None if item is None else item[0]
+
+    def push(self, reminder, due):
+        # schedule (or move) a reminder
+        was_first = self._cancel(reminder)
+        item = [due, next(self._seq), reminder]
+        self._items[reminder] = item
+        heapq.heappush(self._heap, item)
+        if was_first or self._heap[0] is item:
+            self._notify()
+
+    def cancel(self, reminder):
+        if self._cancel(reminder):
+            self._notify()
+
+    def _cancel(self, reminder):
+        # True if the cancelled item was the earliest one
+        item = self._items.pop(reminder, None)
+        if item is None:
+            return False
+        first = self._heap[0] is item
+        item[2] = None
+        self._dead += 1
+        if self._dead > len(self._heap) // 2:
+            self._heap = [it for it in self._heap if it[2] is not None]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        return first
+
+    def _prune(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+            self._dead -= 1
+
+    def next_due(self):
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        # [(due, reminder)] for everything due at or before now, earliest first
+        out = []
+        self._prune()
+        while self._heap and self._heap[0][0] <= now:
+            due, _, reminder = heapq.heappop(self._heap)
+            del self._items[reminder]
+            out.append((due, reminder))
+            self._prune()
+        if out:
+            self._notify()
+        return out
+
+    def clear(self):
+        self._heap.clear()
+        self._items.clear()
+        self._dead = 0
+        self._notify()
@@ -0,0 +1,239 @@
+# schedule_store.py
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right
+
+from aggregates import CategoryTotals
+from entries import DAYS, hours_by, pack_rows, unpack
+from occupancy import DayOccupancy
+
+# -----------------------
+# Per-day schedule index
+# -----------------------
+# Entries are kept in one list per day, ordered by start time, with a parallel
+# list of start keys so lookups can bisect instead of scanning the whole week.
+# Each day also carries a slot bitmap (occupancy.py) used for placement, and
+# the store keeps running category totals (aggregates.py).
+#
+# A store built with from_rows() (how storage loads a week) keeps each day
+# packed in typed arrays (entries.pack_rows) with its bitmap and totals filled
+# in, so counts, totals and placement work without any Entry objects. The
+# day's Entry objects are built the first time anything reads or changes its
+# entries, and from then on the day stays as objects, so callers always see
+# the same Entry for the same row.
+#
+# One store holds one week. Listeners registered in `listeners` are called as
+# listener(op, payload) after each mutation, with op one of "add", "remove",
+# "update" (payload: the entry), "clear_day" or "restore_day" (payload:
+# (day, entries)); storage.py uses this to persist changes.
+
+
+class _DayIndex:
+    __slots__ = ("entries", "starts", "max_dur", "occ", "packed")
+
+    def __init__(self):
+        self.entries = []
+        self.starts = []
+        self.max_dur = 0.0  # longest entry ever stored (upper bound, only grows)
+        self.occ = DayOccupancy()
+        self.packed = None  # pack_rows() columns until the Entry objects are needed
+
+    def unpack(self, day):
+        self.entries = unpack(self.packed, day)
+        self.starts = [e.start for e in self.entries]
+        self.packed = None
+
+
+class ScheduleStore:
+    def __init__(self, entries=(), week=None):
+        self.week = week  # date of the Monday this store covers (None: undated)
+        self.listeners = []
+        self._days = {}
+        self._count = 0
+        self.totals = CategoryTotals()
+        self.conflicts = None  # ConflictIndex (conflicts.py), attached on first use
+        self.analytics = None  # Analytics (analytics.py) watching this store, if any
+        self.reminders = None  # ReminderQueue (reminders.py) kept current by this store, if any
+        for e in entries:
+            self._insert(e)
+
+    @classmethod
+    def from_rows(cls, rows, week=None):
+        # bulk load from (id, day index, start, end, name, category, fixed) rows
+        # ordered by day and start; every day stays packed until it is used
+        store = cls(week=week)
+        for d, day_rows in itertools.groupby(rows, key=lambda r: r[1]):
+            day = DAYS[d]
+            idx = store._index(day)
+            cols = idx.packed = pack_rows(day_rows)
+            # rows come in start order, so overlapping spans merge into runs
+            # and the bitmap is marked once per run instead of once per entry
+            lo = hi = None
+            for s, t in zip(cols["start"], cols["end"]):
+                idx.max_dur = max(idx.max_dur, t - s)
+                if hi is not None and s <= hi:
+                    hi = max(hi, t)
+                    continue
+                if hi is not None:
+                    idx.occ.mark(lo, hi)
+                lo, hi = s, t
+            if hi is not None:
+                idx.occ.mark(lo, hi)
+            for cid, hours in enumerate(hours_by(cols, "category", max(cols["category"]) + 1)):
+                if hours:
+                    store.totals.add(day, cid, hours)
+            store._count += len(cols["start"])
+        return store
+
+    def _index(self, day):
+        idx = self._days.get(day)
+        if idx is None:
+            idx = self._days[day] = _DayIndex()
+        return idx
+
+    def _entries(self, day):
+        # the day's index with its Entry objects built, or None for an empty day
+        idx = self._days.get(day)
+        if idx is not None and idx.packed is not None:
+            idx.unpack(day)
+        return idx
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for day in list(self._days):
+            idx = self._entries(day)
+            if idx is not None:
+                yield from list(idx.entries)
+
+    def days(self):
+        return [d for d, idx in self._days.items() if idx.entries or idx.packed is not None]
+
+    def _notify(self, op, payload):
+        for listener in self.listeners:
+            listener(op, payload)
+
+    # --- mutation ---
+    def add(self, entry):
+        self._insert(entry)
+        self._notify("add", entry)
+        return entry
+
+    def remove(self, entry):
+        self._delete(entry)
+        self._notify("remove", entry)
+
+    def update(self, entry, **changes):
+        # day/start changes move the entry, so take it out before mutating it
+        self._delete(entry)
+        entry.set(**changes)
+        self._insert(entry)
+        self._notify("update", entry)
+        return entry
+
+    def clear_day(self, day):
+        idx = self._entries(day)  # undo needs the entries themselves
+        self._days.pop(day, None)
+        if idx is None:
+            return []
+        self._count -= len(idx.entries)
+        self.totals.remove_day(day)
+        self._notify("clear_day", (day, idx.entries))
+        return idx.entries
+
+    def restore_day(self, day, entries):
+        # put back entries taken out by clear_day (undo) in one pass: they are
+        # already ordered by start, so they are merged with whatever the day holds now
+        if not entries:
+            return
+        idx = self._entries(day) or self._index(day)
+        idx.entries = list(heapq.merge(idx.entries, entries, key=lambda e: e.start))
+        idx.starts = [e.start for e in idx.entries]
+        for e in entries:
+            idx.max_dur = max(idx.max_dur, e.end - e.start)
+            idx.occ.mark(e.start, e.end)
+            self.totals.add(day, e.category, e.hours)
+        self._count += len(entries)
+        self._notify("restore_day", (day, entries))
+
+    def _insert(self, entry):
+        idx = self._entries(entry.day) or self._index(entry.day)
+        pos = bisect_right(idx.starts, entry.start)
+        idx.starts.insert(pos, entry.start)
+        idx.entries.insert(pos, entry)
+        idx.max_dur = max(idx.max_dur, entry.end - entry.start)
+        idx.occ.mark(entry.start, entry.end)
+        self.totals.add(entry.day, entry.category, entry.hours)
+        self._count += 1
+
+    def _position(self, entry):
+        idx = self._days.get(entry.day)
+        if idx is not None:
+            lo = bisect_left(idx.starts, entry.start)
+            hi = bisect_right(idx.starts, entry.start)
+            for pos in range(lo, hi):
+                if idx.entries[pos] is entry:
+                    return idx, pos
+        raise ValueError("entry is not in the schedule")
+
+    def _delete(self, entry):
+        idx, pos = self._position(entry)
+        del idx.starts[pos]
+        del idx.entries[pos]
+        self.totals.add(entry.day, entry.category, -entry.hours)
+        self._count -= 1
+        # other entries may overlap the freed span; re-mark just that range
+        idx.occ.clear(entry.start, entry.end)
+        for e in self.overlapping(entry.day, entry.start, entry.end):
+            idx.occ.mark(e.start, e.end)
+
+    # --- queries ---
+    def day_entries(self, day):
+        # already ordered by start; callers must not mutate the returned list
+        idx = self._entries(day)
+        return idx.entries if idx is not None else []
+
+    def entries_between(self, day, t1, t2):
+        # entries whose start lies in [t1, t2)
+        idx = self._entries(day)
+        if idx is None:
+            return []
+        lo = bisect_left(idx.starts, t1)
+        hi = bisect_left(idx.starts, t2)
+        return idx.entries[lo:hi]
+
+    def overlapping(self, day, t1, t2):
+        # entries intersecting [t1, t2); anything starting before t1 - max_dur
+        # has already ended, so only that window needs checking
+        idx = self._entries(day)
+        if idx is None:
+            return []
+        lo = bisect_right(idx.starts, t1 - idx.max_dur)
+        hi = bisect_left(idx.starts, t2)
+        return [e for e in idx.entries[lo:hi] if e.end > t1]
+
+    def has_overlap(self, day, t1, t2):
+        idx = self._entries(day)
+        if idx is None:
+            return False
+        lo = bisect_right(idx.starts, t1 - idx.max_dur)
+        hi = bisect_left(idx.starts, t2)
+        for pos in range(lo, hi):
+            if idx.entries[pos].end > t1:
+                return True
+        return False
+
+    # --- placement ---
+    def is_free(self, day, start, end):
+        idx = self._days.get(day)
+        return idx is None or idx.occ.is_free(start, end)
+
+    def first_fit(self, day, dur, lo=8.0, hi=20.0, step_minutes=30):
+        return self._index(day).occ.first_fit(dur, lo, hi, step_minutes)
+
+    def best_fit(self, day, dur, lo=8.0, hi=20.0, step_minutes=30):
+        return self._index(day).occ.best_fit(dur, lo, hi, step_minutes)
+
+    def free_gaps(self, day, lo=8.0, hi=20.0):
+        return self._index(day).occ.gaps(lo, hi)
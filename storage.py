@@ -0,0 +1,388 @@
+# storage.py
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from entries import DAYS, DAY_INDEX, Entry, day_date
+from recurrence import rule_from_row, rule_row
+from reminders import reminder_from_row, reminder_row, stamp
+from schedule_store import ScheduleStore
+
+# -----------------------
+# SQLite persistence
+# -----------------------
+# Entries live in SQLite (WAL mode) keyed by week (ordinal of its Monday) and
+# day. The UI works on one in-memory ScheduleStore per week: the visible week
+# is loaded on demand and neighbours are prefetched on a background thread.
+# Store mutations are queued and committed by a writer thread, which folds
+# everything queued within WRITE_DELAY into one transaction. A transaction
+# that fails is rolled back and its writes retried one by one, so only the
+# failing ones are lost; the last error is kept in PlannerStorage.error.
+# Reads only wait for the writer when it still holds writes to the weeks
+# being read, and bulk imports bypass it entirely (insert_rows).
+WRITE_DELAY = 0.05  # seconds to keep collecting writes into one transaction
+ENTRY_OPS = ("upsert", "upsert_many", "delete", "delete_day")  # writer ops carrying a week ordinal
+CACHE_WEEKS = 9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    name TEXT NOT NULL,
+    category INTEGER NOT NULL,
+    fixed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_week_day_start ON entries(week, day, start);
+CREATE INDEX IF NOT EXISTS entries_category ON entries(category);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    color TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS activities (
+    pos INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    pos INTEGER PRIMARY KEY,  -- the reminder's id; the list is in this order
+    text TEXT NOT NULL,
+    at REAL,
+    week INTEGER,
+    entry INTEGER,
+    rule INTEGER,
+    lead REAL NOT NULL DEFAULT 0,
+    fired REAL,
+    start REAL
+);
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category INTEGER NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    days INTEGER NOT NULL,
+    interval INTEGER NOT NULL DEFAULT 1,
+    first INTEGER NOT NULL,
+    until INTEGER,
+    count INTEGER,
+    exceptions TEXT NOT NULL DEFAULT ''
+);
+"""
+
+# columns added to tables after they first shipped: (table, column, declaration)
+MIGRATIONS = [
+    ("reminders", "at", "REAL"),
+    ("reminders", "week", "INTEGER"),
+    ("reminders", "entry", "INTEGER"),
+    ("reminders", "rule", "INTEGER"),
+    ("reminders", "lead", "REAL NOT NULL DEFAULT 0"),
+    ("reminders", "fired", "REAL"),
+    ("reminders", "start", "REAL"),
+]
+
+
+def migrate(conn):
+    added = set()
+    for table, column, decl in MIGRATIONS:
+        if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+            added.add((table, column))
+    if ("reminders", "start") in added:
+        # look up the entries of reminders saved before their start was kept
+        rows = conn.execute("SELECT r.pos, e.week, e.day, e.start FROM reminders r "
+                            "JOIN entries e ON e.id = r.entry WHERE r.fired IS NULL").fetchall()
+        conn.executemany("UPDATE reminders SET start = ? WHERE pos = ?",
+                         [(stamp(day_date(date.fromordinal(w), DAYS[d]), s), pos) for pos, w, d, s in rows])
+    conn.commit()
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def entry_row(week, e):
+    return (e.id, week.toordinal(), DAY_INDEX[e.day], e.start, e.end, e.name, e.category, int(e.fixed))
+
+
+class PlannerStorage:
+    def __init__(self, path):
+        self.path = path
+        self._conn = connect(path)
+        self._conn.executescript(SCHEMA)
+        migrate(self._conn)
+        max_id = self._conn.execute("SELECT MAX(id) FROM entries").fetchone()[0] or 0
+        self._ids = itertools.count(max_id + 1)
+        self._cache = OrderedDict()  # week -> ScheduleStore
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._pending = {}  # week ordinal -> entry writes queued but not yet committed
+        self._pending_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="planner-writer", daemon=True)
+        self._writer.start()
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner-prefetch")
+        self.pinned = None  # week never evicted from the cache (the visible one)
+        self.error = None  # last write that failed (the writer thread keeps going)
+        self.failed_writes = 0
+
+    # --- weeks ---
+    def week_store(self, week):
+        with self._lock:
+            store = self._cache.get(week)
+            if store is not None:
+                self._cache.move_to_end(week)
+                return store
+        self._settle(week, week)  # make sure our own pending writes are readable
+        return self._remember(week, self._load(self._conn, week))
+
+    def prefetch(self, weeks):
+        for week in weeks:
+            self._prefetcher.submit(self._prefetch, week)
+
+    def _prefetch(self, week):
+        with self._lock:
+            if week in self._cache:
+                return
+        self._settle(week, week)
+        self._remember(week, self._load(self._thread_conn(), week))
+
+    def _thread_conn(self):
+        # a connection for the calling (non-Tk) thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def _load(self, conn, week):
+        rows = conn.execute(
+            'SELECT id, day, start, "end", name, category, fixed FROM entries '
+            'WHERE week = ? ORDER BY day, start, id', (week.toordinal(),))
+        store = ScheduleStore.from_rows(rows, week=week)  # days stay packed until shown or edited
+        store.listeners.append(self._listener(week))
+        return store
+
+    def _remember(self, week, store):
+        with self._lock:
+            store = self._cache.setdefault(week, store)
+            self._cache.move_to_end(week)
+            for old in list(self._cache):
+                if len(self._cache) <= CACHE_WEEKS:
+                    break
+                if old != self.pinned and old != week:
+                    del self._cache[old]
+        return store
+
+    def invalidate_weeks(self, weeks=None):
+        # drop cached stores (e.g. after an import wrote to the database directly)
+        with self._lock:
+            for week in list(self._cache) if weeks is None else weeks:
+                self._cache.pop(week, None)
+
+    def iter_entries(self, first, last):
+        # (week, Entry) for weeks first..last straight from the database, in
+        # (week, day, start) order; used by exports so nothing gets cached
+        self._settle(first, last)
+        rows = self._conn.execute(
+            'SELECT id, week, day, start, "end", name, category, fixed FROM entries '
+            'WHERE week BETWEEN ? AND ? ORDER BY week, day, start, id',
+            (first.toordinal(), last.toordinal()))
+        for i, w, d, s, t, n, c, f in rows:
+            yield date.fromordinal(w), Entry(DAYS[d], s, t, n, c, bool(f), i)
+
+    def entry_rows(self, first, last):
+        # (day ordinal, category, start, end) for weeks first..last; used by analytics
+        self._settle(first, last)
+        return self._conn.execute(
+            'SELECT week + day, category, start, "end" FROM entries WHERE week BETWEEN ? AND ?',
+            (first.toordinal(), last.toordinal())).fetchall()
+
+    def next_id(self):
+        return next(self._ids)
+
+    def _settle(self, first, last):
+        # wait for the writer only if it still holds entry writes to weeks first..last
+        lo, hi = first.toordinal(), last.toordinal()
+        with self._pending_lock:
+            busy = any(lo <= w <= hi for w in self._pending)
+        if busy:
+            self._queue.join()
+
+    def _put_entry_op(self, op):
+        # entry ops are (kind, week ordinal, ...)
+        with self._pending_lock:
+            self._pending[op[1]] = self._pending.get(op[1], 0) + 1
+        self._queue.put(op)
+
+    def _listener(self, week):
+        w = week.toordinal()
+
+        def on_change(op, payload):
+            if op == "clear_day":
+                self._put_entry_op(("delete_day", w, DAY_INDEX[payload[0]]))
+            elif op == "restore_day":
+                rows = []
+                for e in payload[1]:
+                    if e.rule is None:
+                        if e.id is None:
+                            e.id = self.next_id()
+                        rows.append(entry_row(week, e))
+                self._put_entry_op(("upsert_many", w, rows))
+            elif payload.rule is not None:
+                return  # expanded recurrence occurrences live in the rules table
+            elif op == "remove":
+                if payload.id is not None:
+                    self._put_entry_op(("delete", w, payload.id))
+            else:
+                if payload.id is None:
+                    payload.id = self.next_id()
+                self._put_entry_op(("upsert", w, entry_row(week, payload)))
+        return on_change
+
+    def rule_listener(self, op, rule):
+        # RecurrenceEngine listener
+        if op == "delete":
+            self._queue.put(("delete_rule", rule.id))
+        else:
+            self._queue.put(("rule", rule_row(rule)))
+
+    def load_rules(self):
+        return [rule_from_row(r) for r in self._conn.execute(
+            'SELECT id, name, category, start, "end", days, interval, first, until, count, exceptions '
+            'FROM rules ORDER BY id')]
+
+    def insert_rows(self, rows):
+        # bulk insert of ready-made entry rows (bypasses the in-memory stores), committed
+        # on the calling thread's own connection; it never enters the writer queue, so
+        # week loads, which wait for queued UI edits, never wait behind an import.
+        # Queued edits to the batch's weeks land first, so e.g. a pending "clear
+        # day" cannot delete rows imported after it was issued
+        weeks = [r[1] for r in rows]
+        if weeks:
+            self._settle(date.fromordinal(min(weeks)), date.fromordinal(max(weeks)))
+        conn = self._thread_conn()
+        with conn:
+            conn.executemany('INSERT INTO entries (id, week, day, start, "end", name, category, fixed) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    # --- categories / activities / reminders ---
+    def load_meta(self):
+        cats = self._conn.execute("SELECT id, name, color, active FROM categories ORDER BY id").fetchall()
+        if not cats:
+            return None
+        acts = self._conn.execute("SELECT name, category, duration FROM activities ORDER BY pos").fetchall()
+        rems = [reminder_from_row(r) for r in self._conn.execute(
+            'SELECT pos, text, at, week, entry, rule, lead, fired, start FROM reminders ORDER BY pos')]
+        return cats, acts, rems
+
+    def save_meta(self, categories, activities):
+        # these tables are tiny, so each save rewrites them whole
+        cats = [(cid, categories.names[cid], categories.colors[cid], int(categories.active[cid]))
+                for cid in range(len(categories))]
+        acts = [(pos, name, cid, dur) for pos, (name, (cid, dur)) in enumerate(activities.items())]
+        self._queue.put(("meta", cats, acts))
+
+    def save_reminder(self, r):
+        # reminders can be many and change one at a time (e.g. each delivery), so one row per write
+        self._queue.put(("reminder", reminder_row(r)))
+
+    def delete_reminder(self, rid):
+        self._queue.put(("delete_reminder", rid))
+
+    # --- writer thread ---
+    def _write_loop(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + WRITE_DELAY
+            while True:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            ops = [op for op in batch if op is not None]
+            running = len(ops) == len(batch)
+            try:
+                self._commit(conn, ops)
+            finally:
+                with self._pending_lock:
+                    for op in ops:
+                        if op[0] in ENTRY_OPS:
+                            left = self._pending[op[1]] - 1
+                            if left:
+                                self._pending[op[1]] = left
+                            else:
+                                del self._pending[op[1]]
+                for _ in batch:
+                    self._queue.task_done()  # always, or every join() would wait forever
+        conn.close()
+
+    def _commit(self, conn, ops):
+        try:
+            with conn:  # rolls back on error
+                for op in ops:
+                    self._apply(conn, op)
+            return
+        except Exception:
+            pass
+        # one bad write must not take the rest of the batch (or the thread) with it
+        for op in ops:
+            try:
+                with conn:
+                    self._apply(conn, op)
+            except Exception as exc:
+                self.error = exc
+                self.failed_writes += 1
+
+    def _apply(self, conn, op):
+        kind = op[0]
+        if kind == "upsert":
+            conn.execute('INSERT OR REPLACE INTO entries (id, week, day, start, "end", name, category, fixed) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', op[2])
+        elif kind == "upsert_many":
+            conn.executemany('INSERT OR REPLACE INTO entries (id, week, day, start, "end", name, category, fixed) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', op[2])
+        elif kind == "delete":
+            conn.execute("DELETE FROM entries WHERE id = ?", (op[2],))
+        elif kind == "delete_day":
+            conn.execute("DELETE FROM entries WHERE week = ? AND day = ?", (op[1], op[2]))
+        elif kind == "rule":
+            conn.execute('INSERT OR REPLACE INTO rules (id, name, category, start, "end", days, interval, '
+                         'first, until, count, exceptions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', op[1])
+        elif kind == "delete_rule":
+            conn.execute("DELETE FROM rules WHERE id = ?", (op[1],))
+        elif kind == "meta":
+            _, cats, acts = op
+            conn.execute("DELETE FROM categories")
+            conn.executemany("INSERT INTO categories (id, name, color, active) VALUES (?, ?, ?, ?)", cats)
+            conn.execute("DELETE FROM activities")
+            conn.executemany("INSERT INTO activities (pos, name, category, duration) VALUES (?, ?, ?, ?)", acts)
+        elif kind == "reminder":
+            conn.execute("INSERT OR REPLACE INTO reminders (pos, text, at, week, entry, rule, lead, fired, start) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", op[1])
+        elif kind == "delete_reminder":
+            conn.execute("DELETE FROM reminders WHERE pos = ?", (op[1],))
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._prefetcher.shutdown(wait=True, cancel_futures=True)
+        self._queue.put(None)
+        self._writer.join()
+        self._conn.close()
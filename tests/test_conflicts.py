@@ -0,0 +1,73 @@
+# test_conflicts.py
+import random
+
+import pytest
+
+from conflicts import ConflictIndex, overlap_counts, sweep
+from entries import DAYS
+from schedule_store import ScheduleStore
+from test_schedule_store import random_entry, random_store
+
+
+def overlaps(a, b):
+    return a is not b and a.day == b.day and a.start < b.end and b.start < a.end
+
+
+def brute_counts(entries):
+    counts = {}
+    for e in entries:
+        n = sum(overlaps(e, o) for o in entries)
+        if n:
+            counts[e] = n
+    return counts
+
+
+def brute_pairs(entries):
+    return {frozenset((id(a), id(b))) for i, a in enumerate(entries) for b in entries[i + 1:] if overlaps(a, b)}
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_sweep_and_counts_match_all_pairs(seed):
+    rng = random.Random(seed)
+    store = ScheduleStore([random_entry(rng, "M") for _ in range(rng.randrange(1, 80))])
+    day = store.day_entries("M")
+    assert overlap_counts(day) == brute_counts(day)
+    pairs = sweep(day)
+    assert len(pairs) == len({frozenset((id(a), id(b))) for a, b in pairs})
+    assert {frozenset((id(a), id(b))) for a, b in pairs} == brute_pairs(day)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_live_index_matches_all_pairs_after_edits(seed):
+    rng = random.Random(seed)
+    store = ScheduleStore()
+    index = ConflictIndex(store)
+    live = []
+    for step in range(300):
+        op = rng.random()
+        if op < 0.55 or not live:
+            live.append(store.add(random_entry(rng, rng.choice(("M", "T")))))
+        elif op < 0.8:
+            e = rng.choice(live)
+            start = rng.randrange(6 * 4, 22 * 4) / 4
+            store.update(e, start=start, end=min(24.0, start + rng.randrange(1, 13) / 4))
+        elif op < 0.95:
+            store.remove(live.pop(rng.randrange(len(live))))
+        else:
+            day = rng.choice(("M", "T"))
+            removed = store.clear_day(day)
+            if rng.random() < 0.5:
+                store.restore_day(day, removed)
+            else:
+                live = [e for e in live if e.day != day]
+        if step % 10 == 0:
+            assert index.counts == brute_counts(live)
+            assert len(index) == len(brute_pairs(live))
+            for day in DAYS:
+                assert {frozenset((id(a), id(b))) for a, b in index.day_pairs(day)} == \
+                    brute_pairs([e for e in live if e.day == day])
+
+
+def test_index_built_from_existing_store():
+    store, live = random_store(random.Random(3), n=400)
+    assert ConflictIndex(store).counts == brute_counts(live)
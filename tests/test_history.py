@@ -0,0 +1,169 @@
+# test_history.py
+import random
+from datetime import timedelta
+
+import pytest
+
+from entries import DAYS
+from history import History
+from planner_core import Planner, PlannerError
+
+
+# -----------------------
+# Rollback
+# -----------------------
+def _log(history, state, value, fail=None):
+    # record appending value to state; fail["undo"] / fail["redo"] make that replay raise
+    state.append(value)
+
+    def undo():
+        if fail and fail.get("undo"):
+            raise PlannerError("undo failed")
+        state.remove(value)
+
+    def redo():
+        if fail and fail.get("redo"):
+            raise PlannerError("redo failed")
+        state.append(value)
+    history.record(f"add {value}", undo, redo)
+
+
+def test_failed_undo_reverses_applied_ops_and_keeps_step():
+    h, state, fail = History(), [], {}
+    with h.group("three"):
+        _log(h, state, 1)
+        _log(h, state, 2, fail)
+        _log(h, state, 3)
+    fail["undo"] = True
+    with pytest.raises(PlannerError):
+        h.undo()
+    assert state == [1, 2, 3]
+    assert h.undo_label() == "three" and not h.can_redo()
+    fail["undo"] = False
+    assert h.undo() == "three"
+    assert state == []
+
+
+def test_failed_redo_reverses_applied_ops_and_keeps_step():
+    h, state, fail = History(), [], {}
+    with h.group("three"):
+        _log(h, state, 1)
+        _log(h, state, 2, fail)
+        _log(h, state, 3)
+    h.undo()
+    fail["redo"] = True
+    with pytest.raises(PlannerError):
+        h.redo()
+    assert state == []
+    assert h.redo_label() == "three" and not h.can_undo()
+    fail["redo"] = False
+    h.redo()
+    assert state == [1, 2, 3]
+
+
+def test_failed_group_is_reversed_and_not_recorded():
+    h, state = History(), []
+    _log(h, state, 0)
+    with pytest.raises(RuntimeError):
+        with h.group("bad"):
+            _log(h, state, 1)
+            _log(h, state, 2)
+            raise RuntimeError
+    assert state == [0]
+    assert h.undo_label() == "add 0"
+
+
+def test_failed_inner_group_keeps_outer_step():
+    h, state = History(), []
+    with h.group("outer"):
+        _log(h, state, 1)
+        try:
+            with h.group("inner"):
+                _log(h, state, 2)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+    assert state == [1]
+    h.undo()
+    assert state == [] and not h.can_undo()
+
+
+def test_failed_planner_group_leaves_nothing_behind():
+    p = Planner(None)
+    before = len(p.categories)
+    with pytest.raises(PlannerError):
+        with p.history.group("Add Swim"):
+            cid = p.add_category("Water", "#0088cc")
+            p.set_activity("Swim", cid, -1)  # invalid duration
+    assert p.categories.id_of("Water") is None and len(p.categories) == before + 1
+    assert "Swim" not in p.activities
+    assert not p.history.can_undo()
+
+
+# -----------------------
+# Random edit / undo / clear against an in-memory planner
+# -----------------------
+def _week_rows(planner, week):
+    store = planner.week_store(week)
+    return sorted((e.day, e.start, e.end, e.name, e.category, e.fixed, e.rule)
+                  for day in DAYS for e in store.day_entries(day))
+
+
+def _find(planner, week, key):
+    for e in planner.week_store(week).day_entries(key[0]):
+        if (e.day, e.start, e.end, e.name) == key:
+            return e
+    return None
+
+
+def _step(planner, week, choice, picked):
+    # one random user action; both planners get the same arguments
+    if choice == "add":
+        day, start = picked
+        planner.add_entry(day, start, start + 1, f"e{start:g}{day}", 0, week=week)
+    elif choice in ("move", "remove"):
+        e = _find(planner, week, picked)
+        if choice == "move":
+            planner.update_entry(e, week=week, start=e.start + 0.5, end=e.end + 0.5)
+        else:
+            planner.remove_entry(e, week=week)
+    elif choice == "clear":
+        planner.clear_day(picked, week=week)
+    elif choice == "undo":
+        planner.history.undo()
+    elif choice == "redo":
+        planner.history.redo()
+
+
+def test_random_edits_match_memory_planner(tmp_path):
+    rng = random.Random(1234)
+    db = str(tmp_path / "planner.db")
+    disk, mem = Planner(db), Planner(None)
+    weeks = [disk.week + timedelta(weeks=k) for k in range(3)]
+    try:
+        for _ in range(3000):
+            week = rng.choice(weeks)
+            choice = rng.choice(("add", "add", "add", "move", "remove", "clear", "undo", "undo", "redo"))
+            picked = None
+            if choice == "add":
+                picked = (rng.choice(DAYS), float(rng.randrange(8, 18)))
+            elif choice in ("move", "remove"):
+                rows = [r for r in _week_rows(mem, week) if r[6] is None and r[2] < 19.5]
+                if not rows:
+                    continue
+                picked = rng.choice(rows)[:4]
+            elif choice == "clear":
+                picked = rng.choice(DAYS)
+            _step(mem, week, choice, picked)
+            _step(disk, week, choice, picked)
+            assert _week_rows(disk, week) == _week_rows(mem, week)
+        expected = {week: _week_rows(mem, week) for week in weeks}
+    finally:
+        disk.close()
+    reopened = Planner(db)
+    try:
+        assert reopened.storage.error is None
+        for week in weeks:
+            assert _week_rows(reopened, week) == expected[week]
+    finally:
+        reopened.close()
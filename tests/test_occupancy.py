@@ -0,0 +1,97 @@
+# test_occupancy.py
+import random
+
+import pytest
+
+from entries import DAYS
+from occupancy import DayOccupancy
+from schedule_store import ScheduleStore
+from test_schedule_store import random_store
+
+LO, HI = 8.0, 20.0
+PER_HOUR = 12  # the reference works in whole 5-minute slots, so it never rounds
+
+
+def slots(entries):
+    return [(round(e.start * PER_HOUR), round(e.end * PER_HOUR)) for e in entries]
+
+
+def busy(spans, a, b):
+    return any(s < b and e > a for s, e in spans)
+
+
+def linear_fits(entries, dur, step_minutes):
+    # every aligned start in [LO, HI - dur] that no entry overlaps
+    spans, n, step = slots(entries), round(dur * PER_HOUR), step_minutes // 5
+    lo, hi = round(LO * PER_HOUR), round(HI * PER_HOUR)
+    return [p / PER_HOUR for p in range(lo, hi - n + 1, step) if not busy(spans, p, p + n)]
+
+
+def linear_gaps(entries):
+    # maximal free stretches of [LO, HI)
+    spans, gaps = slots(entries), []
+    lo, hi = round(LO * PER_HOUR), round(HI * PER_HOUR)
+    p = lo
+    while p < hi:
+        if busy(spans, p, p + 1):
+            p += 1
+            continue
+        g = p
+        while p < hi and not busy(spans, p, p + 1):
+            p += 1
+        gaps.append((g / PER_HOUR, p / PER_HOUR))
+    return gaps
+
+
+def linear_best_fit(entries, dur, step_minutes):
+    # earliest fitting start inside the smallest gap that has one
+    fits = linear_fits(entries, dur, step_minutes)
+    best = None
+    for g_lo, g_hi in linear_gaps(entries):
+        inside = [t for t in fits if g_lo <= t and t + dur <= g_hi + 1e-9]
+        if inside and (best is None or g_hi - g_lo < best[0] - 1e-9):
+            best = (g_hi - g_lo, inside[0])
+    return None if best is None else best[1]
+
+
+def close(a, b):
+    return (a is None and b is None) or (a is not None and b is not None and abs(a - b) < 1e-9)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_placement_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    store, live = random_store(rng, n=rng.randrange(5, 60), days=("M",))
+    entries = [e for e in live if e.day == "M"]
+    occ = DayOccupancy()
+    for e in entries:
+        occ.mark(e.start, e.end)
+    gaps = occ.gaps(LO, HI)
+    expected = linear_gaps(entries)
+    assert len(gaps) == len(expected) and all(close(a, c) and close(b, d) for (a, b), (c, d) in zip(gaps, expected))
+    for _ in range(10):
+        dur = rng.randrange(1, 24) * 5 / 60
+        step = rng.choice((5, 15, 30, 60))
+        fits = linear_fits(entries, dur, step)
+        assert all(close(a, b) for a, b in zip(occ.fits(dur, LO, HI, step), fits))
+        assert len(occ.fits(dur, LO, HI, step)) == len(fits)
+        assert close(occ.first_fit(dur, LO, HI, step), fits[0] if fits else None)
+        assert close(occ.best_fit(dur, LO, HI, step), linear_best_fit(entries, dur, step))
+        assert close(store.first_fit("M", dur, LO, HI, step), fits[0] if fits else None)
+        assert close(store.best_fit("M", dur, LO, HI, step), linear_best_fit(entries, dur, step))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_store_bitmap_follows_edits(seed):
+    # after removes and moves the store re-marks freed spans from what is left
+    store, live = random_store(random.Random(seed), n=300)
+    for day in DAYS:
+        spans = slots([e for e in live if e.day == day])
+        for p in range(8 * PER_HOUR, 20 * PER_HOUR):
+            assert store.is_free(day, p / PER_HOUR, (p + 1) / PER_HOUR) == (not busy(spans, p, p + 1))
+
+
+def test_empty_day():
+    store = ScheduleStore()
+    assert store.first_fit("M", 1.0) == LO
+    assert store.free_gaps("M") == [(LO, HI)]
@@ -0,0 +1,99 @@
+# test_schedule_store.py
+import random
+
+import pytest
+
+from entries import DAYS, Entry
+from schedule_store import ScheduleStore
+
+
+def random_entry(rng, day=None):
+    start = rng.randrange(6 * 4, 22 * 4) / 4
+    end = min(24.0, start + rng.randrange(1, 13) / 4)
+    return Entry(day or rng.choice(DAYS), start, end, f"e{rng.randrange(1000)}", rng.randrange(5))
+
+
+def random_store(rng, n=200, days=DAYS):
+    # a store after a random run of adds, moves and removes, and the entries it should hold
+    store, live = ScheduleStore(), []
+    for _ in range(n):
+        op = rng.random()
+        if op < 0.6 or not live:
+            live.append(store.add(random_entry(rng, rng.choice(days))))
+        elif op < 0.8:
+            e = rng.choice(live)
+            start = rng.randrange(6 * 4, 22 * 4) / 4
+            store.update(e, day=rng.choice(days), start=start, end=min(24.0, start + rng.randrange(1, 13) / 4))
+        else:
+            store.remove(live.pop(rng.randrange(len(live))))
+    return store, live
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_days_stay_sorted_and_complete(seed):
+    store, live = random_store(random.Random(seed))
+    assert len(store) == len(live)
+    for day in DAYS:
+        got = store.day_entries(day)
+        assert [e.start for e in got] == sorted(e.start for e in got)
+        assert sorted(map(id, got)) == sorted(id(e) for e in live if e.day == day)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_range_queries_match_linear_scan(seed):
+    rng = random.Random(seed)
+    store, live = random_store(rng)
+    for _ in range(100):
+        day = rng.choice(DAYS)
+        t1 = rng.randrange(0, 24 * 4) / 4
+        t2 = t1 + rng.randrange(1, 16) / 4
+        overlapping = [e for e in live if e.day == day and e.start < t2 and e.end > t1]
+        assert sorted(map(id, store.overlapping(day, t1, t2))) == sorted(map(id, overlapping))
+        assert store.has_overlap(day, t1, t2) == bool(overlapping)
+        between = [e for e in live if e.day == day and t1 <= e.start < t2]
+        assert sorted(map(id, store.entries_between(day, t1, t2))) == sorted(map(id, between))
+
+
+def test_clear_and_restore_day_round_trip():
+    rng = random.Random(7)
+    store, live = random_store(rng, days=("M", "T"))
+    before = list(store.day_entries("M"))
+    removed = store.clear_day("M")
+    assert store.day_entries("M") == [] and len(store) == len(live) - len(before)
+    store.restore_day("M", removed)
+    assert store.day_entries("M") == before
+
+
+def test_stale_entry_is_rejected():
+    store = ScheduleStore()
+    e = store.add(Entry("M", 9, 10, "x", 0))
+    store.remove(e)
+    with pytest.raises(ValueError):
+        store.remove(e)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_packed_store_matches_object_store(seed):
+    rng = random.Random(seed)
+    entries = sorted((random_entry(rng) for _ in range(300)), key=lambda e: (DAYS.index(e.day), e.start))
+    rows = [(i + 1, DAYS.index(e.day), e.start, e.end, e.name, e.category, e.fixed) for i, e in enumerate(entries)]
+    packed, plain = ScheduleStore.from_rows(rows), ScheduleStore(entries)
+    # counts, totals and placement come from the packed columns
+    assert len(packed) == len(plain) and packed.days() == plain.days()
+    assert packed.totals.week() == pytest.approx(plain.totals.week())
+    for day in DAYS:
+        assert packed.totals.day(day) == pytest.approx(plain.totals.day(day))
+        assert packed.first_fit(day, 1.0) == plain.first_fit(day, 1.0)
+        assert packed.best_fit(day, 0.5) == plain.best_fit(day, 0.5)
+    # reading a day builds its entries once; edits then work as usual
+    first = packed.day_entries("M")
+    assert packed.day_entries("M") is first
+    assert [(e.id, e.start, e.end, e.name) for e in first] == \
+        [(r[0], r[2], r[3], r[4]) for r in rows if r[1] == 0]
+    if first:
+        packed.update(first[0], start=first[0].start + 0.25, end=first[0].end + 0.25)
+        packed.remove(first[-1])
+    cleared = packed.clear_day("T")
+    assert len(cleared) == sum(1 for r in rows if r[1] == 1)
+    packed.restore_day("T", cleared)
+    assert packed.day_entries("T") == cleared
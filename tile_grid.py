@@ -0,0 +1,130 @@
+# tile_grid.py
+import tkinter as tk
+from ttkbootstrap import ttk
+
+# -----------------------
+# Virtualized tile grid
+# -----------------------
+# Activity tiles live in a scrollable canvas. Only the rows in view (plus one
+# spare) have widgets: a fixed pool of tiles is created once, each with its
+# bindings, and scrolling or set_items() just re-assigns pooled tiles to item
+# indices, moving their canvas windows and updating label text when it
+# changed. Cost scales with what is visible, not with the number of items,
+# and no widget or Tcl binding is ever destroyed and recreated.
+TILE_W = 200
+TILE_H = 60
+TILE_PAD = 6
+
+
+class _Tile:
+    __slots__ = ("frame", "title", "sub", "window", "index", "state")
+
+
+class TileGrid:
+    def __init__(self, master, on_click, font, font_bold, cols=2, visible_rows=5, style="card"):
+        self.on_click = on_click
+        self.font = font
+        self.font_bold = font_bold
+        self.cols = cols
+        self.visible_rows = visible_rows
+        self.style = style
+        self.row_h = TILE_H + 2 * TILE_PAD
+        self.col_w = TILE_W + 2 * TILE_PAD
+        self.frame = ttk.Frame(master)
+        self.canvas = tk.Canvas(self.frame, width=cols * self.col_w, height=visible_rows * self.row_h,
+                                highlightthickness=0, bd=0, yscrollincrement=self.row_h)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<MouseWheel>", self._wheel)
+        self.canvas.bind("<Button-4>", self._wheel)
+        self.canvas.bind("<Button-5>", self._wheel)
+        self.items = []  # (key, title, subtitle) per tile index
+        self.pool = []
+        self.shown = {}  # item index -> _Tile
+        self._layout_id = None
+
+    def pack(self, **kw):
+        self.frame.pack(**kw)
+
+    # --- data ---
+    def set_items(self, items):
+        self.items = list(items)
+        rows = -(-len(self.items) // self.cols)
+        self.canvas.configure(scrollregion=(0, 0, self.cols * self.col_w, max(1, rows) * self.row_h))
+        self.layout()
+
+    # --- pooling ---
+    def _new_tile(self):
+        t = _Tile()
+        t.frame = ttk.Frame(self.canvas, width=TILE_W, height=TILE_H, style=self.style)
+        t.frame.pack_propagate(False)
+        t.title = ttk.Label(t.frame, text="", font=self.font_bold)
+        t.title.pack(anchor="w", padx=8, pady=(8, 0), fill="x")
+        t.sub = ttk.Label(t.frame, text="", font=self.font)
+        t.sub.pack(anchor="w", padx=8, pady=(0, 8), fill="x")
+        t.window = self.canvas.create_window(0, 0, window=t.frame, anchor="nw", state="hidden")
+        t.index = None
+        t.state = None
+        # bound once per pooled widget; the click looks the item up at click time
+        for w in (t.frame, t.title, t.sub):
+            w.bind("<Button-1>", lambda e, tile=t: self._click(tile))
+            w.bind("<MouseWheel>", self._wheel)
+            w.bind("<Button-4>", self._wheel)
+            w.bind("<Button-5>", self._wheel)
+        self.pool.append(t)
+        return t
+
+    def _click(self, tile):
+        if tile.index is not None and tile.index < len(self.items):
+            self.on_click(self.items[tile.index][0])
+
+    def layout(self):
+        self._layout_id = None
+        top = self.canvas.canvasy(0)
+        first = int(top // self.row_h) * self.cols
+        last = min(len(self.items), (int(top // self.row_h) + self.visible_rows + 1) * self.cols)
+        wanted = range(first, last)
+
+        # release tiles that scrolled out of view (or whose item is gone)
+        for index in [i for i in self.shown if i not in wanted]:
+            self.shown.pop(index).index = None
+        free = [t for t in self.pool if t.index is None]
+
+        for index in wanted:
+            tile = self.shown.get(index)
+            if tile is None:
+                tile = free.pop() if free else self._new_tile()
+                tile.index = index
+                self.shown[index] = tile
+                row, col = divmod(index, self.cols)
+                self.canvas.coords(tile.window, col * self.col_w + TILE_PAD, row * self.row_h + TILE_PAD)
+                self.canvas.itemconfigure(tile.window, state="normal")
+            _, title, sub = self.items[index]
+            if tile.state != (title, sub):
+                tile.title.configure(text=title)
+                tile.sub.configure(text=sub)
+                tile.state = (title, sub)
+        for tile in free:
+            self.canvas.itemconfigure(tile.window, state="hidden")
+
+    # --- scrolling ---
+    def _schedule_layout(self):
+        if self._layout_id is None:
+            self._layout_id = self.canvas.after_idle(self.layout)
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_layout()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_layout()
+
+    def _wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+        self._schedule_layout()
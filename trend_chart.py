@@ -0,0 +1,84 @@
+# trend_chart.py
+
+# -----------------------
+# Trend chart
+# -----------------------
+# The figure of the analytics ("Trends") panel: stacked hours per category
+# for a run of weeks or months, a weekday x hour-of-day heatmap, or target
+# versus actual bars. The numbers come from analytics.py already summed; this
+# only draws them. matplotlib is imported when the chart is created, which
+# the app does the first time the panel is opened.
+MAX_TICKS = 8  # period labels shown under the bars
+
+
+class TrendChart:
+    def __init__(self, master, figsize=(4, 2.8), dpi=100):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.fig.add_subplot(111)
+        self.canvas_fig = FigureCanvasTkAgg(self.fig, master=master)
+        self.widget = self.canvas_fig.get_tk_widget()
+        self._colorbar = None
+
+    def _reset(self):
+        if self._colorbar is not None:
+            self._colorbar.remove()
+            self._colorbar = None
+        self.ax.clear()
+
+    def _draw(self):
+        self.fig.tight_layout()
+        self.canvas_fig.draw_idle()
+
+    def stacked(self, labels, hours, names, colors):
+        # hours: [periods, categories]; one bar per period, one segment per category
+        self._reset()
+        ax = self.ax
+        x = list(range(len(labels)))
+        tops = hours.cumsum(axis=1)
+        for k, (name, color) in enumerate(zip(names, colors)):
+            if hours[:, k].any():
+                ax.bar(x, hours[:, k], bottom=tops[:, k] - hours[:, k], color=color, label=name, width=0.8)
+        step = max(1, -(-len(labels) // MAX_TICKS))
+        ax.set_xticks(x[::step], labels[::step], fontsize=7)
+        ax.tick_params(axis="y", labelsize=7)
+        ax.set_ylabel("hours", fontsize=8)
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend(fontsize=6, loc="upper left", ncols=2, frameon=False)
+        self._draw()
+
+    def heatmap(self, grid, row_labels):
+        # grid: [weekday, hour of day] hours
+        self._reset()
+        ax = self.ax
+        im = ax.imshow(grid, aspect="auto", cmap="Blues", interpolation="nearest")
+        ax.set_yticks(range(len(row_labels)), row_labels, fontsize=7)
+        ax.set_xticks(range(0, 24, 3), [f"{h:02d}" for h in range(0, 24, 3)], fontsize=7)
+        ax.set_xlabel("hour of day", fontsize=8)
+        self._colorbar = self.fig.colorbar(im, ax=ax)
+        self._colorbar.ax.tick_params(labelsize=7)
+        self._draw()
+
+    def versus(self, names, targets, actuals, colors):
+        # one pair of bars (target, actual) per category
+        self._reset()
+        ax = self.ax
+        y = list(range(len(names)))
+        ax.barh([i + 0.2 for i in y], targets, height=0.4, color="#dee2e6", label="target")
+        ax.barh([i - 0.2 for i in y], actuals, height=0.4, color=colors, label="actual")
+        ax.set_yticks(y, names, fontsize=7)
+        ax.invert_yaxis()
+        ax.tick_params(axis="x", labelsize=7)
+        ax.set_xlabel("hours", fontsize=8)
+        ax.legend(fontsize=6, frameon=False)
+        self._draw()
+
+    def message(self, text):
+        self._reset()
+        self.ax.text(0.5, 0.5, text, ha="center", va="center", fontsize=9, wrap=True)
+        self.ax.set_axis_off()
+        self._draw()
+
+    def close(self):
+        pass
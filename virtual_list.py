@@ -0,0 +1,150 @@
+# virtual_list.py
+import tkinter as tk
+from ttkbootstrap import ttk
+
+# -----------------------
+# Virtual list view
+# -----------------------
+# A Listbox that only ever holds the rows in view. The model is any sequence
+# (e.g. the store's ordered day list or the reminders list) and is not copied;
+# row i of the model is always item i, so selection is an index into it and
+# selected() is O(1). Rows are formatted with format_row only when they
+# scroll into view, and the scrollbar is driven from the model length.
+# style_row(item), if given, returns itemconfigure options for a visible row
+# (e.g. a highlight colour) or None.
+class VirtualList:
+    def __init__(self, master, width, height, font, format_row=str, on_select=None, on_activate=None,
+                 style_row=None):
+        self.format_row = format_row
+        self.style_row = style_row
+        self.on_select = on_select
+        self.on_activate = on_activate
+        self.height = height
+        self.rows = []
+        self.top = 0  # model index of the first visible row
+        self.sel = None  # selected model index
+        self._sel_item = None  # rows[sel] when it was selected
+        self._shown = []  # formatted text currently in the listbox
+        self._styles = []  # style_row() result per listbox row
+        self.frame = ttk.Frame(master)
+        self.listbox = tk.Listbox(self.frame, width=width, height=height, font=font,
+                                  activestyle="none", exportselection=False)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._yview)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<Double-Button-1>", self._on_double)
+        self.listbox.bind("<MouseWheel>", self._wheel)
+        self.listbox.bind("<Button-4>", self._wheel)
+        self.listbox.bind("<Button-5>", self._wheel)
+        self.listbox.bind("<Up>", lambda e: self._step(-1))
+        self.listbox.bind("<Down>", lambda e: self._step(1))
+        self.listbox.bind("<Prior>", lambda e: self._step(-self.height))
+        self.listbox.bind("<Next>", lambda e: self._step(self.height))
+
+    def pack(self, **kw):
+        self.frame.pack(**kw)
+
+    # --- model ---
+    def set_rows(self, rows, keep_selection=False):
+        # rows is kept by reference; call again (or refresh()) after it changes.
+        # keep_selection keeps the selected index only if it still holds the same item
+        self.rows = rows
+        if not (keep_selection and self.sel is not None and self.sel < len(rows) and rows[self.sel] is self._sel_item):
+            self.sel = self._sel_item = None
+        self.top = max(0, min(self.top, len(rows) - self.height))
+        self.refresh()
+
+    def selected(self):
+        if self.sel is None or self.sel >= len(self.rows):
+            return None
+        return self.rows[self.sel]
+
+    def selected_index(self):
+        return self.sel if self.selected() is not None else None
+
+    def select(self, index):
+        self.sel = index
+        self._sel_item = self.selected()
+        if index is not None:
+            self.see(index)
+        self.refresh()
+
+    def see(self, index):
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.height:
+            self.top = index - self.height + 1
+
+    # --- rendering ---
+    @staticmethod
+    def window(rows, top, height, format_row):
+        # formatted text of the rows in view
+        return [format_row(r) for r in rows[top:top + height]]
+
+    def refresh(self):
+        lb = self.listbox
+        text = self.window(self.rows, self.top, self.height, self.format_row)
+        if text != self._shown:
+            lb.delete(0, tk.END)
+            if text:
+                lb.insert(tk.END, *text)
+            self._shown = text
+            self._styles = [None] * len(text)
+        if self.style_row is not None:
+            # styles can change without the text changing (e.g. a new overlap)
+            for i, item in enumerate(self.rows[self.top:self.top + len(text)]):
+                style = self.style_row(item)
+                if style != self._styles[i]:
+                    lb.itemconfigure(i, **(style or {"background": "", "foreground": ""}))
+                    self._styles[i] = style
+        lb.selection_clear(0, tk.END)
+        if self.sel is not None and self.top <= self.sel < self.top + len(text):
+            lb.selection_set(self.sel - self.top)
+        n = len(self.rows)
+        if n <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / n, (self.top + self.height) / n)
+
+    def _scroll_to(self, top):
+        top = max(0, min(int(top), len(self.rows) - self.height))
+        if top != self.top:
+            self.top = top
+            self.refresh()
+
+    def _yview(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = self.height if args[2] == "pages" else 1
+            self._scroll_to(self.top + int(args[1]) * step)
+
+    def _wheel(self, event):
+        up = getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_to(self.top + (-3 if up else 3))
+        return "break"
+
+    # --- events ---
+    def _on_listbox_select(self, event=None):
+        cur = self.listbox.curselection()
+        if not cur:
+            return
+        self.sel = self.top + cur[0]
+        self._sel_item = self.selected()
+        if self.on_select is not None:
+            self.on_select(self.selected())
+
+    def _on_double(self, event=None):
+        self._on_listbox_select()
+        if self.on_activate is not None and self.selected() is not None:
+            self.on_activate(self.selected())
+
+    def _step(self, delta):
+        if not self.rows:
+            return "break"
+        index = 0 if self.sel is None else max(0, min(len(self.rows) - 1, self.sel + delta))
+        self.select(index)
+        if self.on_select is not None:
+            self.on_select(self.selected())
+        return "break"
@@ -0,0 +1,244 @@
+# week_renderer.py
+import tkinter.font as tkfont
+
+from entries import DAYS, columns
+
+# -----------------------
+# Week overview canvas
+# -----------------------
+# All seven days side by side. week_geometry() turns the week's entries into
+# block rectangles in one pass over column arrays (vectorized with NumPy when
+# it is installed): entries outside the visible hours are culled, and runs of
+# blocks too short to see or click are merged into one "n items" block.
+# WeekCanvasRenderer then diffs those blocks against the canvas like the day
+# renderer does, so an unchanged block costs nothing. Hour labels and fitted
+# (truncated) block titles are cached, since measuring text is the slow part
+# of drawing many small labels.
+LABEL_W = 54
+HEADER_H = 24
+BOTTOM_PAD = 20
+MIN_BLOCK_PX = 4  # shorter blocks are merged with close neighbours
+MERGE_GAP_PX = 2  # ... when they are at most this far apart
+TEXT_MIN_PX = 14  # blocks shorter than this get no title
+MERGED_COLOR = "#adb5bd"
+GRID_COLOR = "#e6e9ee"
+CONFLICT_COLOR = "#d9534f"
+ZOOM_SPANS = (6, 12, 18, 24)  # visible hours per zoom level
+BLOCK_FONT = ("Segoe UI", 8)
+_FIT_CACHE_MAX = 4096
+
+
+def week_geometry(cols, lo, hi, top, px_per_hour):
+    # blocks [(day index, y1, y2, first entry index, entry count)] for entries
+    # ordered by (day, start); count > 1 is a merged run of tiny blocks
+    try:
+        import numpy as np
+    except ImportError:
+        return _week_geometry_py(cols, lo, hi, top, px_per_hour)
+    day = np.frombuffer(cols["day"], dtype=np.int8)
+    start = np.frombuffer(cols["start"])
+    end = np.frombuffer(cols["end"])
+    idx = np.nonzero((end > lo) & (start < hi))[0]
+    if not len(idx):
+        return []
+    day = day[idx]
+    y1 = top + (np.maximum(start[idx], lo) - lo) * px_per_hour
+    y2 = top + (np.minimum(end[idx], hi) - lo) * px_per_hour
+    small = (y2 - y1) < MIN_BLOCK_PX
+    new = np.ones(len(idx), dtype=bool)
+    new[1:] = ~(small[1:] & small[:-1] & (day[1:] == day[:-1]) & (y1[1:] - y2[:-1] <= MERGE_GAP_PX))
+    first = np.nonzero(new)[0]
+    counts = np.diff(np.append(first, len(idx)))
+    return list(zip(day[first].tolist(), y1[first].tolist(), np.maximum.reduceat(y2, first).tolist(),
+                    idx[first].tolist(), counts.tolist()))
+
+
+def _week_geometry_py(cols, lo, hi, top, px_per_hour):
+    blocks = []
+    prev = None  # (day, y2, small) of the previous visible entry
+    for i, (d, s, t) in enumerate(zip(cols["day"], cols["start"], cols["end"])):
+        if t <= lo or s >= hi:
+            continue
+        y1 = top + (max(s, lo) - lo) * px_per_hour
+        y2 = top + (min(t, hi) - lo) * px_per_hour
+        small = y2 - y1 < MIN_BLOCK_PX
+        if small and prev is not None and prev[2] and prev[0] == d and y1 - prev[1] <= MERGE_GAP_PX:
+            day, b1, b2, first, n = blocks[-1]
+            blocks[-1] = (day, b1, max(b2, y2), first, n + 1)
+        else:
+            blocks.append((d, y1, y2, i, 1))
+        prev = (d, y2, small)
+    return blocks
+
+
+class WeekCanvasRenderer:
+    def __init__(self, canvas, width, height, font, format_time, on_pick, lo=8.0, hi=20.0):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.font = font
+        self.format_time = format_time
+        self.on_pick = on_pick  # on_pick(day code, entry or None)
+        self.lo = lo
+        self.hi = hi
+        self.col_w = (width - LABEL_W) / len(DAYS)
+        self.items = {}  # block key -> [rect, text_id, state, day, entry]
+        self.owner = {}  # canvas item -> block key
+        self.footer = None
+        self._grid_range = None
+        self._measure = tkfont.Font(font=BLOCK_FONT).measure
+        self._widths = {}  # text -> pixel width
+        self._fitted = {}  # (text, max width) -> shown text
+        self._hour_labels = {}  # hour -> format_time(hour)
+        canvas.tag_bind("block", "<Button-1>", self._click)
+
+    # --- geometry ---
+    @property
+    def px_per_hour(self):
+        return (self.height - HEADER_H - BOTTOM_PAD) / (self.hi - self.lo)
+
+    def set_range(self, lo, hi):
+        span = hi - lo
+        self.lo = max(0.0, min(lo, 24.0 - span))
+        self.hi = self.lo + span
+        return self.lo, self.hi
+
+    def zoom(self, step):
+        # step -1 zooms out (more hours), +1 zooms in, keeping the middle in place
+        span = self.hi - self.lo
+        spans = list(ZOOM_SPANS)
+        i = min(range(len(spans)), key=lambda k: abs(spans[k] - span))
+        new = spans[max(0, min(len(spans) - 1, i - step))]
+        mid = (self.lo + self.hi) / 2
+        return self.set_range(mid - new / 2, mid + new / 2)
+
+    def scroll(self, hours):
+        return self.set_range(self.lo + hours, self.hi + hours)
+
+    # --- cached text ---
+    def _hour_label(self, h):
+        label = self._hour_labels.get(h)
+        if label is None:
+            label = self._hour_labels[h] = self.format_time(h)
+        return label
+
+    def _width(self, text):
+        w = self._widths.get(text)
+        if w is None:
+            if len(self._widths) > _FIT_CACHE_MAX:
+                self._widths.clear()
+            w = self._widths[text] = self._measure(text)
+        return w
+
+    def _fit(self, text, max_w):
+        key = (text, max_w)
+        shown = self._fitted.get(key)
+        if shown is None:
+            if len(self._fitted) > _FIT_CACHE_MAX:
+                self._fitted.clear()
+            shown = text
+            if self._width(text) > max_w:
+                # longest prefix that fits with an ellipsis (binary search on length)
+                lo, hi = 0, len(text)
+                while lo < hi:
+                    mid = (lo + hi + 1) // 2
+                    if self._width(text[:mid] + "…") <= max_w:
+                        lo = mid
+                    else:
+                        hi = mid - 1
+                shown = text[:lo] + "…" if lo else ""
+            self._fitted[key] = shown
+        return shown
+
+    # --- static layer ---
+    def draw_grid(self):
+        if self._grid_range == (self.lo, self.hi):
+            return
+        c = self.canvas
+        c.delete("grid")
+        c.create_rectangle(0, 0, self.width, self.height, fill="white", outline="", tags=("grid",))
+        for i, d in enumerate(DAYS):
+            x = LABEL_W + i * self.col_w
+            c.create_text(x + self.col_w / 2, HEADER_H / 2, text=d, font=self.font, tags=("grid",))
+            c.create_line(x, HEADER_H, x, self.height - BOTTOM_PAD, fill=GRID_COLOR, tags=("grid",))
+        pph = self.px_per_hour
+        step = 1 if self.hi - self.lo <= 12 else 2
+        h = int(self.lo)
+        while h <= self.hi:
+            if h >= self.lo:
+                y = HEADER_H + (h - self.lo) * pph
+                c.create_line(LABEL_W, y, self.width, y, fill=GRID_COLOR, tags=("grid",))
+                if h < self.hi:
+                    c.create_text(LABEL_W / 2, y, anchor="n", text=self._hour_label(h), font=("Segoe UI", 8),
+                                  fill="#6c757d", tags=("grid",))
+            h += step
+        if self.footer is None:
+            self.footer = c.create_text(self.width / 2, self.height - 10, text="", font=("Segoe UI", 9),
+                                        fill="#6c757d", tags=("footer",))
+        c.tag_lower("grid")
+        self._grid_range = (self.lo, self.hi)
+
+    # --- blocks ---
+    def render(self, entries, color_of, conflicted=None):
+        # entries: the whole week ordered by (day, start)
+        self.draw_grid()
+        c = self.canvas
+        blocks = week_geometry(columns(entries), self.lo, self.hi, HEADER_H, self.px_per_hour)
+        seen = set()
+        text_w = int(self.col_w) - 10
+        for day, y1, y2, first, count in blocks:
+            e = entries[first]
+            x1 = LABEL_W + day * self.col_w + 2
+            x2 = x1 + self.col_w - 4
+            y2 = max(y2, y1 + 2)
+            tall = y2 - y1 >= TEXT_MIN_PX
+            if count == 1:
+                key = id(e)
+                color = color_of(e)
+                text = self._fit(e.name, text_w) if tall else ""
+                clash = conflicted is not None and conflicted(e)
+            else:
+                key = ("run", id(e))
+                color = MERGED_COLOR
+                text = self._fit(f"{count} items", text_w) if tall else ""
+                clash = False
+            seen.add(key)
+            state = (x1, y1, x2, y2, color, text, clash)
+            slot = self.items.get(key)
+            if slot is None:
+                rect = c.create_rectangle(x1, y1 + 1, x2, y2 - 1, fill=color, width=2 if clash else 0,
+                                          outline=CONFLICT_COLOR if clash else "", tags=("block",))
+                text_id = c.create_text(x1 + 4, y1 + 2, anchor="nw", text=text, font=BLOCK_FONT,
+                                        fill="#102030", tags=("block",))
+                self.items[key] = [rect, text_id, state, DAYS[day], e if count == 1 else None]
+                self.owner[rect] = self.owner[text_id] = key
+                continue
+            old = slot[2]
+            slot[3], slot[4] = DAYS[day], e if count == 1 else None
+            if old == state:
+                continue
+            rect, text_id = slot[0], slot[1]
+            if old[:4] != state[:4]:
+                c.coords(rect, x1, y1 + 1, x2, y2 - 1)
+                c.coords(text_id, x1 + 4, y1 + 2)
+            if old[4] != color:
+                c.itemconfigure(rect, fill=color)
+            if old[5] != text:
+                c.itemconfigure(text_id, text=text)
+            if old[6] != clash:
+                c.itemconfigure(rect, width=2 if clash else 0, outline=CONFLICT_COLOR if clash else "")
+            slot[2] = state
+        for key in [k for k in self.items if k not in seen]:
+            rect, text_id = self.items.pop(key)[:2]
+            c.delete(rect, text_id)
+            del self.owner[rect], self.owner[text_id]
+        span = f"{self._hour_label(self.lo)} - {self._hour_label(self.hi % 24)}"
+        c.itemconfigure(self.footer, text=f"Week • {len(entries)} entries • {span} • Ctrl+wheel to zoom, click to open a day")
+        c.tag_raise("footer")
+
+    def _click(self, ev):
+        current = self.canvas.find_withtag("current")
+        key = self.owner.get(current[0]) if current else None
+        if key is not None:
+            slot = self.items[key]
+            self.on_pick(slot[3], slot[4])